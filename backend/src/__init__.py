@@ -0,0 +1,8 @@
+"""
+Microsoft Fabric Embedded Backend
+Main package initialization
+"""
+
+__version__ = "1.0.0"
+__author__ = "Microsoft Fabric Embedded Team"
+__description__ = "Backend API for Microsoft Fabric embedded application with Entra ID authentication"
@@ -5,11 +5,14 @@ Configures and creates the FastAPI application with all middleware and routes
 
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import http_exception_handler
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 
@@ -25,6 +28,9 @@ logger = get_logger(__name__)
 # Get settings
 settings = get_settings()
 
+# Paths served by the auth router, whose errors use the APIError shape
+_AUTH_PATH_PREFIX = "/api/auth/"
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -50,6 +56,13 @@ async def lifespan(app: FastAPI):
         
         logger.info("✅ Configuration validation passed")
         
+        # Create shared clients once, before any request can reach them
+        from .auth.entra_auth import entra_auth_service
+        await entra_auth_service.init()
+        
+        from .powerbi.service import powerbi_service
+        await powerbi_service.init()
+        
         # Test external dependencies
         await _test_dependencies()
         
@@ -67,6 +80,13 @@ async def lifespan(app: FastAPI):
     
     # Cleanup tasks
     try:
+        # Close pooled HTTP connections
+        from .powerbi.service import powerbi_service
+        await powerbi_service.aclose()
+        
+        from .powerbi.rls_service import close_rls_service
+        await close_rls_service()
+        
         # Clear any caches
         from .powerbi.embed_service import embed_service
         if hasattr(embed_service, '_token_cache'):
@@ -90,8 +110,7 @@ async def _test_dependencies():
         from .auth.entra_auth import entra_auth_service
         
         # Test MSAL app initialization
-        msal_app = entra_auth_service.msal_app
-        if msal_app:
+        if entra_auth_service.msal_app is not None:
             logger.info("✅ Entra ID MSAL client initialized")
         else:
             logger.warning("⚠️ Entra ID MSAL client not initialized")
@@ -270,7 +289,7 @@ def _configure_routes(app: FastAPI) -> None:
         try:
             # Test auth service
             from .auth.entra_auth import entra_auth_service
-            if entra_auth_service.msal_app:
+            if entra_auth_service.msal_app is not None:
                 health_status["components"]["authentication"] = "healthy"
             else:
                 health_status["components"]["authentication"] = "degraded"
@@ -303,6 +322,26 @@ def _configure_exception_handlers(app: FastAPI) -> None:
             }
         )
     
+    @app.exception_handler(StarletteHTTPException)
+    async def auth_http_exception_handler(request: Request, exc: StarletteHTTPException):
+        """Handle HTTP exceptions in auth routes, leaving other routes to FastAPI's default"""
+        
+        if not request.url.path.startswith(_AUTH_PATH_PREFIX):
+            return await http_exception_handler(request, exc)
+        
+        # Same shape as APIError, built directly since 401s can be frequent
+        return ORJSONResponse(
+            status_code=exc.status_code,
+            content={
+                "error": "AuthenticationError",
+                "message": exc.detail,
+                "details": None,
+                "timestamp": datetime.now(),
+                "request_id": getattr(request.state, 'request_id', None)
+            },
+            headers=getattr(exc, 'headers', None)
+        )
+    
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
         """Handle unexpected errors"""
@@ -310,8 +349,9 @@ def _configure_exception_handlers(app: FastAPI) -> None:
         logger.error(f"Unhandled exception on {request.url}: {exc}", exc_info=True)
         
         # Log security event for unexpected errors
+        user = getattr(request.state, 'user', None)
         security_logger.log_security_violation(
-            user_id=getattr(request.state, 'user', {}).get('email', 'unknown'),
+            user_id=user.email if user else 'unknown',
             violation_type="unhandled_exception",
             details={
                 "url": str(request.url),
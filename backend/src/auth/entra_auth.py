@@ -3,8 +3,13 @@ Entra ID (Azure AD) Authentication Service
 Handles token validation, user information retrieval, and group membership
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 import jwt
 import httpx
@@ -12,12 +17,30 @@ from msal import ConfidentialClientApplication
 from azure.identity import DefaultAzureCredential
 
 from ..config import get_settings
+from ..utils.helpers import TTLCache
 from ..utils.logger import security_logger
 from .models import User, TokenInfo
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Upper bound on how long a validated token is trusted without re-verification
+_TOKEN_INFO_CACHE_MAX_TTL = 3600
+
+# Microsoft Graph JSON batching endpoint and the most requests it accepts at once
+_GRAPH_BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+_GRAPH_BATCH_LIMIT = 20
+
+# Sub-request IDs used when loading a user's profile and groups in one batch
+_DETAILS_REQUEST_ID = "1"
+_GROUPS_REQUEST_ID = "2"
+
+# Throttling (HTTP 429) handling for Microsoft Graph calls
+_GRAPH_MAX_RETRIES = 3
+_GRAPH_BACKOFF_BASE = 0.5
+# Longest we are willing to hold a request open waiting out a Retry-After
+_GRAPH_MAX_RETRY_DELAY = 10.0
+
 
 class EntraAuthError(Exception):
     """Base exception for Entra ID authentication errors"""
@@ -34,6 +57,95 @@ class UserInfoError(EntraAuthError):
     pass
 
 
+class UserNotFoundError(UserInfoError):
+    """Exception raised when a user does not exist in Entra ID"""
+    pass
+
+
+def _is_idempotent(request: httpx.Request) -> bool:
+    """Whether a Graph request can safely be repeated after being throttled"""
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return True
+    if request.method in ("PATCH", "PUT", "DELETE") and "If-Match" in request.headers:
+        return True
+    # A JSON batch is only as safe to repeat as its sub-requests
+    if request.method == "POST" and request.url.path.endswith("/$batch"):
+        try:
+            batch = json.loads(request.content)
+        except ValueError:
+            return False
+        return all(item.get("method", "GET") == "GET" for item in batch.get("requests", []))
+    return False
+
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Seconds to wait before retrying a throttled Graph request, given its Retry-After header"""
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    return 2 ** attempt * _GRAPH_BACKOFF_BASE + random.uniform(0, _GRAPH_BACKOFF_BASE)
+
+
+def _sub_response_retry_after(item: Dict[str, Any]) -> Optional[str]:
+    """Retry-After header of a Graph batch sub-response, if it has one"""
+    for name, value in (item.get("headers") or {}).items():
+        if name.lower() == "retry-after":
+            return str(value)
+    return None
+
+
+class _GraphThrottleTransport(httpx.AsyncBaseTransport):
+    """
+    Transport for Microsoft Graph that honors throttling responses
+
+    Idempotent requests answered with 429 are retried after the server's
+    Retry-After interval, or with exponential backoff and jitter when the
+    header is missing. While a cooldown is active, new requests are answered
+    locally with 429 instead of being sent, so callers do not keep drawing
+    on an exhausted quota.
+    """
+
+    def __init__(self, service: "EntraAuthService"):
+        self._service = service
+        self._transport = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        remaining = self._service._graph_cooldown_until - time.monotonic()
+        if remaining > 0:
+            logger.warning(f"Graph cooldown active, skipping {request.method} {request.url.path}")
+            return httpx.Response(
+                429,
+                headers={"Retry-After": str(int(remaining) + 1)},
+                request=request
+            )
+
+        retryable = _is_idempotent(request)
+        attempt = 0
+        while True:
+            response = await self._transport.handle_async_request(request)
+            if response.status_code != 429:
+                return response
+
+            delay = _retry_delay(response.headers.get("Retry-After"), attempt)
+            self._service._graph_cooldown_until = max(
+                self._service._graph_cooldown_until,
+                time.monotonic() + delay
+            )
+            if not retryable or attempt >= _GRAPH_MAX_RETRIES or delay > _GRAPH_MAX_RETRY_DELAY:
+                logger.warning(f"Graph throttled {request.method} {request.url.path}, giving up")
+                return response
+
+            await response.aclose()
+            logger.info(f"Graph throttled {request.method} {request.url.path}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
 class EntraAuthService:
     """Service for handling Entra ID authentication and authorization"""
     
@@ -44,12 +156,24 @@ class EntraAuthService:
         self.authority = settings.entra_authority
         
         # MSAL Confidential Client for server-to-server auth
-        self._msal_app: Optional[ConfidentialClientApplication] = None
+        # Created by init() at startup, or on first use outside the app lifespan
+        self.msal_app: Optional[ConfidentialClientApplication] = None
         
         # Cache for JWKS and user info
         self._jwks_cache: Dict[str, Any] = {}
         self._jwks_cache_expiry: Optional[datetime] = None
         self._user_cache: Dict[str, Dict[str, Any]] = {}
+        # Validated token info keyed by SHA-256 of the raw token
+        self._token_info_cache: TTLCache[bytes, TokenInfo] = TTLCache(
+            maxsize=10000,
+            ttl=_TOKEN_INFO_CACHE_MAX_TTL
+        )
+        
+        # Monotonic time until which Graph calls are short-circuited after throttling
+        self._graph_cooldown_until = 0.0
+        
+        # Callbacks notified with a user ID when that user's groups may have changed
+        self._user_change_listeners: List[Callable[[str], None]] = []
         
         logger.info("EntraAuthService initialized", extra={
             'tenant_id': self.tenant_id,
@@ -57,16 +181,20 @@ class EntraAuthService:
             'authority': self.authority
         })
     
-    @property
-    def msal_app(self) -> ConfidentialClientApplication:
-        """Get MSAL application instance with lazy initialization"""
-        if self._msal_app is None:
-            self._msal_app = ConfidentialClientApplication(
+    async def init(self) -> None:
+        """Create the MSAL application ahead of the first request; called from the application lifespan"""
+        self._get_msal_app()
+    
+    def _get_msal_app(self) -> ConfidentialClientApplication:
+        """Get the MSAL application, creating it on first use"""
+        if self.msal_app is None:
+            self.msal_app = ConfidentialClientApplication(
                 client_id=self.client_id,
                 client_credential=self.client_secret,
                 authority=self.authority
             )
-        return self._msal_app
+            logger.info("MSAL confidential client created")
+        return self.msal_app
     
     async def validate_token(self, token: str) -> TokenInfo:
         """
@@ -86,6 +214,12 @@ class EntraAuthService:
             if token.startswith('Bearer '):
                 token = token[7:]
             
+            # Signature verification is the expensive part; reuse earlier results
+            cache_key = hashlib.sha256(token.encode()).digest()
+            cached_info = self._token_info_cache.get(cache_key)
+            if cached_info is not None:
+                return cached_info
+            
             # Get JWKS for token validation
             jwks = await self._get_jwks()
             
@@ -128,6 +262,11 @@ class EntraAuthService:
                 scopes=payload.get('scp', '').split(' ') if payload.get('scp') else []
             )
             
+            # Cache valid tokens until they expire (capped); invalid ones are never cached
+            ttl = min(token_info.expires_at.timestamp() - time.time(), _TOKEN_INFO_CACHE_MAX_TTL)
+            if ttl > 0:
+                self._token_info_cache.set(cache_key, token_info, ttl=ttl)
+            
             # Log successful validation
             security_logger.log_user_login(
                 user_id=token_info.email,
@@ -170,20 +309,21 @@ class EntraAuthService:
         try:
             # Check cache first
             cache_key = token_info.user_id
+            previous_groups = None
             if cache_key in self._user_cache:
                 cached_user = self._user_cache[cache_key]
                 if datetime.now() < cached_user['expires_at']:
                     logger.debug(f"Returning cached user info for: {token_info.email}")
                     return User(**cached_user['data'])
+                previous_groups = cached_user['data'].get('groups')
             
             # Get service-to-service token for Microsoft Graph
             graph_token = await self._get_graph_token()
             
-            # Get user details from Microsoft Graph
-            user_details = await self._get_user_details(token_info.user_id, graph_token)
-            
-            # Get user group memberships
-            user_groups = await self._get_user_groups(token_info.user_id, graph_token)
+            # Get user details and group memberships from Microsoft Graph in one batch
+            user_details, user_groups = await self._get_user_details_and_groups(
+                token_info.user_id, graph_token
+            )
             
             # Create User object
             user = User(
@@ -194,9 +334,14 @@ class EntraAuthService:
                 groups=user_groups,
                 roles=self._map_groups_to_roles(user_groups),
                 is_admin=self._is_admin_user(user_groups),
-                last_login=datetime.now()
+                last_login=datetime.now(),
+                last_login_monotonic=time.monotonic()
             )
             
+            # Let dependent caches drop state derived from the old group membership
+            if previous_groups is not None and set(previous_groups) != set(user_groups):
+                self._notify_user_changed(token_info.user_id)
+            
             # Cache user info for 15 minutes
             self._user_cache[cache_key] = {
                 'data': user.dict(),
@@ -222,6 +367,55 @@ class EntraAuthService:
             logger.error(f"Failed to get user info: {e}")
             raise UserInfoError(f"User information retrieval failed: {str(e)}")
     
+    def _graph_client(self, **kwargs: Any) -> httpx.AsyncClient:
+        """HTTP client for Microsoft Graph with throttling-aware retries"""
+        return httpx.AsyncClient(transport=_GraphThrottleTransport(self), **kwargs)
+    
+    async def _post_batch(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        requests: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Send a Graph JSON batch and return its sub-responses keyed by request ID
+        
+        Graph throttles sub-requests individually, answering them with 429 inside
+        a 200 batch response. Those sub-requests were not carried out, so they are
+        resent after the longest Retry-After among them; if that exceeds
+        _GRAPH_MAX_RETRY_DELAY or retries run out, the 429 sub-responses are
+        returned as they are and a cooldown is started for other callers.
+        """
+        responses: Dict[str, Dict[str, Any]] = {}
+        pending = requests
+        attempt = 0
+        while True:
+            response = await client.post(_GRAPH_BATCH_URL, headers=headers, json={"requests": pending})
+            response.raise_for_status()
+            for item in response.json().get("responses", []):
+                responses[item.get("id")] = item
+            
+            throttled = {
+                item_id for item_id, item in responses.items()
+                if item.get("status") == 429
+            }
+            if not throttled:
+                return responses
+            
+            delay = max(
+                _retry_delay(_sub_response_retry_after(responses[item_id]), attempt)
+                for item_id in throttled
+            )
+            if attempt >= _GRAPH_MAX_RETRIES or delay > _GRAPH_MAX_RETRY_DELAY:
+                self._graph_cooldown_until = max(self._graph_cooldown_until, time.monotonic() + delay)
+                logger.warning(f"Graph throttled {len(throttled)} batch sub-request(s), giving up")
+                return responses
+            
+            logger.info(f"Graph throttled {len(throttled)} batch sub-request(s), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            pending = [request for request in requests if request["id"] in throttled]
+            attempt += 1
+    
     async def _get_jwks(self) -> Dict[str, Any]:
         """Get JWKS (JSON Web Key Set) from Entra ID"""
         
@@ -253,7 +447,7 @@ class EntraAuthService:
         """Get access token for Microsoft Graph API"""
         try:
             # Use MSAL to get token for Graph API
-            result = self.msal_app.acquire_token_for_client(
+            result = self._get_msal_app().acquire_token_for_client(
                 scopes=["https://graph.microsoft.com/.default"]
             )
             
@@ -268,77 +462,144 @@ class EntraAuthService:
             logger.error(f"Failed to get Graph token: {e}")
             raise EntraAuthError(f"Graph token acquisition failed: {str(e)}")
     
-    async def _get_user_details(self, user_id: str, graph_token: str) -> Dict[str, Any]:
-        """Get user details from Microsoft Graph"""
+    async def _get_user_details_and_groups(
+        self,
+        user_id: str,
+        graph_token: str
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Get user details and PowerBI-related group memberships from Microsoft Graph
+        
+        Both reads are sent as a single JSON batch request; only further pages
+        of group memberships, if any, need separate calls.
+        """
+        headers = {
+            "Authorization": f"Bearer {graph_token}",
+            "Content-Type": "application/json"
+        }
+        batch = [
+            {"id": _DETAILS_REQUEST_ID, "method": "GET", "url": f"/users/{user_id}"},
+            {"id": _GROUPS_REQUEST_ID, "method": "GET", "url": f"/users/{user_id}/memberOf"}
+        ]
+        
         try:
-            graph_url = f"https://graph.microsoft.com/v1.0/users/{user_id}"
-            headers = {
-                "Authorization": f"Bearer {graph_token}",
-                "Content-Type": "application/json"
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(graph_url, headers=headers, timeout=30)
-                response.raise_for_status()
+            async with self._graph_client(timeout=30) as client:
+                responses = await self._post_batch(client, headers, batch)
                 
-                user_details = response.json()
+                details = responses.get(_DETAILS_REQUEST_ID, {})
+                status = details.get("status", 500)
+                if status == 404:
+                    raise UserInfoError(f"User not found: {user_id}")
+                if status >= 400:
+                    raise UserInfoError(f"Failed to get user details: HTTP {status}")
+                user_details = details.get("body", {})
                 logger.debug(f"User details retrieved for: {user_id}")
-                return user_details
                 
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                raise UserInfoError(f"User not found: {user_id}")
-            else:
-                raise UserInfoError(f"Failed to get user details: {e}")
+                user_groups = await self._collect_user_groups(
+                    client, headers, responses.get(_GROUPS_REQUEST_ID, {})
+                )
+                
+        except UserInfoError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get user details: {e}")
             raise UserInfoError(f"User details retrieval failed: {str(e)}")
+        
+        return user_details, user_groups
     
-    async def _get_user_groups(self, user_id: str, graph_token: str) -> List[str]:
-        """Get user group memberships from Microsoft Graph"""
+    async def _collect_user_groups(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        first_page: Dict[str, Any]
+    ) -> List[str]:
+        """Get PowerBI-related group names from a memberOf batch response, following pagination"""
         try:
-            # Get all groups the user is a member of
-            graph_url = f"https://graph.microsoft.com/v1.0/users/{user_id}/memberOf"
-            headers = {
-                "Authorization": f"Bearer {graph_token}",
-                "Content-Type": "application/json"
-            }
-            
-            all_groups = []
-            
-            async with httpx.AsyncClient() as client:
-                while graph_url:
-                    response = await client.get(graph_url, headers=headers, timeout=30)
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    
-                    # Extract group display names
-                    groups = [
-                        group.get('displayName') 
-                        for group in data.get('value', []) 
-                        if group.get('@odata.type') == '#microsoft.graph.group'
-                        and group.get('displayName')
-                    ]
-                    all_groups.extend(groups)
-                    
-                    # Check for pagination
-                    graph_url = data.get('@odata.nextLink')
-            
-            # Filter to only PowerBI-related groups
-            powerbi_groups = [
-                group for group in all_groups 
-                if group.startswith('PBI-') or group in settings.entra_group_mappings
-            ]
+            status = first_page.get("status", 500)
+            if status >= 400:
+                raise EntraAuthError(f"memberOf request failed: HTTP {status}")
             
-            logger.debug(f"User groups retrieved: {powerbi_groups}")
-            return powerbi_groups
+            return await self._read_group_pages(client, headers, first_page.get("body", {}))
             
         except Exception as e:
             logger.error(f"Failed to get user groups: {e}")
             # Return empty list rather than failing completely
             return []
     
+    async def _read_group_pages(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        data: Dict[str, Any]
+    ) -> List[str]:
+        """Get PowerBI-related group names from a memberOf page and the pages after it"""
+        all_groups = []
+        
+        while True:
+            # Extract group display names
+            groups = [
+                group.get('displayName') 
+                for group in data.get('value', []) 
+                if group.get('@odata.type') == '#microsoft.graph.group'
+                and group.get('displayName')
+            ]
+            all_groups.extend(groups)
+            
+            # Check for pagination
+            next_link = data.get('@odata.nextLink')
+            if not next_link:
+                break
+            response = await client.get(next_link, headers=headers, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        
+        # Filter to only PowerBI-related groups
+        powerbi_groups = [
+            group for group in all_groups 
+            if group.startswith('PBI-') or group in settings.entra_group_mappings
+        ]
+        
+        logger.debug(f"User groups retrieved: {powerbi_groups}")
+        return powerbi_groups
+    
+    async def get_user_roles(self, user_id: str) -> List[str]:
+        """
+        Get any user's current roles from their Entra ID group memberships
+        
+        Always reads Microsoft Graph rather than the user cache, so role
+        changes are diffed against the memberships that actually exist.
+        
+        Args:
+            user_id: User object ID in Entra ID
+            
+        Returns:
+            Roles granted by the user's current groups
+            
+        Raises:
+            UserNotFoundError: If the user does not exist
+            UserInfoError: If the memberships cannot be read
+        """
+        graph_token = await self._get_graph_token()
+        headers = {"Authorization": f"Bearer {graph_token}"}
+        
+        try:
+            async with self._graph_client(timeout=30) as client:
+                response = await client.get(
+                    f"https://graph.microsoft.com/v1.0/users/{user_id}/memberOf",
+                    headers=headers
+                )
+                if response.status_code == 404:
+                    raise UserNotFoundError(f"User not found: {user_id}")
+                response.raise_for_status()
+                groups = await self._read_group_pages(client, headers, response.json())
+        except UserInfoError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to read group memberships for {user_id}: {e}")
+            raise UserInfoError(f"Group membership retrieval failed: {str(e)}")
+        
+        return self._map_groups_to_roles(groups)
+    
     def _map_groups_to_roles(self, groups: List[str]) -> List[str]:
         """Map Entra ID groups to PowerBI roles"""
         roles = []
@@ -366,11 +627,143 @@ class EntraAuthService:
         admin_groups = ['PBI-Admin']
         return any(group in admin_groups for group in groups)
     
+    def _groups_for_roles(self, roles: Iterable[str]) -> List[str]:
+        """Map PowerBI roles back to the Entra ID groups that grant them"""
+        wanted = set(roles)
+        groups = []
+        for group, mapped_roles in settings.entra_group_mappings.items():
+            if not isinstance(mapped_roles, list):
+                mapped_roles = [mapped_roles]
+            if wanted.intersection(mapped_roles):
+                groups.append(group)
+        return groups
+
+    async def update_group_memberships(
+        self,
+        user_id: str,
+        add_roles: Iterable[str],
+        remove_roles: Iterable[str]
+    ) -> Dict[str, int]:
+        """
+        Add and remove a user's Entra ID group memberships for the given roles
+
+        Group IDs are resolved with a single filtered lookup and all membership
+        changes are submitted through Microsoft Graph JSON batching, so the
+        number of HTTPS calls does not grow with the number of roles changed.
+
+        Args:
+            user_id: User object ID in Entra ID
+            add_roles: Roles the user should gain
+            remove_roles: Roles the user should lose
+
+        Returns:
+            Counts of group memberships Graph reports as added and removed
+
+        Raises:
+            EntraAuthError: If a group cannot be resolved or the Graph update fails
+        """
+        add_groups = self._groups_for_roles(add_roles)
+        remove_groups = self._groups_for_roles(remove_roles)
+        if not add_groups and not remove_groups:
+            return {"added": 0, "removed": 0}
+
+        try:
+            graph_token = await self._get_graph_token()
+            headers = {
+                "Authorization": f"Bearer {graph_token}",
+                "Content-Type": "application/json"
+            }
+
+            async with self._graph_client(timeout=30) as client:
+                # Resolve all group display names to IDs in one query
+                names = ",".join(f"'{name}'" for name in add_groups + remove_groups)
+                response = await client.get(
+                    "https://graph.microsoft.com/v1.0/groups",
+                    headers=headers,
+                    params={"$filter": f"displayName in ({names})", "$select": "id,displayName"}
+                )
+                response.raise_for_status()
+                group_ids = {
+                    group["displayName"]: group["id"]
+                    for group in response.json().get("value", [])
+                }
+
+                # Refuse the whole change rather than silently applying part of it
+                unresolved = [name for name in add_groups + remove_groups if name not in group_ids]
+                if unresolved:
+                    raise EntraAuthError(f"Groups not found in Entra ID: {unresolved}")
+
+                requests: List[Dict[str, Any]] = []
+                for name in add_groups:
+                    requests.append({
+                        "id": str(len(requests) + 1),
+                        "method": "POST",
+                        "url": f"/groups/{group_ids[name]}/members/$ref",
+                        "headers": {"Content-Type": "application/json"},
+                        "body": {"@odata.id": f"https://graph.microsoft.com/v1.0/directoryObjects/{user_id}"}
+                    })
+                for name in remove_groups:
+                    requests.append({
+                        "id": str(len(requests) + 1),
+                        "method": "DELETE",
+                        "url": f"/groups/{group_ids[name]}/members/{user_id}/$ref"
+                    })
+                methods = {request["id"]: request["method"] for request in requests}
+
+                # Count only the changes Graph reports as applied
+                applied = {"added": 0, "removed": 0}
+
+                # Graph accepts at most 20 requests per batch
+                for start in range(0, len(requests), _GRAPH_BATCH_LIMIT):
+                    responses = await self._post_batch(
+                        client, headers, requests[start:start + _GRAPH_BATCH_LIMIT]
+                    )
+                    failed = 0
+                    for item in responses.values():
+                        method = methods.get(item.get("id"))
+                        status = item.get("status", 500)
+                        if method == "DELETE" and status == 404:
+                            # Not a member of that group; nothing to remove
+                            continue
+                        if status >= 400:
+                            failed += 1
+                        elif method == "POST":
+                            applied["added"] += 1
+                        elif method == "DELETE":
+                            applied["removed"] += 1
+                    if failed:
+                        raise EntraAuthError(
+                            f"{failed} group membership change(s) failed "
+                            f"(applied: +{applied['added']} -{applied['removed']})"
+                        )
+
+            logger.info(f"Updated group memberships for {user_id}: +{add_groups} -{remove_groups}")
+            return applied
+
+        except EntraAuthError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to update group memberships for {user_id}: {e}")
+            raise EntraAuthError(f"Group membership update failed: {str(e)}")
+
     async def refresh_user_cache(self, user_id: str) -> None:
         """Force refresh of cached user information"""
         if user_id in self._user_cache:
             del self._user_cache[user_id]
             logger.info(f"User cache refreshed for: {user_id}")
+        self._notify_user_changed(user_id)
+    
+    def add_user_change_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback invoked with a user ID when that user's cached info is invalidated"""
+        self._user_change_listeners.append(listener)
+    
+    def _notify_user_changed(self, user_id: str) -> None:
+        """Notify registered listeners that a user's group membership may have changed"""
+        for listener in self._user_change_listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.warning(f"User change listener failed for {user_id}: {e}")
     
     async def get_service_principal_token(self, scope: str) -> str:
         """
@@ -383,15 +776,30 @@ class EntraAuthService:
         Returns:
             Access token string
         """
+        token, _ = await self.get_service_principal_token_with_expiry(scope)
+        return token
+    
+    async def get_service_principal_token_with_expiry(self, scope: str) -> Tuple[str, Optional[float]]:
+        """
+        Get service principal token for specific scope with its remaining lifetime
+        
+        Args:
+            scope: OAuth scope (e.g., "https://analysis.windows.net/powerbi/api/.default")
+            
+        Returns:
+            Tuple of (access token, seconds until it expires or None if not reported)
+        """
         try:
-            result = self.msal_app.acquire_token_for_client(scopes=[scope])
+            result = self._get_msal_app().acquire_token_for_client(scopes=[scope])
             
             if "access_token" not in result:
                 error_desc = result.get("error_description", "Unknown error")
                 raise EntraAuthError(f"Failed to acquire token for scope {scope}: {error_desc}")
             
+            expires_in = result.get("expires_in")
+            
             logger.debug(f"Service principal token acquired for scope: {scope}")
-            return result["access_token"]
+            return result["access_token"], float(expires_in) if expires_in is not None else None
             
         except Exception as e:
             logger.error(f"Failed to get service principal token: {e}")
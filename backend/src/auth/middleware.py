@@ -5,6 +5,7 @@ Handles JWT token validation, user context, and role-based access control
 
 import logging
 import uuid
+from dataclasses import dataclass
 from typing import List, Optional, Callable, Any
 from fastapi import Request, Response, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -23,6 +24,33 @@ settings = get_settings()
 security_scheme = HTTPBearer(auto_error=False)
 
 
+@dataclass(frozen=True, slots=True)
+class RequestContext:
+    """Client details for a request, read from Starlette once per request"""
+    request_id: Optional[str]
+    client_ip: str
+    user_agent: Optional[str]
+    is_https: bool
+    
+    @classmethod
+    def from_request(cls, request: Request, request_id: Optional[str]) -> "RequestContext":
+        return cls(
+            request_id=request_id,
+            client_ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent"),
+            is_https=request.url.scheme == "https"
+        )
+
+
+def get_request_context(request: Request) -> RequestContext:
+    """Get the request's context, building it if AuthMiddleware did not run"""
+    ctx = getattr(request.state, 'ctx', None)
+    if ctx is None:
+        ctx = RequestContext.from_request(request, getattr(request.state, 'request_id', None))
+        request.state.ctx = ctx
+    return ctx
+
+
 class AuthMiddleware(BaseHTTPMiddleware):
     """
     Middleware to handle authentication for all requests
@@ -48,6 +76,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
         # Generate unique request ID
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
+        request.state.ctx = RequestContext.from_request(request, request_id)
         
         # Get request logger
         req_logger = get_request_logger(request_id)
@@ -311,7 +340,7 @@ def require_roles(allowed_roles: List[str]):
                 resource=request.url.path,
                 required_roles=allowed_roles,
                 user_roles=current_user.roles,
-                source_ip=request.client.host if request.client else "unknown"
+                source_ip=get_request_context(request).client_ip
             )
             
             raise HTTPException(
@@ -324,38 +353,44 @@ def require_roles(allowed_roles: List[str]):
     return check_roles
 
 
+async def _check_admin(request: Request) -> User:
+    """Check if user is admin"""
+    
+    # Fast path: the auth middleware has already resolved the user for this request
+    current_user = getattr(request.state, 'user', None)
+    if current_user is None or not getattr(request.state, 'authenticated', False):
+        current_user = await get_current_user_from_request(request)
+    
+    if not current_user.is_admin:
+        # Log unauthorized admin access attempt
+        security_logger.log_unauthorized_access(
+            user_id=current_user.email,
+            resource=request.url.path,
+            required_roles=["Admin"],
+            user_roles=current_user.roles,
+            source_ip=get_request_context(request).client_ip
+        )
+        
+        raise HTTPException(
+            status_code=403,
+            detail="Admin access required"
+        )
+    
+    return current_user
+
+
 def require_admin():
     """
     Decorator for admin-only endpoints
     
+    Every call returns the same dependency, so FastAPI runs the check at most
+    once per request even when it is declared on both a router and a route.
+    
     Returns:
         Dependency function for FastAPI
     """
     
-    async def check_admin(
-        request: Request,
-        current_user: User = Depends(get_current_user_from_request)
-    ) -> User:
-        """Check if user is admin"""
-        
-        if not current_user.is_admin:
-            # Log unauthorized admin access attempt
-            security_logger.log_unauthorized_access(
-                user_id=current_user.email,
-                resource=request.url.path,
-                required_roles=["Admin"],
-                user_roles=current_user.roles,
-                source_ip=request.client.host if request.client else "unknown"
-            )
-            
-            raise HTTPException(
-                status_code=403,
-                detail="Admin access required"
-            )
-        
-        return current_user
-    
-    return check_admin
+    return _check_admin
 
 
 # Rate limiting middleware
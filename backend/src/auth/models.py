@@ -3,9 +3,9 @@ Data models for authentication and authorization
 Defines User, Token, and related models using Pydantic
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field, EmailStr, validator
+from pydantic import BaseModel, Field, EmailStr, PrivateAttr, validator
 from enum import Enum
 
 
@@ -75,8 +75,43 @@ class User(BaseModel):
     is_admin: bool = Field(default=False, description="Whether user is an admin")
     is_active: bool = Field(default=True, description="Whether user account is active")
     last_login: Optional[datetime] = Field(None, description="Last login timestamp")
+    last_login_monotonic: Optional[float] = Field(None, description="Monotonic clock reading at last login, for duration math")
     created_at: datetime = Field(default_factory=datetime.now, description="Account creation timestamp")
     
+    # One bit per system role, so role checks are a single AND against role_mask
+    _ROLE_BITS = {
+        UserRole.ADMIN.value: 1,
+        UserRole.ROLE_A.value: 2,
+        UserRole.ROLE_B.value: 4,
+        UserRole.PUBLIC.value: 8
+    }
+    
+    _role_mask: int = PrivateAttr(default=0)
+    
+    def __init__(self, **data: Any):
+        super().__init__(**data)
+        self._role_mask = self.mask_for(self.roles)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # Keep the cached mask in step with reassigned roles
+        if name == 'roles':
+            self._role_mask = self.mask_for(self.roles)
+    
+    def copy(self, **kwargs: Any) -> "User":
+        """Copy the user, recomputing the role mask since copy(update=...) skips __init__"""
+        user = super().copy(**kwargs)
+        user._role_mask = user.mask_for(user.roles)
+        return user
+    
+    @classmethod
+    def mask_for(cls, roles: Iterable[str]) -> int:
+        """Combine role names into a bitmask; unknown roles contribute nothing"""
+        mask = 0
+        for role in roles:
+            mask |= cls._ROLE_BITS.get(role, 0)
+        return mask
+    
     @validator('roles')
     def validate_roles(cls, v):
         """Validate that roles are from allowed values"""
@@ -99,6 +134,16 @@ class User(BaseModel):
         
         return [role_mapping.get(role, PowerBIRole.PUBLIC).value for role in self.roles]
     
+    @property
+    def role_mask(self) -> int:
+        """Bitmask of the user's roles (see _ROLE_BITS)"""
+        return self._role_mask
+    
+    @property
+    def has_nonpublic_role(self) -> bool:
+        """Whether user is an admin or holds any role other than Public"""
+        return self.is_admin or bool(self._role_mask & ~self._ROLE_BITS[UserRole.PUBLIC.value])
+    
     @property
     def display_name(self) -> str:
         """Get user's display name or email if name not available"""
@@ -106,15 +151,15 @@ class User(BaseModel):
     
     def has_role(self, role: str) -> bool:
         """Check if user has a specific role"""
-        return role in self.roles
+        return bool(self._role_mask & self._ROLE_BITS.get(role, 0))
     
     def has_any_role(self, roles: List[str]) -> bool:
         """Check if user has any of the specified roles"""
-        return any(role in self.roles for role in roles)
+        return bool(self._role_mask & self.mask_for(roles))
     
     def has_admin_access(self) -> bool:
         """Check if user has admin access"""
-        return self.is_admin or self.has_role(UserRole.ADMIN)
+        return self.is_admin or bool(self._role_mask & self._ROLE_BITS[UserRole.ADMIN.value])
     
     def can_access_report(self, report_roles: List[str]) -> bool:
         """Check if user can access a report based on required roles"""
@@ -123,6 +168,8 @@ class User(BaseModel):
         return self.has_any_role(report_roles)
     
     class Config:
+        # Reassigned roles go through validate_roles like constructor input
+        validate_assignment = True
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
@@ -0,0 +1,119 @@
+"""
+User repository for Microsoft Fabric Embedded Backend
+Provides filtered, paginated access to known users for administrative views
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserRepository:
+    """
+    Store of users known to the application
+
+    Filtering and pagination happen inside the repository so callers only
+    ever receive one page of rows. This in-memory store stands in for a
+    database table; a SQL-backed implementation should:
+
+    - map role_filter to an index on user_roles(role, user_id), which the
+      in-memory role index mirrors
+    - map search to a trigram/ILIKE index on email and name
+    - return total_count from the same query via COUNT(*) OVER ()
+      so a single round-trip serves both the page and the total
+    """
+
+    def __init__(self):
+        self._users: Dict[str, User] = {}
+        # Role name -> IDs of users holding that role
+        self._by_role: DefaultDict[str, Set[str]] = defaultdict(set)
+
+    def upsert(self, user: User) -> None:
+        """Add or replace a user"""
+        previous = self._users.get(user.id)
+        if previous is not None:
+            for role in previous.roles:
+                self._by_role[role].discard(user.id)
+        self._users[user.id] = user
+        for role in user.roles:
+            self._by_role[role].add(user.id)
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Get a known user by ID"""
+        return self._users.get(user_id)
+
+    def update_roles(self, user_id: str, added: Iterable[str], removed: Iterable[str]) -> None:
+        """Apply a role change to a known user; unknown users are ignored"""
+        user = self._users.get(user_id)
+        if user is None:
+            return
+
+        removed = set(removed)
+        roles = [role for role in user.roles if role not in removed]
+        roles.extend(role for role in added if role not in roles)
+        self.upsert(User(**{**user.dict(), "roles": roles}))
+
+    async def list(
+        self,
+        search: Optional[str] = None,
+        role_filter: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        List users matching the given filters
+
+        Args:
+            search: Case-insensitive substring match on email or name
+            role_filter: Only include users holding this role
+            limit: Maximum number of rows to return
+            offset: Number of matching rows to skip
+
+        Returns:
+            Tuple of (rows for the requested page, total matching count)
+        """
+        needle = search.lower() if search else None
+
+        # Narrow to the role's members through the index before scanning
+        if role_filter is None:
+            candidates: Iterable[User] = self._users.values()
+        else:
+            candidates = (self._users[user_id] for user_id in sorted(self._by_role.get(role_filter, ())))
+
+        matches = [
+            user for user in candidates
+            if (
+                needle is None
+                or needle in user.email.lower()
+                or (user.name is not None and needle in user.name.lower())
+            )
+        ]
+
+        rows = [self._to_row(user) for user in matches[offset:offset + limit]]
+        return rows, len(matches)
+
+    @staticmethod
+    def _to_row(user: User) -> Dict[str, Any]:
+        """Serialize a user for admin listings"""
+        return {
+            "id": user.id,
+            "email": user.email,
+            "name": user.name,
+            "roles": user.roles,
+            "groups": user.groups,
+            "is_admin": user.is_admin,
+            "is_active": user.is_active,
+            "last_login": user.last_login.isoformat() if user.last_login else None,
+            "created_at": user.created_at.isoformat(),
+            "login_count": 1,  # Placeholder
+            "last_token_generated": datetime.now().isoformat()  # Placeholder
+        }
+
+
+# Global repository instance
+user_repository = UserRepository()
@@ -4,15 +4,49 @@ Handles environment variables, Azure Key Vault integration, and app settings
 """
 
 import os
-from typing import List, Optional, Union
+import sys
+from typing import Dict, List, Optional, Union
 from functools import lru_cache
 from pydantic import BaseSettings, Field, validator
+from azure.core.pipeline.transport import RequestsTransport
 from azure.keyvault.secrets import SecretClient
-from azure.identity import DefaultAzureCredential
+from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
 import logging
+import requests
 
 logger = logging.getLogger(__name__)
 
+# Interned environment names; Settings.environment is normalized to one of these
+_DEVELOPMENT = sys.intern("development")
+_PRODUCTION = sys.intern("production")
+_TEST = sys.intern("test")
+
+# Values copied from .env.example that must be treated as "not configured"
+_PLACEHOLDER_PREFIXES = ("your-",)
+_PLACEHOLDER_VALUES = frozenset({"dev-secret-key-change-in-production"})
+
+
+def _is_placeholder(value) -> bool:
+    """Check if a setting value is empty or still holds a template placeholder"""
+    return not value or (
+        isinstance(value, str)
+        and (value in _PLACEHOLDER_VALUES or value.startswith(_PLACEHOLDER_PREFIXES))
+    )
+
+# Settings that must be configured for the app to start
+_REQUIRED_FIELDS = (
+    "entra_tenant_id",
+    "entra_client_id",
+    "fabric_workspace_id",
+)
+
+# Map of setting attributes to Key Vault secret names
+_SECRET_MAPPINGS = (
+    ("entra_client_secret", "entra-client-secret"),
+    ("jwt_secret_key", "jwt-signing-key"),
+    ("database_url", "database-connection-string"),
+)
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support and Azure Key Vault integration"""
@@ -36,13 +70,12 @@ class Settings(BaseSettings):
     entra_tenant_id: str = Field(..., env="ENTRA_TENANT_ID")
     entra_client_id: str = Field(..., env="ENTRA_CLIENT_ID")
     entra_client_secret: Optional[str] = Field(default=None, env="ENTRA_CLIENT_SECRET")
-    entra_authority: Optional[str] = Field(default=None, env="ENTRA_AUTHORITY")
+    entra_authority_override: Optional[str] = Field(default=None, env="ENTRA_AUTHORITY")
     
-    @validator("entra_authority", always=True)
-    def set_entra_authority(cls, v, values):
-        if v is None and "entra_tenant_id" in values:
-            return f"https://login.microsoftonline.com/{values['entra_tenant_id']}"
-        return v
+    @property
+    def entra_authority(self) -> str:
+        """Entra ID authority URL, derived from the tenant unless set explicitly"""
+        return self.entra_authority_override or f"https://login.microsoftonline.com/{self.entra_tenant_id}"
     
     # ============================================================================
     # MICROSOFT FABRIC & POWERBI CONFIGURATION
@@ -69,15 +102,16 @@ class Settings(BaseSettings):
     # ============================================================================
     # AZURE KEY VAULT CONFIGURATION
     # ============================================================================
-    key_vault_url: Optional[str] = Field(default=None, env="KEY_VAULT_URL")
+    key_vault_url_override: Optional[str] = Field(default=None, env="KEY_VAULT_URL")
     key_vault_name: Optional[str] = Field(default=None, env="KEY_VAULT_NAME")
     managed_identity_client_id: Optional[str] = Field(default=None, env="MANAGED_IDENTITY_CLIENT_ID")
     
-    @validator("key_vault_url", always=True)
-    def set_key_vault_url(cls, v, values):
-        if v is None and "key_vault_name" in values and values["key_vault_name"]:
-            return f"https://{values['key_vault_name']}.vault.azure.net/"
-        return v
+    @property
+    def key_vault_url(self) -> Optional[str]:
+        """Key Vault URL, derived from the vault name unless set explicitly"""
+        if self.key_vault_url_override is None and self.key_vault_name:
+            return f"https://{self.key_vault_name}.vault.azure.net/"
+        return self.key_vault_url_override
     
     # ============================================================================
     # SECURITY CONFIGURATION
@@ -103,6 +137,10 @@ class Settings(BaseSettings):
         env="ALLOWED_HOSTS"
     )
     
+    @validator("environment", always=True)
+    def normalize_environment(cls, v):
+        return sys.intern(v.strip().lower())
+    
     @validator("allowed_origins", pre=True)
     def parse_origins(cls, v):
         if isinstance(v, str):
@@ -129,6 +167,16 @@ class Settings(BaseSettings):
     cache_default_ttl: int = Field(default=3600, env="CACHE_DEFAULT_TTL")  # 1 hour
     cache_token_ttl: int = Field(default=900, env="CACHE_TOKEN_TTL")        # 15 minutes
     
+    # RLS in-memory caches
+    rls_cache_max_size: int = Field(default=10000, env="RLS_CACHE_MAX_SIZE")
+    rls_cache_ttl: int = Field(default=900, env="RLS_CACHE_TTL")                        # 15 minutes
+    rls_dataset_security_cache_ttl: int = Field(default=300, env="RLS_DATASET_SECURITY_CACHE_TTL")  # 5 minutes
+    # Per-role mapping TTLs; a user's mapping lives as long as their shortest-lived role
+    rls_ttl_overrides: Dict[str, int] = Field(
+        default={"Admin": 3600, "Public": 3600, "Dynamic": 60},
+        env="RLS_TTL_OVERRIDES"
+    )
+    
     # ============================================================================
     # LOGGING CONFIGURATION
     # ============================================================================
@@ -173,13 +221,15 @@ class Settings(BaseSettings):
     
     @validator("enable_docs", always=True)
     def disable_docs_in_production(cls, v, values):
-        if values.get("environment") == "production":
+        if values.get("environment") == _PRODUCTION:
             return False
         return v
     
     # ============================================================================
     # PYDANTIC CONFIGURATION
     # ============================================================================
+    # Settings are built once per process by get_settings() and field reads are
+    # plain instance attribute lookups, so validation cost stays off the hot path.
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -188,6 +238,54 @@ class Settings(BaseSettings):
         extra = "ignore"  # Ignore extra environment variables
 
 
+@lru_cache()
+def _get_credential(environment: str, managed_identity_client_id: Optional[str]):
+    """
+    Get the Azure credential for the environment, shared across Key Vault clients
+    
+    Production uses managed identity directly, skipping DefaultAzureCredential's
+    probe chain on the cold path. Development keeps the full chain (environment
+    service principal, CLI, VS Code...) minus the managed identity probe, which
+    only times out on a workstation.
+    
+    Args:
+        environment: Normalized environment name
+        managed_identity_client_id: User-assigned managed identity, if any
+        
+    Returns:
+        Credential instance, or None when Key Vault should not be used
+    """
+    if environment == _PRODUCTION:
+        return ManagedIdentityCredential(client_id=managed_identity_client_id)
+    if environment == _TEST:
+        return None
+    if environment == _DEVELOPMENT:
+        return DefaultAzureCredential(exclude_managed_identity_credential=True)
+    return DefaultAzureCredential(managed_identity_client_id=managed_identity_client_id)
+
+
+# Key Vault HTTP transport tuning: fail fast on connect, keep a pool of
+# keep-alive connections so parallel get_secret calls skip the TLS handshake
+_KEY_VAULT_CONNECTION_TIMEOUT = 2
+_KEY_VAULT_READ_TIMEOUT = 10
+_KEY_VAULT_POOL_MAXSIZE = 20
+
+
+def _create_key_vault_transport() -> RequestsTransport:
+    """Create a pooled HTTP transport for the Key Vault client"""
+    session = requests.Session()
+    session.mount(
+        "https://",
+        requests.adapters.HTTPAdapter(pool_maxsize=_KEY_VAULT_POOL_MAXSIZE)
+    )
+    return RequestsTransport(
+        session=session,
+        session_owner=True,
+        connection_timeout=_KEY_VAULT_CONNECTION_TIMEOUT,
+        read_timeout=_KEY_VAULT_READ_TIMEOUT
+    )
+
+
 class KeyVaultSettings:
     """Azure Key Vault integration for secure secret management"""
     
@@ -201,17 +299,22 @@ class KeyVaultSettings:
         """Get Key Vault client with proper authentication"""
         if self._client is None and self.settings.key_vault_url:
             try:
-                # Use Managed Identity in Azure, fallback to DefaultAzureCredential
-                credential = DefaultAzureCredential(
-                    managed_identity_client_id=self.settings.managed_identity_client_id
+                credential = _get_credential(
+                    self.settings.environment,
+                    self.settings.managed_identity_client_id
                 )
+                if credential is None:
+                    logger.info("Key Vault access disabled for test environment")
+                    return None
+                
                 self._client = SecretClient(
                     vault_url=self.settings.key_vault_url,
-                    credential=credential
+                    credential=credential,
+                    transport=_create_key_vault_transport()
                 )
                 logger.info("Key Vault client initialized successfully")
             except Exception as e:
-                logger.error(f"Failed to initialize Key Vault client: {e}")
+                logger.error("Failed to initialize Key Vault client: %s", e)
                 self._client = None
         return self._client
     
@@ -235,17 +338,17 @@ class KeyVaultSettings:
             try:
                 secret = self.client.get_secret(secret_name)
                 self._secrets_cache[secret_name] = secret.value
-                logger.debug(f"Retrieved secret '{secret_name}' from Key Vault")
+                logger.debug("Retrieved secret '%s' from Key Vault", secret_name)
                 return secret.value
             except Exception as e:
-                logger.warning(f"Failed to retrieve secret '{secret_name}' from Key Vault: {e}")
+                logger.warning("Failed to retrieve secret '%s' from Key Vault: %s", secret_name, e)
         
         # Fallback to default value
         if default_value is not None:
-            logger.debug(f"Using default value for secret '{secret_name}'")
+            logger.debug("Using default value for secret '%s'", secret_name)
             return default_value
         
-        logger.error(f"Secret '{secret_name}' not found and no default provided")
+        logger.error("Secret '%s' not found and no default provided", secret_name)
         return None
     
     def update_settings_with_secrets(self, settings: Settings) -> Settings:
@@ -254,22 +357,15 @@ class KeyVaultSettings:
             logger.warning("Key Vault client not available, using environment variables only")
             return settings
         
-        # Map of setting attributes to Key Vault secret names
-        secret_mappings = {
-            "entra_client_secret": "entra-client-secret",
-            "jwt_secret_key": "jwt-signing-key",
-            "database_url": "database-connection-string",
-        }
-        
-        for setting_attr, secret_name in secret_mappings.items():
-            current_value = getattr(settings, setting_attr, None)
+        for setting_attr, secret_name in _SECRET_MAPPINGS:
+            current_value = getattr(settings, setting_attr)
             
             # Only fetch from Key Vault if not already set via environment
-            if not current_value or current_value.startswith("your-") or current_value == "dev-secret-key-change-in-production":
+            if _is_placeholder(current_value):
                 secret_value = self.get_secret(secret_name)
                 if secret_value:
                     setattr(settings, setting_attr, secret_value)
-                    logger.debug(f"Updated {setting_attr} from Key Vault")
+                    logger.debug("Updated %s from Key Vault", setting_attr)
         
         return settings
 
@@ -332,7 +428,7 @@ class TestSettings(Settings):
     redis_url: str = "redis://localhost:6379/1"  # Different DB for tests
     
     # Mock Key Vault in tests
-    key_vault_url: Optional[str] = None
+    key_vault_url_override: Optional[str] = Field(default=None, env="KEY_VAULT_URL")
     
     # Test-specific token settings
     embed_token_expiration_minutes: int = 5  # Short expiration for tests
@@ -347,12 +443,12 @@ def get_settings() -> Settings:
     Returns:
         Settings instance based on environment
     """
-    environment = os.getenv("ENVIRONMENT", "development").lower()
-    
-    # Choose settings class based on environment
-    if environment == "production":
+    # Choose settings class based on environment; read here rather than at
+    # import so get_settings.cache_clear() picks up a changed ENVIRONMENT
+    environment = os.environ.get("ENVIRONMENT", _DEVELOPMENT).strip().lower()
+    if environment == _PRODUCTION:
         settings = ProductionSettings()
-    elif environment == "test":
+    elif environment == _TEST:
         settings = TestSettings()
     else:
         settings = DevelopmentSettings()
@@ -365,24 +461,17 @@ def get_settings() -> Settings:
     # Validate required settings
     _validate_required_settings(settings)
     
-    logger.info(f"Settings loaded for environment: {settings.environment}")
+    logger.info("Settings loaded for environment: %s", settings.environment)
     return settings
 
 
 def _validate_required_settings(settings: Settings) -> None:
     """Validate that all required settings are present"""
-    required_fields = [
-        "entra_tenant_id",
-        "entra_client_id", 
-        "fabric_workspace_id"
+    missing_fields = [
+        field for field in _REQUIRED_FIELDS
+        if _is_placeholder(getattr(settings, field, None))
     ]
     
-    missing_fields = []
-    for field in required_fields:
-        value = getattr(settings, field, None)
-        if not value or (isinstance(value, str) and value.startswith("your-")):
-            missing_fields.append(field)
-    
     if missing_fields:
         raise ValueError(
             f"Missing required configuration fields: {missing_fields}. "
@@ -390,7 +479,7 @@ def _validate_required_settings(settings: Settings) -> None:
         )
     
     # Validate Entra ID configuration
-    if not settings.entra_client_secret and settings.environment != "test":
+    if not settings.entra_client_secret and settings.environment != _TEST:
         logger.warning(
             "Entra ID client secret not configured. "
             "This may cause authentication failures in non-test environments."
@@ -406,14 +495,14 @@ def get_keyvault_settings() -> KeyVaultSettings:
 # Environment-specific configurations
 def is_development() -> bool:
     """Check if running in development mode"""
-    return get_settings().environment.lower() == "development"
+    return get_settings().environment == _DEVELOPMENT
 
 
 def is_production() -> bool:
     """Check if running in production mode"""
-    return get_settings().environment.lower() == "production"
+    return get_settings().environment == _PRODUCTION
 
 
 def is_testing() -> bool:
     """Check if running in test mode"""
-    return get_settings().environment.lower() == "test"
\ No newline at end of file
+    return get_settings().environment == _TEST
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Data models module
+Contains all Pydantic models for request/response validation
+"""
+
+from ..auth.models import (
+    User,
+    TokenInfo,
+    UserResponse,
+    UserRole,
+    PowerBIRole,
+    AuthenticationRequest,
+    AuthenticationResponse,
+    PowerBITokenRequest,
+    PowerBITokenResponse,
+    PowerBIEmbedConfig,
+    APIError,
+    HealthCheck
+)
+
+__all__ = [
+    # User models
+    'User',
+    'TokenInfo', 
+    'UserResponse',
+    'UserRole',
+    'PowerBIRole',
+    
+    # Request/Response models
+    'AuthenticationRequest',
+    'AuthenticationResponse',
+    'PowerBITokenRequest',
+    'PowerBITokenResponse',
+    'PowerBIEmbedConfig',
+    
+    # Utility models
+    'APIError',
+    'HealthCheck'
+]
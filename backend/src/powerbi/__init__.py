@@ -0,0 +1,31 @@
+"""
+PowerBI and Microsoft Fabric integration module
+Handles embed tokens, RLS, and report management
+"""
+
+from .service import (
+    powerbi_service,
+    generate_embed_token,
+    get_user_reports,
+    get_user_datasets
+)
+from .rls_service import (
+    get_rls_service,
+    get_user_rls_mapping,
+    validate_rls_configuration,
+    test_user_rls
+)
+
+__all__ = [
+    # Main PowerBI service
+    'powerbi_service',
+    'generate_embed_token',
+    'get_user_reports',
+    'get_user_datasets',
+    
+    # RLS service
+    'get_rls_service',
+    'get_user_rls_mapping',
+    'validate_rls_configuration',
+    'test_user_rls'
+]
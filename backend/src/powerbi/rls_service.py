@@ -3,21 +3,50 @@ Row Level Security (RLS) Service for Microsoft Fabric Embedded Backend
 Manages RLS roles, rules, and dynamic security configurations
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+from collections import Counter
+from operator import itemgetter
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Any, Set, Tuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from types import MappingProxyType
 import httpx
 
 from ..auth.models import User
 from ..auth.entra_auth import entra_auth_service
+from .service import powerbi_service
 from ..config import get_settings
+from ..utils.helpers import TTLCache
 from ..utils.logger import security_logger
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Entra ID group -> RLS role assignments
+_GROUP_TO_RLS_ROLE: Dict[str, str] = {
+    "PBI-Admin": "Admin",
+    "PBI-RolA": "RolA",
+    "PBI-RolB": "RolB",
+}
+
+# Entra ID group -> department filter, checked in priority order
+_GROUP_DEPARTMENT_FILTERS: Tuple[Tuple[str, str], ...] = (
+    ("PBI-RolA", "[Department] IN ('Sales', 'Marketing')"),
+    ("PBI-RolB", "[Department] IN ('Operations', 'Finance')"),
+)
+_DEFAULT_DEPARTMENT_FILTER = "[Department] = 'General'"
+
+# Application roles granted internal (non-public) data access
+_BASIC_ROLES: FrozenSet[str] = frozenset({"RolA", "RolB"})
+
+
+def _escape_dax(value: str) -> str:
+    """Escape a value for use inside a single-quoted DAX string literal"""
+    return value.replace("'", "''")
+
 
 class RLSRuleType(str, Enum):
     """Types of RLS rules"""
@@ -26,18 +55,30 @@ class RLSRuleType(str, Enum):
     CONDITIONAL = "conditional"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RLSRole:
     """RLS Role definition"""
     name: str
     description: str
     rule_expression: str
     rule_type: RLSRuleType
-    table_filters: List[str]
+    table_filters: Tuple[str, ...]
     is_active: bool = True
+    rule_type_value: str = field(init=False)
+    filter_config: Mapping[str, Any] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Plain string copy of rule_type.value for hot read paths
+        object.__setattr__(self, "rule_type_value", self.rule_type.value)
+        # Role filter entry, copied into each effective filter set that includes this role
+        object.__setattr__(self, "filter_config", MappingProxyType({
+            "expression": self.rule_expression,
+            "type": self.rule_type_value,
+            "tables": self.table_filters
+        }))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RLSUserMapping:
     """User to RLS role mapping"""
     user_email: str
@@ -47,6 +88,7 @@ class RLSUserMapping:
     effective_filters: Dict[str, Any]
     assigned_at: datetime
     assigned_by: str
+    groups_hash: int = 0
 
 
 class RLSService:
@@ -58,13 +100,29 @@ class RLSService:
         self.dataset_id = settings.fabric_dataset_id
         
         # RLS Configuration Cache
-        self._rls_roles_cache: Dict[str, RLSRole] = {}
-        self._user_mappings_cache: Dict[str, RLSUserMapping] = {}
-        self._dataset_security_cache: Dict[str, Dict[str, Any]] = {}
+        self._rls_roles_cache: Mapping[str, RLSRole] = MappingProxyType({})
+        self._user_mappings_cache: TTLCache[str, RLSUserMapping] = TTLCache(
+            maxsize=settings.rls_cache_max_size,
+            ttl=settings.rls_cache_ttl
+        )
+        self._dataset_security_cache: TTLCache[str, Dict[str, Any]] = TTLCache(
+            maxsize=256,
+            ttl=settings.rls_dataset_security_cache_ttl
+        )
+        
+        # Role-dependent filter fragments keyed by assigned role tuple (few distinct combinations)
+        self._role_filters_cache: Dict[Tuple[str, ...], Tuple[Mapping[str, Mapping[str, Any]], Tuple[str, ...]]] = {}
+        
+        # Shared HTTP client so PowerBI calls reuse pooled keep-alive connections;
+        # created on first HTTP call, inside the running event loop
+        self._http: Optional[httpx.AsyncClient] = None
         
         # Predefined RLS roles for the application
         self._initialize_default_roles()
         
+        # Drop cached mappings as soon as a user's Entra groups change
+        entra_auth_service.add_user_change_listener(self.invalidate_user)
+        
         logger.info("RLSService initialized with role-based security")
     
     def _initialize_default_roles(self) -> None:
@@ -76,7 +134,7 @@ class RLSService:
             description="Administrator role with full data access",
             rule_expression="1=1",  # Always true, no filtering
             rule_type=RLSRuleType.STATIC,
-            table_filters=[],
+            table_filters=(),
             is_active=True
         )
         
@@ -86,7 +144,7 @@ class RLSService:
             description="Role A users with access to Region A data",
             rule_expression="[Region] = \"A\"",
             rule_type=RLSRuleType.STATIC,
-            table_filters=["Sales", "Customers", "Products"],
+            table_filters=("Sales", "Customers", "Products"),
             is_active=True
         )
         
@@ -96,7 +154,7 @@ class RLSService:
             description="Role B users with access to Region B data",
             rule_expression="[Region] = \"B\"",
             rule_type=RLSRuleType.STATIC,
-            table_filters=["Sales", "Customers", "Products"],
+            table_filters=("Sales", "Customers", "Products"),
             is_active=True
         )
         
@@ -106,7 +164,7 @@ class RLSService:
             description="Dynamic role based on user attributes",
             rule_expression="[UserEmail] = USERPRINCIPALNAME()",
             rule_type=RLSRuleType.DYNAMIC,
-            table_filters=["UserAccess", "PersonalData"],
+            table_filters=("UserAccess", "PersonalData"),
             is_active=True
         )
         
@@ -116,14 +174,14 @@ class RLSService:
             description="Public role with limited data access",
             rule_expression="[IsPublic] = TRUE()",
             rule_type=RLSRuleType.STATIC,
-            table_filters=["PublicData"],
+            table_filters=("PublicData",),
             is_active=True
         )
         
-        # Store default roles
-        self._rls_roles_cache = {
-            role.name: role for role in [admin_role, role_a, role_b, dynamic_role, public_role]
-        }
+        # Store default roles (read-only after initialization)
+        self._rls_roles_cache = MappingProxyType({
+            role.name: role for role in (admin_role, role_a, role_b, dynamic_role, public_role)
+        })
         
         logger.debug(f"Initialized {len(self._rls_roles_cache)} default RLS roles")
     
@@ -139,12 +197,11 @@ class RLSService:
         """
         
         try:
-            # Check cache first
-            if user.id in self._user_mappings_cache:
-                cached_mapping = self._user_mappings_cache[user.id]
-                # Return cached if recent (within 15 minutes)
-                if (datetime.now() - cached_mapping.assigned_at).total_seconds() < 900:
-                    return cached_mapping
+            # Check cache first; a group hash mismatch means the cached mapping is stale
+            groups_hash = hash(tuple(sorted(user.groups)))
+            cached_mapping = self._user_mappings_cache.get(user.id)
+            if cached_mapping is not None and cached_mapping.groups_hash == groups_hash:
+                return cached_mapping
             
             # Generate new mapping
             assigned_roles = self._map_user_to_rls_roles(user)
@@ -157,11 +214,12 @@ class RLSService:
                 entra_groups=user.groups,
                 effective_filters=effective_filters,
                 assigned_at=datetime.now(),
-                assigned_by="system"
+                assigned_by="system",
+                groups_hash=groups_hash
             )
             
-            # Cache the mapping
-            self._user_mappings_cache[user.id] = mapping
+            # Cache the mapping for as long as its least stable role allows
+            self._user_mappings_cache.set(user.id, mapping, ttl=self._mapping_ttl(assigned_roles))
             
             # Log RLS assignment
             security_logger.log_data_access(
@@ -179,6 +237,24 @@ class RLSService:
             logger.error(f"Error generating RLS mapping for user {user.email}: {e}")
             raise
     
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop the cached RLS mapping for a user"""
+        self._user_mappings_cache.pop(user_id)
+    
+    def invalidate_role(self, role_name: str) -> None:
+        """Drop every cached RLS mapping that includes a role"""
+        # Role changes are rare, so a scan of the live mappings is cheaper to
+        # keep correct than a reverse index that expiry and eviction bypass
+        for user_id, mapping in self._user_mappings_cache.items():
+            if role_name in mapping.assigned_roles:
+                self._user_mappings_cache.pop(user_id)
+        logger.info(f"Invalidated cached RLS mappings for role {role_name}")
+    
+    def _mapping_ttl(self, assigned_roles: List[str]) -> int:
+        """Get cache TTL for a mapping from its roles (static roles live longer than dynamic ones)"""
+        overrides = settings.rls_ttl_overrides
+        return min(overrides.get(role, settings.rls_cache_ttl) for role in assigned_roles)
+    
     def _map_user_to_rls_roles(self, user: User) -> List[str]:
         """Map user's Entra ID groups to RLS roles"""
         
@@ -186,87 +262,86 @@ class RLSService:
         if user.is_admin:
             return ["Admin"]
         
-        # Map based on Entra ID groups
-        mapped_roles = []
-        
+        # Map based on Entra ID groups, removing duplicates while preserving order
+        mapped_roles: List[str] = []
+        seen: Set[str] = set()
         for group in user.groups:
-            if group == "PBI-Admin":
-                mapped_roles.append("Admin")
-            elif group == "PBI-RolA":
-                mapped_roles.append("RolA")
-            elif group == "PBI-RolB":
-                mapped_roles.append("RolB")
+            role = _GROUP_TO_RLS_ROLE.get(group)
+            if role is not None and role not in seen:
+                seen.add(role)
+                mapped_roles.append(role)
         
         # If no specific roles, assign Public role
-        if not mapped_roles:
-            mapped_roles.append("Public")
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(mapped_roles))
+        return mapped_roles or ["Public"]
     
     def _build_effective_filters(self, user: User, assigned_roles: List[str]) -> Dict[str, Any]:
         """Build effective filters based on assigned roles"""
         
+        role_filters, table_restrictions = self._get_role_filters(tuple(assigned_roles))
+        
         filters = {
             "user_context": {
                 "user_email": user.email,
                 "user_id": user.id,
                 "is_admin": user.is_admin
             },
-            "role_filters": {},
+            # Copied so callers cannot mutate the role entries shared across users
+            "role_filters": {name: dict(config) for name, config in role_filters.items()},
             "dynamic_filters": {},
-            "table_restrictions": []
+            "table_restrictions": list(table_restrictions)
         }
         
-        # Build filters for each assigned role
-        for role_name in assigned_roles:
-            if role_name in self._rls_roles_cache:
-                role = self._rls_roles_cache[role_name]
-                
-                filters["role_filters"][role_name] = {
-                    "expression": role.rule_expression,
-                    "type": role.rule_type.value,
-                    "tables": role.table_filters
-                }
-                
-                # Add table restrictions
-                filters["table_restrictions"].extend(role.table_filters)
-        
-        # Remove duplicate table restrictions
-        filters["table_restrictions"] = list(set(filters["table_restrictions"]))
-        
         # Add dynamic filters based on user attributes
         if not user.is_admin:
             filters["dynamic_filters"] = {
-                "user_email_filter": f"[UserEmail] = '{user.email}'",
+                "user_email_filter": f"[UserEmail] = '{_escape_dax(user.email)}'",
                 "user_department_filter": self._get_user_department_filter(user),
                 "access_level_filter": self._get_access_level_filter(user)
             }
         
         return filters
     
+    def _get_role_filters(self, roles_key: Tuple[str, ...]) -> Tuple[Mapping[str, Mapping[str, Any]], Tuple[str, ...]]:
+        """Get the role-dependent (user-independent) part of the effective filters, memoized per role set"""
+        
+        cached = self._role_filters_cache.get(roles_key)
+        if cached is not None:
+            return cached
+        
+        role_filters = {}
+        table_restrictions: Set[str] = set()
+        
+        # Build filters for each assigned role
+        for role_name in roles_key:
+            if role_name in self._rls_roles_cache:
+                role = self._rls_roles_cache[role_name]
+                
+                role_filters[role_name] = role.filter_config
+                
+                # Add table restrictions (deduplicated as they accumulate)
+                table_restrictions.update(role.table_filters)
+        
+        # Sorted so the restriction order is deterministic across runs
+        fragment = (MappingProxyType(role_filters), tuple(sorted(table_restrictions)))
+        self._role_filters_cache[roles_key] = fragment
+        return fragment
+    
     def _get_user_department_filter(self, user: User) -> str:
         """Generate department-based filter for user"""
         
         # In a real implementation, this would query user's department
-        # For now, derive from email domain or groups
-        
-        email_domain = user.email.split('@')[1] if '@' in user.email else ''
-        
-        # Example logic based on groups
-        if "PBI-RolA" in user.groups:
-            return "[Department] IN ('Sales', 'Marketing')"
-        elif "PBI-RolB" in user.groups:
-            return "[Department] IN ('Operations', 'Finance')"
-        else:
-            return "[Department] = 'General'"
+        # For now, derive from groups
+        for group, department_filter in _GROUP_DEPARTMENT_FILTERS:
+            if group in user.groups:
+                return department_filter
+        return _DEFAULT_DEPARTMENT_FILTER
     
     def _get_access_level_filter(self, user: User) -> str:
         """Generate access level filter for user"""
         
         if user.is_admin:
             return "1=1"  # No restrictions
-        elif any(role in ["RolA", "RolB"] for role in user.roles):
+        elif any(role in _BASIC_ROLES for role in user.roles):
             return "[AccessLevel] IN ('Public', 'Internal')"
         else:
             return "[AccessLevel] = 'Public'"
@@ -282,18 +357,21 @@ class RLSService:
             Validation results
         """
         
+        now = datetime.now()
+        
         try:
             target_dataset_id = dataset_id or self.dataset_id
             if not target_dataset_id:
                 raise ValueError("No dataset ID provided for RLS validation")
             
             # Get PowerBI access token
-            powerbi_token = await self._get_service_token()
+            powerbi_token = await powerbi_service.get_access_token()
             
             # Get dataset security information
             security_info = await self._get_dataset_security(target_dataset_id, powerbi_token)
             
             # Validate roles exist in dataset
+            dataset_role_by_name = {role.get('name', ''): role for role in security_info.get('roles', [])}
             dataset_roles = [role.get('name', '') for role in security_info.get('roles', [])]
             configured_roles = list(self._rls_roles_cache.keys())
             
@@ -302,28 +380,28 @@ class RLSService:
                 "validation_status": "passed",
                 "configured_roles": configured_roles,
                 "dataset_roles": dataset_roles,
-                "missing_roles": [role for role in configured_roles if role not in dataset_roles],
-                "extra_roles": [role for role in dataset_roles if role not in configured_roles],
+                "missing_roles": [role for role in configured_roles if role not in dataset_role_by_name],
+                "extra_roles": [role for role in dataset_roles if role not in self._rls_roles_cache],
                 "role_details": [],
                 "recommendations": [],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
             
             # Check each configured role
             for role_name, role_config in self._rls_roles_cache.items():
                 role_detail = {
                     "name": role_name,
-                    "exists_in_dataset": role_name in dataset_roles,
+                    "exists_in_dataset": role_name in dataset_role_by_name,
                     "configuration": {
                         "expression": role_config.rule_expression,
-                        "type": role_config.rule_type.value,
+                        "type": role_config.rule_type_value,
                         "tables": role_config.table_filters,
                         "is_active": role_config.is_active
                     }
                 }
                 
                 # Find matching dataset role
-                dataset_role = next((r for r in security_info.get('roles', []) if r.get('name') == role_name), None)
+                dataset_role = dataset_role_by_name.get(role_name)
                 if dataset_role:
                     role_detail["dataset_configuration"] = {
                         "members": dataset_role.get('members', []),
@@ -354,88 +432,100 @@ class RLSService:
                 "dataset_id": dataset_id,
                 "validation_status": "failed",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
     
-    async def get_rls_analytics(self) -> Dict[str, Any]:
+    async def get_rls_analytics(
+        self,
+        include_user_details: bool = False,
+        max_users_per_role: int = 100
+    ) -> Dict[str, Any]:
         """
         Get analytics about RLS usage and effectiveness
         
+        Args:
+            include_user_details: Include per-role user lists in "user_mappings"
+            max_users_per_role: Maximum users listed per role when details are included
+            
         Returns:
             RLS analytics and metrics
         """
         
+        now = datetime.now()
+        
         try:
-            # Calculate user distribution across roles
-            role_distribution = {}
-            user_count_by_role = {}
+            # Snapshot the live mappings once; all counts below are derived from this
+            # tuple so concurrent cache writes cannot skew or break the aggregation
+            mappings = tuple(self._user_mappings_cache.values())
             
-            for user_id, mapping in self._user_mappings_cache.items():
-                for role in mapping.assigned_roles:
-                    if role not in role_distribution:
-                        role_distribution[role] = []
-                        user_count_by_role[role] = 0
-                    
-                    role_distribution[role].append({
-                        "user_email": mapping.user_email,
-                        "assigned_at": mapping.assigned_at.isoformat(),
-                        "entra_groups": mapping.entra_groups
-                    })
-                    user_count_by_role[role] += 1
-            
-            # Calculate filter complexity
+            # Calculate user distribution across roles in a single pass over the mappings
+            role_distribution = {}
+            user_count_by_role = Counter()
+            last_cache_update = None
+            
+            for mapping in mappings:
+                user_count_by_role.update(mapping.assigned_roles)
+                if include_user_details:
+                    for role in mapping.assigned_roles:
+                        role_users = role_distribution.setdefault(role, [])
+                        if len(role_users) < max_users_per_role:
+                            role_users.append({
+                                "user_email": mapping.user_email,
+                                "assigned_at": mapping.assigned_at.isoformat(),
+                                "entra_groups": mapping.entra_groups
+                            })
+                if last_cache_update is None or mapping.assigned_at > last_cache_update:
+                    last_cache_update = mapping.assigned_at
+            
+            # Calculate filter complexity and role details in a single pass over the roles
             filter_complexity = {}
-            for role_name, role_config in self._rls_roles_cache.items():
-                complexity_score = len(role_config.table_filters)
-                if role_config.rule_type == RLSRuleType.DYNAMIC:
+            role_details = {}
+            for role_name, role in self._rls_roles_cache.items():
+                complexity_score = len(role.table_filters)
+                if role.rule_type == RLSRuleType.DYNAMIC:
                     complexity_score += 2
-                elif role_config.rule_type == RLSRuleType.CONDITIONAL:
+                elif role.rule_type == RLSRuleType.CONDITIONAL:
                     complexity_score += 1
                 
                 filter_complexity[role_name] = {
                     "score": complexity_score,
-                    "tables_affected": len(role_config.table_filters),
-                    "rule_type": role_config.rule_type.value
+                    "tables_affected": len(role.table_filters),
+                    "rule_type": role.rule_type_value
+                }
+                role_details[role_name] = {
+                    "description": role.description,
+                    "rule_expression": role.rule_expression,
+                    "rule_type": role.rule_type_value,
+                    "table_filters": role.table_filters,
+                    "is_active": role.is_active,
+                    "user_count": user_count_by_role[role_name],
+                    "complexity_score": complexity_score
                 }
             
             analytics = {
                 "summary": {
                     "total_configured_roles": len(self._rls_roles_cache),
-                    "total_active_users": len(self._user_mappings_cache),
-                    "most_used_role": max(user_count_by_role, key=user_count_by_role.get) if user_count_by_role else None,
-                    "least_used_role": min(user_count_by_role, key=user_count_by_role.get) if user_count_by_role else None
-                },
-                "role_distribution": user_count_by_role,
-                "role_details": {
-                    role_name: {
-                        "description": role.description,
-                        "rule_expression": role.rule_expression,
-                        "rule_type": role.rule_type.value,
-                        "table_filters": role.table_filters,
-                        "is_active": role.is_active,
-                        "user_count": user_count_by_role.get(role_name, 0),
-                        "complexity_score": filter_complexity.get(role_name, {}).get("score", 0)
-                    }
-                    for role_name, role in self._rls_roles_cache.items()
+                    "total_active_users": len(mappings),
+                    "most_used_role": user_count_by_role.most_common(1)[0][0] if user_count_by_role else None,
+                    "least_used_role": min(user_count_by_role.items(), key=itemgetter(1))[0] if user_count_by_role else None
                 },
+                "role_distribution": dict(user_count_by_role),
+                "role_details": role_details,
                 "user_mappings": role_distribution,
                 "filter_complexity": filter_complexity,
                 "performance_metrics": {
-                    "cache_size": len(self._user_mappings_cache),
+                    "cache_size": len(mappings),
                     "roles_cache_size": len(self._rls_roles_cache),
-                    "last_cache_update": max(
-                        (mapping.assigned_at for mapping in self._user_mappings_cache.values()),
-                        default=datetime.now()
-                    ).isoformat()
+                    "last_cache_update": (last_cache_update or now).isoformat()
                 },
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
             
             return analytics
             
         except Exception as e:
             logger.error(f"Error generating RLS analytics: {e}")
-            return {"error": str(e), "timestamp": datetime.now().isoformat()}
+            return {"error": str(e), "timestamp": now.isoformat()}
     
     async def test_rls_for_user(self, user: User, dataset_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -449,12 +539,20 @@ class RLSService:
             RLS test results
         """
         
+        now = datetime.now()
+        
         try:
-            # Get user's RLS mapping
-            mapping = await self.get_user_rls_mapping(user)
+            # Get user's RLS mapping and dataset validation concurrently (independent lookups)
+            mapping, validation = await asyncio.gather(
+                self.get_user_rls_mapping(user),
+                self.validate_rls_configuration(dataset_id),
+                return_exceptions=True
+            )
             
-            # Get dataset validation
-            validation = await self.validate_rls_configuration(dataset_id)
+            # Report the mapping failure first; a validation error must not hide it
+            for result in (mapping, validation):
+                if isinstance(result, Exception):
+                    raise result
             
             # Test each assigned role
             role_tests = []
@@ -486,7 +584,7 @@ class RLSService:
                 "role_tests": role_tests,
                 "overall_status": "pass" if all(test["test_status"] == "configured" for test in role_tests) else "fail",
                 "recommendations": self._generate_test_recommendations(mapping, validation),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
             
             logger.info(f"RLS test completed for user {user.email}: {test_result['overall_status']}")
@@ -498,24 +596,25 @@ class RLSService:
             return {
                 "error": str(e),
                 "user_email": user.email,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
     
+    # Expected-behavior descriptions for the default roles, keyed by role name
+    _BEHAVIOR_DESCRIPTIONS: Dict[str, Callable[[User], str]] = {
+        "Admin": lambda user: "User should see all data without any filtering restrictions",
+        "RolA": lambda user: "User should only see data where Region = 'A'",
+        "RolB": lambda user: "User should only see data where Region = 'B'",
+        "Dynamic": lambda user: f"User should only see data where UserEmail = '{user.email}'",
+        "Public": lambda user: "User should only see publicly available data",
+    }
+    
     def _describe_expected_behavior(self, role_config: RLSRole, user: User) -> str:
         """Describe what data the user should see with this role"""
         
-        if role_config.name == "Admin":
-            return "User should see all data without any filtering restrictions"
-        elif role_config.name == "RolA":
-            return "User should only see data where Region = 'A'"
-        elif role_config.name == "RolB":
-            return "User should only see data where Region = 'B'"
-        elif role_config.name == "Dynamic":
-            return f"User should only see data where UserEmail = '{user.email}'"
-        elif role_config.name == "Public":
-            return "User should only see publicly available data"
-        else:
-            return f"User should see data filtered by: {role_config.rule_expression}"
+        describe = self._BEHAVIOR_DESCRIPTIONS.get(role_config.name)
+        if describe is not None:
+            return describe(user)
+        return f"User should see data filtered by: {role_config.rule_expression}"
     
     def _generate_test_recommendations(self, mapping: RLSUserMapping, validation: Dict[str, Any]) -> List[str]:
         """Generate recommendations based on test results"""
@@ -537,54 +636,82 @@ class RLSService:
         
         return recommendations
     
-    async def _get_service_token(self) -> str:
-        """Get PowerBI service token"""
-        scope = "https://analysis.windows.net/powerbi/api/.default"
-        return await entra_auth_service.get_service_principal_token(scope)
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Get the shared httpx client, creating it on first use"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=20)
+            )
+        return self._http
     
     async def _get_dataset_security(self, dataset_id: str, powerbi_token: str) -> Dict[str, Any]:
         """Get dataset security configuration from PowerBI"""
         
-        if dataset_id in self._dataset_security_cache:
-            return self._dataset_security_cache[dataset_id]
+        cached_security = self._dataset_security_cache.get(dataset_id)
+        if cached_security is not None:
+            return cached_security
         
         try:
             # Try to get RLS roles from dataset
             url = f"{self.base_url}/groups/{self.workspace_id}/datasets/{dataset_id}/users"
             headers = {"Authorization": f"Bearer {powerbi_token}"}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=30)
-                
-                if response.status_code == 200:
-                    security_data = response.json()
-                    self._dataset_security_cache[dataset_id] = security_data
-                    return security_data
-                else:
-                    # Fallback - return empty structure
-                    logger.warning(f"Could not retrieve dataset security info: {response.status_code}")
-                    return {"roles": [], "users": []}
+            response = await self._get_http_client().get(url, headers=headers)
+            
+            if response.status_code == 200:
+                security_data = response.json()
+                self._dataset_security_cache[dataset_id] = security_data
+                return security_data
+            else:
+                # Fallback - return empty structure
+                logger.warning(f"Could not retrieve dataset security info: {response.status_code}")
+                return {"roles": [], "users": []}
                     
         except Exception as e:
             logger.warning(f"Error getting dataset security: {e}")
             return {"roles": [], "users": []}
 
 
-# Global service instance
-rls_service = RLSService()
+# Global service instance, created on first use so importing this module stays cheap
+_rls_service: Optional[RLSService] = None
+_rls_service_lock = threading.Lock()
+
+
+def get_rls_service() -> RLSService:
+    """Get the shared RLSService instance, creating it on first call"""
+    global _rls_service
+    if _rls_service is None:
+        with _rls_service_lock:
+            if _rls_service is None:
+                _rls_service = RLSService()
+    return _rls_service
+
+
+async def close_rls_service() -> None:
+    """Release the shared RLSService's HTTP connections if it was created"""
+    if _rls_service is not None:
+        await _rls_service.aclose()
 
 
 # Convenience functions
 async def get_user_rls_mapping(user: User) -> RLSUserMapping:
     """Get RLS mapping for user"""
-    return await rls_service.get_user_rls_mapping(user)
+    return await get_rls_service().get_user_rls_mapping(user)
 
 
 async def validate_rls_configuration(dataset_id: Optional[str] = None) -> Dict[str, Any]:
     """Validate RLS configuration"""
-    return await rls_service.validate_rls_configuration(dataset_id)
+    return await get_rls_service().validate_rls_configuration(dataset_id)
 
 
 async def test_user_rls(user: User, dataset_id: Optional[str] = None) -> Dict[str, Any]:
     """Test RLS for user"""
-    return await rls_service.test_rls_for_user(user, dataset_id)
\ No newline at end of file
+    return await get_rls_service().test_rls_for_user(user, dataset_id)
@@ -3,23 +3,29 @@ PowerBI Service for Microsoft Fabric Embedded Backend
 Handles PowerBI API integration, embed token generation, and report management
 """
 
+import asyncio
 import logging
 import json
-from typing import Dict, List, Optional, Any, Tuple
+import sys
+import time
+from typing import Dict, List, Optional, Any, Tuple, TypedDict
 from datetime import datetime, timedelta
 import httpx
+import orjson
 from dataclasses import dataclass
+from uuid import uuid4
 
 from ..auth.entra_auth import entra_auth_service
 from ..auth.models import User
 from ..config import get_settings
+from ..utils.helpers import CircuitBreaker, TTLCache
 from ..utils.logger import security_logger
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReportInfo:
     """Information about a PowerBI report"""
     id: str
@@ -29,7 +35,7 @@ class ReportInfo:
     workspace_id: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EmbedToken:
     """PowerBI embed token information"""
     token: str
@@ -40,6 +46,66 @@ class EmbedToken:
     target_workspaces: List[str]
 
 
+class ReportSummary(TypedDict):
+    """Report entry returned by get_reports_for_user"""
+    id: str
+    name: str
+    embed_url: str
+    dataset_id: Optional[str]
+    has_access: bool
+    user_roles: List[str]
+
+
+class DatasetSummary(TypedDict):
+    """Dataset entry returned by get_datasets_for_user"""
+    id: str
+    name: str
+    configured_by: Optional[str]
+    has_access: bool
+    user_roles: List[str]
+
+
+# Static embed settings shared by every embed configuration (never mutated)
+_EMBED_SETTINGS: Dict[str, Any] = {
+    "filterPaneEnabled": False,  # Disable filter pane for security
+    "navContentPaneEnabled": True,
+    "background": "transparent",
+    "visualSettings": {
+        "visualHeaders": {
+            "settings": {
+                "visible": True
+            }
+        }
+    }
+}
+
+
+# PowerBI HTTP timeouts: fail fast on connect/pool waits instead of holding requests for 30s
+_POWERBI_TIMEOUT = httpx.Timeout(10.0, connect=2.0, write=5.0, pool=1.0)
+
+
+# Static GenerateToken request fields
+_TOKEN_REQUEST_DEFAULTS: Dict[str, Any] = {
+    "allowSaveAs": False,  # Disable save as for security
+}
+if settings.embed_token_expiration_minutes:
+    _TOKEN_REQUEST_DEFAULTS["lifetimeInMinutes"] = settings.embed_token_expiration_minutes
+
+# Identities sent when no RLS applies (shared; only ever serialized)
+_NO_RLS_IDENTITIES: Tuple[Dict[str, Any], ...] = ()
+
+# Refresh the PowerBI access token this many seconds before Entra ID says it expires
+_POWERBI_TOKEN_REFRESH_MARGIN = 60
+
+# Seconds a user's report/dataset listing is reused before PowerBI is asked again
+_USER_LISTING_TTL = 60
+
+
+def _intern_optional(value: Optional[str]) -> Optional[str]:
+    """Intern a string that may be missing"""
+    return sys.intern(value) if value is not None else None
+
+
 class PowerBIServiceError(Exception):
     """Base exception for PowerBI service errors"""
     pass
@@ -58,16 +124,56 @@ class ReportAccessError(PowerBIServiceError):
 class PowerBIService:
     """Service for PowerBI API operations and embed token management"""
     
-    def __init__(self):
+    def __init__(self) -> None:
         self.base_url = settings.powerbi_api_url
         self.workspace_id = settings.fabric_workspace_id
         self.dataset_id = settings.fabric_dataset_id
         self.report_id = settings.fabric_report_id
         
-        # Cache for tokens and metadata
-        self._token_cache: Dict[str, EmbedToken] = {}
-        self._report_cache: Dict[str, ReportInfo] = {}
-        self._workspace_cache: Dict[str, Dict[str, Any]] = {}
+        # Cache for tokens and metadata (bounded; entries expire on their own).
+        # Evicting a live embed token makes validate_embed_token report it invalid,
+        # so the token cache is sized well above the expected number of live tokens
+        self._token_cache: TTLCache[str, EmbedToken] = TTLCache(
+            maxsize=50000,
+            ttl=(settings.embed_token_expiration_minutes or 60) * 60
+        )
+        self._report_cache: TTLCache[str, ReportInfo] = TTLCache(
+            maxsize=10000,
+            ttl=settings.cache_default_ttl
+        )
+        self._workspace_cache: TTLCache[str, Dict[str, Any]] = TTLCache(
+            maxsize=100,
+            ttl=settings.cache_default_ttl
+        )
+        # Per-user listings keyed by (user ID, role mask); cached values are shared, never mutated.
+        # Reports are kept both as a list and indexed by report ID
+        self._user_reports_cache: TTLCache[Tuple[str, int], Tuple[List[ReportSummary], Dict[str, ReportSummary]]] = TTLCache(
+            maxsize=10000,
+            ttl=_USER_LISTING_TTL
+        )
+        self._user_datasets_cache: TTLCache[Tuple[str, int], List[DatasetSummary]] = TTLCache(
+            maxsize=10000,
+            ttl=_USER_LISTING_TTL
+        )
+        
+        # Service principal token for the PowerBI API, refreshed by one task at a time
+        self._powerbi_token: Optional[str] = None
+        self._powerbi_token_expires_at: float = 0.0
+        self._powerbi_headers: Dict[str, str] = {}
+        self._powerbi_token_lock = asyncio.Lock()
+        
+        # In-flight embed token generations keyed by (user, report, dataset, access level)
+        self._inflight_embed_requests: Dict[Tuple[str, ...], "asyncio.Future[Dict[str, Any]]"] = {}
+        # In-flight report listings keyed like _user_reports_cache
+        self._inflight_report_listings: Dict[
+            Tuple[str, int], "asyncio.Future[Tuple[List[ReportSummary], Dict[str, ReportSummary]]]"
+        ] = {}
+        
+        # Shared HTTP client so PowerBI calls reuse pooled keep-alive connections
+        self._http: Optional[httpx.AsyncClient] = None
+        
+        # Stop calling PowerBI for a while after repeated failures
+        self._circuit = CircuitBreaker(fail_max=5, reset_timeout=30)
         
         logger.info("PowerBIService initialized", extra={
             'workspace_id': self.workspace_id,
@@ -98,6 +204,28 @@ class PowerBIService:
             ReportAccessError: If user doesn't have access to the report
         """
         
+        # Identical concurrent requests share one in-flight generation
+        key = (user.email, report_id or self.report_id, dataset_id or self.dataset_id, access_level)
+        inflight = self._inflight_embed_requests.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(
+                self._generate_embed_config(user, report_id, dataset_id, access_level)
+            )
+            self._inflight_embed_requests[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight_embed_requests.pop(key, None))
+        
+        # Shielded so one cancelled caller does not cancel the generation for the others
+        return await asyncio.shield(inflight)
+    
+    async def _generate_embed_config(
+        self,
+        user: User,
+        report_id: Optional[str],
+        dataset_id: Optional[str],
+        access_level: str
+    ) -> Dict[str, Any]:
+        """Generate the embed configuration for a single generate_embed_token request"""
+        
         try:
             # Use provided IDs or defaults
             target_report_id = report_id or self.report_id
@@ -106,24 +234,40 @@ class PowerBIService:
             if not target_report_id:
                 raise TokenGenerationError("No report ID specified and no default configured")
             
+            # Validate user access to report (based on the user's roles, not report metadata)
+            if not self._validate_user_access(user, target_report_id):
+                raise ReportAccessError(f"User {user.email} does not have access to report {target_report_id}")
+            
             # Get PowerBI access token
             powerbi_token = await self._get_powerbi_access_token()
             
-            # Get report information
-            report_info = await self._get_report_info(target_report_id, powerbi_token)
-            
-            # Validate user access to report
-            if not self._validate_user_access(user, report_info):
-                raise ReportAccessError(f"User {user.email} does not have access to report {target_report_id}")
-            
-            # Generate embed token with RLS
-            embed_token = await self._generate_embed_token_with_rls(
-                user=user,
-                report_info=report_info,
-                dataset_id=target_dataset_id,
-                access_level=access_level,
-                powerbi_token=powerbi_token
-            )
+            report_info = self._report_cache.get(target_report_id)
+            if report_info is None and target_dataset_id:
+                # The token request only needs the report metadata to find the dataset,
+                # so with a known dataset both PowerBI calls can run concurrently
+                report_info, embed_token = await asyncio.gather(
+                    self._get_report_info(target_report_id, powerbi_token),
+                    self._generate_embed_token_with_rls(
+                        user=user,
+                        report_id=target_report_id,
+                        dataset_id=target_dataset_id,
+                        access_level=access_level,
+                        powerbi_token=powerbi_token
+                    )
+                )
+            else:
+                # Get report information
+                if report_info is None:
+                    report_info = await self._get_report_info(target_report_id, powerbi_token)
+                
+                # Generate embed token with RLS
+                embed_token = await self._generate_embed_token_with_rls(
+                    user=user,
+                    report_id=report_info.id,
+                    dataset_id=target_dataset_id or report_info.dataset_id,
+                    access_level=access_level,
+                    powerbi_token=powerbi_token
+                )
             
             # Create embed configuration
             embed_config = self._create_embed_config(
@@ -140,17 +284,17 @@ class PowerBIService:
                 token_expiration=embed_token.expiration
             )
             
-            logger.info(f"Embed token generated for user {user.email}, report {target_report_id}")
+            logger.info("Embed token generated for user %s, report %s", user.email, target_report_id)
             
             return embed_config
             
         except (TokenGenerationError, ReportAccessError):
             raise
         except Exception as e:
-            logger.error(f"Unexpected error generating embed token: {e}")
+            logger.error("Unexpected error generating embed token: %s", e)
             raise TokenGenerationError(f"Token generation failed: {str(e)}")
     
-    async def get_reports_for_user(self, user: User) -> List[Dict[str, Any]]:
+    async def get_reports_for_user(self, user: User) -> List[ReportSummary]:
         """
         Get list of reports accessible to the user
         
@@ -161,6 +305,68 @@ class PowerBIService:
             List of report information that user can access
         """
         
+        reports, _ = await self._get_user_reports(user)
+        return reports
+    
+    async def get_report_by_id(self, user: User, report_id: str) -> Optional[ReportSummary]:
+        """
+        Get one report accessible to the user
+        
+        Args:
+            user: Authenticated user
+            report_id: PowerBI report identifier
+            
+        Returns:
+            The report summary, or None if the user cannot access it
+        """
+        
+        _, reports_by_id = await self._get_user_reports(user)
+        return reports_by_id.get(report_id)
+    
+    async def user_can_access_report(self, user: User, report_id: str) -> bool:
+        """
+        Check whether the user can access a report
+        
+        Admins can access every report in the workspace, so they are answered
+        without looking the report up; everyone else is checked against their
+        cached report index.
+        """
+        
+        if user.is_admin:
+            return True
+        return await self.get_report_by_id(user, report_id) is not None
+    
+    async def _get_user_reports(self, user: User) -> Tuple[List[ReportSummary], Dict[str, ReportSummary]]:
+        """Get the user's accessible reports as a list and indexed by report ID"""
+        
+        # Access is role-based and the same for every report, so public users
+        # are answered without calling PowerBI
+        if not self._validate_user_access(user):
+            logger.debug("Found 0 accessible reports for user %s", user.email)
+            return [], {}
+        
+        cache_key = (user.id, user.role_mask)
+        cached_reports = self._user_reports_cache.get(cache_key)
+        if cached_reports is not None:
+            return cached_reports
+        
+        # Concurrent requests for the same listing share one PowerBI call
+        inflight = self._inflight_report_listings.get(cache_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load_user_reports(user, cache_key))
+            self._inflight_report_listings[cache_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight_report_listings.pop(cache_key, None))
+        
+        # Shielded so one cancelled caller does not cancel the listing for the others
+        return await asyncio.shield(inflight)
+    
+    async def _load_user_reports(
+        self,
+        user: User,
+        cache_key: Tuple[str, int]
+    ) -> Tuple[List[ReportSummary], Dict[str, ReportSummary]]:
+        """Fetch the user's accessible reports from PowerBI and cache them"""
+        
         try:
             # Get PowerBI access token
             powerbi_token = await self._get_powerbi_access_token()
@@ -168,27 +374,31 @@ class PowerBIService:
             # Get all reports in workspace
             reports = await self._get_workspace_reports(powerbi_token)
             
-            # Filter reports based on user access
-            accessible_reports = []
-            for report in reports:
-                if self._validate_user_access(user, report):
-                    accessible_reports.append({
-                        'id': report['id'],
-                        'name': report['name'],
-                        'embed_url': report['embedUrl'],
-                        'dataset_id': report.get('datasetId'),
-                        'has_access': True,
-                        'user_roles': user.powerbi_roles
-                    })
-            
-            logger.debug(f"Found {len(accessible_reports)} accessible reports for user {user.email}")
-            return accessible_reports
+            # Every user's cached listing repeats the same workspace strings, so they
+            # are interned to keep one copy per process instead of one per user
+            user_roles = user.powerbi_roles
+            accessible_reports: List[ReportSummary] = [
+                {
+                    'id': sys.intern(report['id']),
+                    'name': sys.intern(report['name']),
+                    'embed_url': sys.intern(report['embedUrl']),
+                    'dataset_id': _intern_optional(report.get('datasetId')),
+                    'has_access': True,
+                    'user_roles': user_roles
+                }
+                for report in reports
+            ]
+            listing = (accessible_reports, {report['id']: report for report in accessible_reports})
+            self._user_reports_cache[cache_key] = listing
+            
+            logger.debug("Found %s accessible reports for user %s", len(accessible_reports), user.email)
+            return listing
             
         except Exception as e:
-            logger.error(f"Error getting reports for user: {e}")
+            logger.error("Error getting reports for user: %s", e)
             raise PowerBIServiceError(f"Failed to get reports: {str(e)}")
     
-    async def get_datasets_for_user(self, user: User) -> List[Dict[str, Any]]:
+    async def get_datasets_for_user(self, user: User) -> List[DatasetSummary]:
         """
         Get list of datasets accessible to the user
         
@@ -199,6 +409,11 @@ class PowerBIService:
             List of dataset information that user can access
         """
         
+        cache_key = (user.id, user.role_mask)
+        cached_datasets = self._user_datasets_cache.get(cache_key)
+        if cached_datasets is not None:
+            return cached_datasets
+        
         try:
             # Get PowerBI access token
             powerbi_token = await self._get_powerbi_access_token()
@@ -208,23 +423,33 @@ class PowerBIService:
             
             # For simplicity, assume user can access datasets if they can access reports
             # In a real implementation, you might have dataset-specific permissions
-            accessible_datasets = []
-            for dataset in datasets:
-                accessible_datasets.append({
-                    'id': dataset['id'],
-                    'name': dataset['name'],
-                    'configured_by': dataset.get('configuredBy'),
+            user_roles = user.powerbi_roles
+            accessible_datasets: List[DatasetSummary] = [
+                {
+                    'id': sys.intern(dataset['id']),
+                    'name': sys.intern(dataset['name']),
+                    'configured_by': _intern_optional(dataset.get('configuredBy')),
                     'has_access': True,
-                    'user_roles': user.powerbi_roles
-                })
+                    'user_roles': user_roles
+                }
+                for dataset in datasets
+            ]
+            
+            self._user_datasets_cache[cache_key] = accessible_datasets
             
-            logger.debug(f"Found {len(accessible_datasets)} accessible datasets for user {user.email}")
+            logger.debug("Found %s accessible datasets for user %s", len(accessible_datasets), user.email)
             return accessible_datasets
             
         except Exception as e:
-            logger.error(f"Error getting datasets for user: {e}")
+            logger.error("Error getting datasets for user: %s", e)
             raise PowerBIServiceError(f"Failed to get datasets: {str(e)}")
     
+    def invalidate_user_listings(self) -> None:
+        """Drop every cached per-user report and dataset listing"""
+        self._user_reports_cache.clear()
+        self._user_datasets_cache.clear()
+        logger.info("Per-user PowerBI listings invalidated")
+    
     async def validate_embed_token(self, token_id: str) -> bool:
         """
         Validate if an embed token is still valid
@@ -236,16 +461,8 @@ class PowerBIService:
             True if token is valid, False otherwise
         """
         
-        # Check cache first
-        if token_id in self._token_cache:
-            cached_token = self._token_cache[token_id]
-            if datetime.now() < cached_token.expiration:
-                return True
-            else:
-                # Remove expired token from cache
-                del self._token_cache[token_id]
-        
-        return False
+        # Cached tokens expire from the cache together with the token itself
+        return token_id in self._token_cache
     
     async def revoke_embed_token(self, token_id: str) -> bool:
         """
@@ -258,62 +475,181 @@ class PowerBIService:
             True if token was revoked, False if not found
         """
         
-        if token_id in self._token_cache:
-            del self._token_cache[token_id]
-            logger.info(f"Embed token revoked: {token_id}")
+        if self._token_cache.pop(token_id) is not None:
+            logger.info("Embed token revoked: %s", token_id)
             return True
         
         return False
     
+    def revoke_all_embed_tokens(self) -> int:
+        """
+        Revoke every cached embed token
+        
+        Returns:
+            Number of live tokens that were revoked
+        """
+        
+        token_count = self.active_token_count
+        self._token_cache.clear()
+        return token_count
+    
+    def has_valid_service_token(self, margin: float = 30.0) -> bool:
+        """Whether a cached PowerBI access token is valid for at least margin more seconds"""
+        return bool(self._powerbi_token) and time.monotonic() + margin < self._powerbi_token_expires_at
+    
+    @property
+    def active_token_count(self) -> int:
+        """Number of embed tokens issued by this process that have not expired or been revoked"""
+        return len(self._token_cache)
+    
+    async def init(self) -> None:
+        """Open the pooled PowerBI HTTP client; called once from the application lifespan"""
+        self._get_http_client()
+        logger.info("PowerBI HTTP client pool opened")
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared httpx client, creating it on first use
+        
+        The PowerBI REST API has no JSON batching endpoint like Microsoft Graph's
+        $batch. Independent calls are instead issued concurrently, and HTTP/2 lets
+        them share a single pooled connection and TLS session.
+        """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=_POWERBI_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+            )
+        return self._http
+    
+    @property
+    def circuit_state(self) -> str:
+        """State of the PowerBI API circuit breaker ("closed", "open" or "half-open")"""
+        return self._circuit.state
+    
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a PowerBI API request through the circuit breaker
+        
+        Transport errors, throttling (429) and server errors count as failures;
+        while the circuit is open requests fail immediately. A PoolTimeout means
+        our own connection pool is saturated, not that PowerBI is unhealthy, so
+        it is not recorded.
+        
+        Raises:
+            PowerBIServiceError: If the circuit is open
+        """
+        if not self._circuit.allow_request():
+            raise PowerBIServiceError("PowerBI API temporarily unavailable (circuit open)")
+        
+        try:
+            response = await self._get_http_client().request(method, url, **kwargs)
+        except httpx.PoolTimeout:
+            raise
+        except httpx.TransportError:
+            self._circuit.record_failure()
+            raise
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            self._circuit.record_failure()
+        else:
+            self._circuit.record_success()
+        return response
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def get_access_token(self) -> str:
+        """Get the shared PowerBI API access token for the service principal"""
+        return await self._get_powerbi_access_token()
+    
     async def _get_powerbi_access_token(self) -> str:
-        """Get access token for PowerBI API"""
+        """
+        Get access token for PowerBI API
+        
+        The token is cached until shortly before the expiry reported by Entra ID,
+        or for cache_token_ttl seconds if no expiry was reported.
+        """
+        
+        if self._powerbi_token and time.monotonic() < self._powerbi_token_expires_at:
+            return self._powerbi_token
         
         try:
-            # Use service principal to get PowerBI token
-            scope = "https://analysis.windows.net/powerbi/api/.default"
-            token = await entra_auth_service.get_service_principal_token(scope)
-            
-            logger.debug("PowerBI access token acquired")
-            return token
+            async with self._powerbi_token_lock:
+                # Another task may have refreshed the token while this one waited
+                if self._powerbi_token and time.monotonic() < self._powerbi_token_expires_at:
+                    return self._powerbi_token
+                
+                # Use service principal to get PowerBI token
+                scope = "https://analysis.windows.net/powerbi/api/.default"
+                token, expires_in = await entra_auth_service.get_service_principal_token_with_expiry(scope)
+                
+                lifetime = (
+                    expires_in - _POWERBI_TOKEN_REFRESH_MARGIN
+                    if expires_in is not None
+                    else settings.cache_token_ttl
+                )
+                
+                self._powerbi_token = token
+                self._powerbi_headers = self._build_auth_headers(token)
+                self._powerbi_token_expires_at = time.monotonic() + lifetime
+                
+                logger.debug("PowerBI access token acquired")
+                return token
             
         except Exception as e:
-            logger.error(f"Failed to get PowerBI access token: {e}")
+            logger.error("Failed to get PowerBI access token: %s", e)
             raise TokenGenerationError(f"Failed to acquire PowerBI access token: {str(e)}")
     
+    @staticmethod
+    def _build_auth_headers(powerbi_token: str) -> Dict[str, str]:
+        """Build PowerBI API request headers for an access token"""
+        return {
+            "Authorization": f"Bearer {powerbi_token}",
+            "Content-Type": "application/json"
+        }
+    
+    def _auth_headers(self, powerbi_token: str) -> Dict[str, str]:
+        """Get request headers for a token, reusing the ones built when it was cached"""
+        if powerbi_token == self._powerbi_token:
+            return self._powerbi_headers
+        return self._build_auth_headers(powerbi_token)
+    
     async def _get_report_info(self, report_id: str, powerbi_token: str) -> ReportInfo:
         """Get report information from PowerBI API"""
         
         # Check cache first
-        if report_id in self._report_cache:
-            return self._report_cache[report_id]
+        cached_report = self._report_cache.get(report_id)
+        if cached_report is not None:
+            return cached_report
         
         try:
             url = f"{self.base_url}/groups/{self.workspace_id}/reports/{report_id}"
-            headers = {
-                "Authorization": f"Bearer {powerbi_token}",
-                "Content-Type": "application/json"
-            }
+            headers = self._auth_headers(powerbi_token)
+            
+            response = await self._send("GET", url, headers=headers)
+            response.raise_for_status()
+            
+            report_data = orjson.loads(response.content)
+            
+            report_info = ReportInfo(
+                id=report_data['id'],
+                name=report_data['name'],
+                embed_url=report_data['embedUrl'],
+                dataset_id=report_data.get('datasetId', ''),
+                workspace_id=self.workspace_id
+            )
+            
+            # Cache report info
+            self._report_cache[report_id] = report_info
+            
+            logger.debug("Retrieved report info for: %s", report_id)
+            return report_info
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                report_data = response.json()
-                
-                report_info = ReportInfo(
-                    id=report_data['id'],
-                    name=report_data['name'],
-                    embed_url=report_data['embedUrl'],
-                    dataset_id=report_data.get('datasetId', ''),
-                    workspace_id=self.workspace_id
-                )
-                
-                # Cache report info
-                self._report_cache[report_id] = report_info
-                
-                logger.debug(f"Retrieved report info for: {report_id}")
-                return report_info
-                
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 raise PowerBIServiceError(f"Report not found: {report_id}")
@@ -322,80 +658,69 @@ class PowerBIService:
             else:
                 raise PowerBIServiceError(f"Failed to get report info: {e}")
         except Exception as e:
-            logger.error(f"Error getting report info: {e}")
+            logger.error("Error getting report info: %s", e)
             raise PowerBIServiceError(f"Failed to get report info: {str(e)}")
     
     async def _generate_embed_token_with_rls(
         self,
         user: User,
-        report_info: ReportInfo,
-        dataset_id: Optional[str],
+        report_id: str,
+        dataset_id: str,
         access_level: str,
         powerbi_token: str
     ) -> EmbedToken:
         """Generate embed token with Row Level Security"""
         
         try:
-            url = f"{self.base_url}/groups/{self.workspace_id}/reports/{report_info.id}/GenerateToken"
-            headers = {
-                "Authorization": f"Bearer {powerbi_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Prepare RLS identity
-            rls_identities = []
-            
-            # Map user's PowerBI roles to RLS
-            effective_roles = user.powerbi_roles
-            if effective_roles and not user.is_admin:  # Admin sees all data without RLS
-                rls_identities.append({
-                    "username": user.email,
-                    "roles": effective_roles,
-                    "datasets": [dataset_id or report_info.dataset_id]
-                })
-            
-            # Prepare token request
+            url = f"{self.base_url}/groups/{self.workspace_id}/reports/{report_id}/GenerateToken"
+            headers = self._auth_headers(powerbi_token)
+            
+            # Prepare RLS identity (Admin sees all data without RLS)
+            rls_identities = _NO_RLS_IDENTITIES
+            if not user.is_admin:
+                # Map user's PowerBI roles to RLS
+                effective_roles = user.powerbi_roles
+                if effective_roles:
+                    rls_identities = [{
+                        "username": user.email,
+                        "roles": effective_roles,
+                        "datasets": [dataset_id]
+                    }]
+            
+            # Prepare token request on top of the static defaults
             token_request = {
+                **_TOKEN_REQUEST_DEFAULTS,
                 "accessLevel": access_level,
-                "datasetId": dataset_id or report_info.dataset_id,
-                "allowSaveAs": False,  # Disable save as for security
+                "datasetId": dataset_id,
                 "identities": rls_identities
             }
-            
-            # Add lifetime (optional)
             token_lifetime = settings.embed_token_expiration_minutes
-            if token_lifetime:
-                token_request["lifetimeInMinutes"] = token_lifetime
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url, 
-                    headers=headers, 
-                    json=token_request, 
-                    timeout=30
-                )
-                response.raise_for_status()
-                
-                token_data = response.json()
-                
-                # Calculate expiration time
-                expiration = datetime.now() + timedelta(minutes=token_lifetime or 60)
-                
-                embed_token = EmbedToken(
-                    token=token_data['token'],
-                    token_id=token_data.get('tokenId', f"token_{datetime.now().timestamp()}"),
-                    expiration=expiration,
-                    reports=[report_info.id],
-                    datasets=[dataset_id or report_info.dataset_id],
-                    target_workspaces=[self.workspace_id]
-                )
-                
-                # Cache token
-                self._token_cache[embed_token.token_id] = embed_token
-                
-                logger.debug(f"Generated embed token with RLS for user {user.email}")
-                return embed_token
-                
+            
+            response = await self._send("POST", url, headers=headers, content=orjson.dumps(token_request))
+            response.raise_for_status()
+            
+            token_data = orjson.loads(response.content)
+            
+            # Calculate expiration once: the wall-clock time is only reported to the
+            # client, validity checks use the cache's monotonic deadline
+            lifetime_seconds = (token_lifetime or 60) * 60
+            expiration = datetime.now() + timedelta(seconds=lifetime_seconds)
+            
+            embed_token = EmbedToken(
+                token=token_data['token'],
+                token_id=token_data.get('tokenId') or uuid4().hex,
+                expiration=expiration,
+                reports=[report_id],
+                datasets=[dataset_id],
+                target_workspaces=[self.workspace_id]
+            )
+            
+            # Cache token
+            self._token_cache.set(embed_token.token_id, embed_token, ttl=lifetime_seconds)
+            
+            logger.debug("Generated embed token with RLS for user %s", user.email)
+            return embed_token
+            
         except httpx.HTTPStatusError as e:
             error_detail = "Unknown error"
             try:
@@ -404,11 +729,11 @@ class PowerBIService:
             except:
                 error_detail = str(e)
             
-            logger.error(f"PowerBI API error generating token: {error_detail}")
+            logger.error("PowerBI API error generating token: %s", error_detail)
             raise TokenGenerationError(f"PowerBI API error: {error_detail}")
             
         except Exception as e:
-            logger.error(f"Error generating embed token: {e}")
+            logger.error("Error generating embed token: %s", e)
             raise TokenGenerationError(f"Token generation failed: {str(e)}")
     
     async def _get_workspace_reports(self, powerbi_token: str) -> List[Dict[str, Any]]:
@@ -416,23 +741,19 @@ class PowerBIService:
         
         try:
             url = f"{self.base_url}/groups/{self.workspace_id}/reports"
-            headers = {
-                "Authorization": f"Bearer {powerbi_token}",
-                "Content-Type": "application/json"
-            }
+            headers = self._auth_headers(powerbi_token)
+            
+            response = await self._send("GET", url, headers=headers)
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            reports = data.get('value', [])
+            
+            logger.debug("Retrieved %s reports from workspace", len(reports))
+            return reports
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                reports = data.get('value', [])
-                
-                logger.debug(f"Retrieved {len(reports)} reports from workspace")
-                return reports
-                
         except Exception as e:
-            logger.error(f"Error getting workspace reports: {e}")
+            logger.error("Error getting workspace reports: %s", e)
             raise PowerBIServiceError(f"Failed to get workspace reports: {str(e)}")
     
     async def _get_workspace_datasets(self, powerbi_token: str) -> List[Dict[str, Any]]:
@@ -440,26 +761,22 @@ class PowerBIService:
         
         try:
             url = f"{self.base_url}/groups/{self.workspace_id}/datasets"
-            headers = {
-                "Authorization": f"Bearer {powerbi_token}",
-                "Content-Type": "application/json"
-            }
+            headers = self._auth_headers(powerbi_token)
+            
+            response = await self._send("GET", url, headers=headers)
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            datasets = data.get('value', [])
+            
+            logger.debug("Retrieved %s datasets from workspace", len(datasets))
+            return datasets
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                data = response.json()
-                datasets = data.get('value', [])
-                
-                logger.debug(f"Retrieved {len(datasets)} datasets from workspace")
-                return datasets
-                
         except Exception as e:
-            logger.error(f"Error getting workspace datasets: {e}")
+            logger.error("Error getting workspace datasets: %s", e)
             raise PowerBIServiceError(f"Failed to get workspace datasets: {str(e)}")
     
-    def _validate_user_access(self, user: User, report_info: Any) -> bool:
+    def _validate_user_access(self, user: User, report_id: Optional[str] = None) -> bool:
         """
         Validate if user has access to a report
         
@@ -467,16 +784,9 @@ class PowerBIService:
         more complex rules based on report metadata, user attributes, etc.
         """
         
-        # Admin users have access to everything
-        if user.is_admin:
-            return True
-        
-        # Users with roles have access (RLS will filter the data)
-        if user.roles and any(role != "Public" for role in user.roles):
-            return True
-        
-        # Public users have no access
-        return False
+        # Admins and users with non-public roles have access (RLS will filter the data);
+        # public users have no access
+        return user.has_nonpublic_role
     
     def _create_embed_config(
         self, 
@@ -493,18 +803,7 @@ class PowerBIService:
             "accessToken": embed_token.token,
             "tokenType": "Embed",
             "permissions": "View",  # Could be dynamic based on user
-            "settings": {
-                "filterPaneEnabled": False,  # Disable filter pane for security
-                "navContentPaneEnabled": True,
-                "background": "transparent",
-                "visualSettings": {
-                    "visualHeaders": {
-                        "settings": {
-                            "visible": True
-                        }
-                    }
-                }
-            },
+            "settings": _EMBED_SETTINGS,
             "datasetBinding": {
                 "datasetId": report_info.dataset_id
             },
@@ -522,16 +821,16 @@ powerbi_service = PowerBIService()
 
 
 # Convenience functions
-async def generate_embed_token(user: User, report_id: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+async def generate_embed_token(user: User, report_id: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
     """Generate embed token for user"""
     return await powerbi_service.generate_embed_token(user, report_id, **kwargs)
 
 
-async def get_user_reports(user: User) -> List[Dict[str, Any]]:
+async def get_user_reports(user: User) -> List[ReportSummary]:
     """Get reports accessible to user"""
     return await powerbi_service.get_reports_for_user(user)
 
 
-async def get_user_datasets(user: User) -> List[Dict[str, Any]]:
+async def get_user_datasets(user: User) -> List[DatasetSummary]:
     """Get datasets accessible to user"""
     return await powerbi_service.get_datasets_for_user(user)
\ No newline at end of file
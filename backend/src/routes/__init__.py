@@ -0,0 +1,14 @@
+"""
+API routes module
+Contains all FastAPI route definitions
+"""
+
+from .auth_routes import router as auth_router
+from .powerbi_routes import router as powerbi_router  
+from .admin_routes import router as admin_router
+
+__all__ = [
+    'auth_router',
+    'powerbi_router',
+    'admin_router'
+]
@@ -3,122 +3,265 @@ Admin routes for Microsoft Fabric Embedded Backend
 Handles administrative functions, user management, and system monitoring
 """
 
+import asyncio
+import base64
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+import orjson
 
 from ..auth.middleware import get_current_user_from_request, require_admin
 from ..auth.models import User, UserListResponse, UserResponse, GroupMembershipRequest
-from ..auth.entra_auth import entra_auth_service
+from ..auth.entra_auth import entra_auth_service, EntraAuthError, UserNotFoundError
+from ..auth.user_repository import user_repository
 from ..powerbi.service import powerbi_service
 from ..utils.logger import security_logger
-from ..config import get_settings
+from ..utils.helpers import TTLCache, conditional_response, weak_etag
+from ..config import get_settings, is_development
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_UPTIME_START = time.monotonic()
+
+# Short-lived cache of PowerBI workspace statistics shown on the dashboard and
+# health pages, keyed by workspace. Cleared by the "clear_cache" maintenance task.
+_powerbi_stats_cache: TTLCache = TTLCache(maxsize=8, ttl=60)
+
+_NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Maintenance tasks run when the request doesn't name any
+_DEFAULT_MAINTENANCE_TASKS = ("clear_cache", "refresh_tokens", "cleanup_logs")
+
+# Maximum number of maintenance tasks run at the same time
+_MAINTENANCE_CONCURRENCY = 4
+
+# Cache-Control for admin endpoints that monitoring clients poll
+_POLLING_CACHE_CONTROL = "private, max-age=10"
+
+# Roles an administrator may assign
+VALID_ROLES = frozenset({"Admin", "RolA", "RolB", "Public"})
+
+# Security audit event types that can be filtered on
+EVENT_TYPES = frozenset({
+    "USER_LOGIN",
+    "USER_LOGIN_FAILED",
+    "TOKEN_GENERATED",
+    "UNAUTHORIZED_ACCESS",
+    "ADMIN_ACTION",
+    "DATA_ACCESS",
+    "PERMISSION_CHANGE",
+    "SECURITY_VIOLATION"
+})
+_SORTED_EVENT_TYPES = tuple(sorted(EVENT_TYPES))
+
+
+# Dashboard fields that are fixed for the lifetime of the process
+_SYSTEM_INFO = {
+    "application_name": settings.app_name,
+    "version": settings.version,
+    "environment": settings.environment
+}
+_POWERBI_STATIC = {
+    "workspace_id": settings.fabric_workspace_id,
+    "token_expiration_minutes": settings.embed_token_expiration_minutes
+}
+# Shared by every dashboard response; only ever serialized, never mutated
+_DASHBOARD_USER_STATISTICS = {
+    "total_users": 1,  # In real app, would query database
+    "active_sessions": 1,
+    "admin_users": 1,
+    "role_distribution": {
+        "Admin": 1,
+        "RolA": 0,
+        "RolB": 0,
+        "Public": 0
+    }
+}
+_DASHBOARD_SECURITY_METRICS = {
+    "failed_login_attempts_24h": 0,  # Would query logs
+    "successful_logins_24h": 1,
+    "admin_actions_24h": 1,
+    "tokens_generated_24h": 0
+}
+
+
+def _uptime_hours() -> int:
+    """Whole hours since this module was loaded"""
+    return int((time.monotonic() - _UPTIME_START) / 3600)
+
+
+def _iter_audit_events(
+    events: List[Dict[str, Any]],
+    after: Optional[Tuple[datetime, str]],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    event_types: Optional[set],
+    user_id: Optional[str],
+    user_id_prefix: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """Yield audit events matching the filters, newest first"""
+    for event in sorted(events, key=lambda e: (e["timestamp"], e["id"]), reverse=True):
+        if after is not None and (event["timestamp"], event["id"]) >= after:
+            continue
+        if start_date and event["timestamp"] < start_date:
+            continue
+        if end_date and event["timestamp"] > end_date:
+            continue
+        if event_types is not None and event["event_type"] not in event_types:
+            continue
+        if user_id and event["user_id"] != user_id:
+            continue
+        if user_id_prefix and not event["user_id"].startswith(user_id_prefix):
+            continue
+        yield event
+
+
+async def _stream_audit_events(events: Iterator[Dict[str, Any]], limit: int) -> AsyncIterator[bytes]:
+    """Write up to limit events as NDJSON, ending with a next_cursor line if more remain"""
+    last = None
+    for count, event in enumerate(events):
+        if count == limit:
+            next_cursor = _encode_audit_cursor(last["timestamp"], last["id"])
+            yield orjson.dumps({"next_cursor": next_cursor}) + b"\n"
+            break
+        yield orjson.dumps(event) + b"\n"
+        last = event
+
+
+def _encode_audit_cursor(timestamp: datetime, event_id: str) -> str:
+    """Encode an audit log keyset position as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{event_id}".encode()).decode()
+
+
+def _decode_audit_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by _encode_audit_cursor"""
+    try:
+        timestamp, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), event_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_event_types(event_type: str) -> Set[str]:
+    """Split a comma-separated event_type filter, rejecting unknown names"""
+    requested_types = set(event_type.split(","))
+    unknown_types = requested_types - EVENT_TYPES
+    if unknown_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid event types: {sorted(unknown_types)}. Valid event types: {list(_SORTED_EVENT_TYPES)}"
+        )
+    return requested_types
+
+
 # Create router
-router = APIRouter(prefix="/admin", tags=["Administration"], dependencies=[Depends(require_admin())])
+router = APIRouter(
+    prefix="/admin",
+    tags=["Administration"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(require_admin())]
+)
 
 
 @router.get("/dashboard")
 async def get_admin_dashboard(
+    request: Request,
     current_user: User = Depends(get_current_user_from_request)
 ):
     """
     Get administrative dashboard with system overview
     
     Returns comprehensive system statistics, user metrics, and health information
-    for administrative monitoring and management.
+    for administrative monitoring and management. Responds with 304 Not Modified
+    when the client's If-None-Match matches the current content.
     
     Returns:
         Dashboard data with system metrics and statistics
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="view_admin_dashboard"
-        )
-        
-        # Get system statistics
-        dashboard_data = {
-            "system_info": {
-                "application_name": settings.app_name,
-                "version": settings.version,
-                "environment": settings.environment,
-                "uptime_hours": 24,  # Placeholder - would calculate actual uptime
-                "last_deployment": "2025-01-10T10:00:00Z"  # Placeholder
-            },
-            "user_statistics": {
-                "total_users": 1,  # In real app, would query database
-                "active_sessions": 1,
-                "admin_users": 1,
-                "role_distribution": {
-                    "Admin": 1,
-                    "RolA": 0,
-                    "RolB": 0,
-                    "Public": 0
-                }
-            },
-            "powerbi_statistics": {
-                "active_tokens": len(powerbi_service._token_cache),
-                "reports_available": 0,  # Would get actual count
-                "datasets_available": 0,
-                "workspace_id": settings.fabric_workspace_id,
-                "token_expiration_minutes": settings.embed_token_expiration_minutes
-            },
-            "security_metrics": {
-                "failed_login_attempts_24h": 0,  # Would query logs
-                "successful_logins_24h": 1,
-                "admin_actions_24h": 1,
-                "tokens_generated_24h": 0
-            },
-            "system_health": {
-                "api_status": "healthy",
-                "database_status": "healthy",  # If using database
-                "powerbi_connection": "healthy",
-                "entra_id_connection": "healthy",
-                "key_vault_access": "healthy"
-            },
-            "recent_activity": [
-                {
-                    "timestamp": datetime.now().isoformat(),
-                    "event": "Admin dashboard accessed",
-                    "user": current_user.email,
-                    "type": "admin_action"
-                }
-            ],
-            "alerts": [
-                # Would include any system alerts or warnings
-            ],
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # Try to get actual PowerBI statistics
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="view_admin_dashboard"
+    )
+    
+    # Try to get actual PowerBI statistics
+    cache_key = ("dash", settings.fabric_workspace_id)
+    powerbi_stats = _powerbi_stats_cache.get(cache_key)
+    if powerbi_stats is None:
         try:
             powerbi_token = await powerbi_service._get_powerbi_access_token()
-            reports = await powerbi_service._get_workspace_reports(powerbi_token)
-            datasets = await powerbi_service._get_workspace_datasets(powerbi_token)
+            reports, datasets = await asyncio.gather(
+                powerbi_service._get_workspace_reports(powerbi_token),
+                powerbi_service._get_workspace_datasets(powerbi_token),
+                return_exceptions=True
+            )
+            for result in (reports, datasets):
+                if isinstance(result, Exception):
+                    raise result
             
-            dashboard_data["powerbi_statistics"]["reports_available"] = len(reports)
-            dashboard_data["powerbi_statistics"]["datasets_available"] = len(datasets)
-            dashboard_data["system_health"]["powerbi_connection"] = "healthy"
+            powerbi_stats = {
+                "reports": len(reports),
+                "datasets": len(datasets),
+                "status": "healthy"
+            }
+            _powerbi_stats_cache[cache_key] = powerbi_stats
             
         except Exception as e:
             logger.warning(f"Could not get PowerBI statistics: {e}")
-            dashboard_data["system_health"]["powerbi_connection"] = "degraded"
-        
-        logger.info(f"Admin dashboard accessed by {current_user.email}")
-        
-        return dashboard_data
-        
-    except Exception as e:
-        logger.error(f"Error generating admin dashboard: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate dashboard")
+    
+    # Only the per-request parts of the dashboard are built here; the static
+    # blocks are shared module-level dicts
+    payload = {
+        "system_info": {
+            **_SYSTEM_INFO,
+            "uptime_hours": _uptime_hours(),
+            "last_deployment": "2025-01-10T10:00:00Z"  # Placeholder
+        },
+        "user_statistics": _DASHBOARD_USER_STATISTICS,
+        "powerbi_statistics": {
+            "active_tokens": powerbi_service.active_token_count,
+            "reports_available": powerbi_stats["reports"] if powerbi_stats else 0,
+            "datasets_available": powerbi_stats["datasets"] if powerbi_stats else 0,
+            **_POWERBI_STATIC
+        },
+        "security_metrics": _DASHBOARD_SECURITY_METRICS,
+        "system_health": {
+            "api_status": "healthy",
+            "database_status": "healthy",  # If using database
+            "powerbi_connection": powerbi_stats["status"] if powerbi_stats else "degraded",
+            "entra_id_connection": "healthy",
+            "key_vault_access": "healthy"
+        },
+        "recent_activity": [
+            {
+                "timestamp": now,
+                "event": "Admin dashboard accessed",
+                "user": current_user.email,
+                "type": "admin_action"
+            }
+        ],
+        "alerts": [
+            # Would include any system alerts or warnings
+        ],
+        "timestamp": now
+    }
+    
+    logger.info(f"Admin dashboard accessed by {current_user.email}")
+    
+    # Per-request fields don't count as a content change
+    etag = weak_etag({
+        key: value for key, value in payload.items()
+        if key not in ("timestamp", "recent_activity")
+    })
+    return conditional_response(request, payload, etag, _POLLING_CACHE_CONTROL)
 
 
 @router.get("/users")
@@ -145,83 +288,52 @@ async def list_all_users(
         Paginated list of users with metadata
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="list_all_users",
-            details={
-                "page": page,
-                "page_size": page_size,
-                "search": search,
-                "role_filter": role_filter
-            }
-        )
-        
-        # In a real implementation, this would query a user database
-        # For now, return the current user as an example
-        all_users = [
-            {
-                "id": current_user.id,
-                "email": current_user.email,
-                "name": current_user.name,
-                "roles": current_user.roles,
-                "groups": current_user.groups,
-                "is_admin": current_user.is_admin,
-                "is_active": current_user.is_active,
-                "last_login": current_user.last_login.isoformat() if current_user.last_login else None,
-                "created_at": current_user.created_at.isoformat(),
-                "login_count": 1,  # Placeholder
-                "last_token_generated": datetime.now().isoformat()  # Placeholder
-            }
-        ]
-        
-        # Apply filters
-        filtered_users = all_users
-        
-        if search:
-            filtered_users = [
-                user for user in filtered_users
-                if search.lower() in user["email"].lower() or 
-                   (user["name"] and search.lower() in user["name"].lower())
-            ]
-        
-        if role_filter:
-            filtered_users = [
-                user for user in filtered_users
-                if role_filter in user["roles"]
-            ]
-        
-        # Apply pagination
-        total_count = len(filtered_users)
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        paginated_users = filtered_users[start_index:end_index]
-        
-        result = {
-            "users": paginated_users,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total_count": total_count,
-                "total_pages": (total_count + page_size - 1) // page_size,
-                "has_next": end_index < total_count,
-                "has_previous": page > 1
-            },
-            "filters": {
-                "search": search,
-                "role_filter": role_filter
-            },
-            "timestamp": datetime.now().isoformat()
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="list_all_users",
+        details={
+            "page": page,
+            "page_size": page_size,
+            "search": search,
+            "role_filter": role_filter
         }
-        
-        logger.info(f"Admin {current_user.email} listed users (page {page}, {len(paginated_users)} users)")
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error listing users: {e}")
-        raise HTTPException(status_code=500, detail="Failed to list users")
+    )
+    
+    # Until users are persisted, the repository only knows users seen by this process
+    user_repository.upsert(current_user)
+    
+    start_index = (page - 1) * page_size
+    paginated_users, total_count = await user_repository.list(
+        search=search,
+        role_filter=role_filter,
+        limit=page_size,
+        offset=start_index
+    )
+    end_index = start_index + page_size
+    
+    result = {
+        "users": paginated_users,
+        "pagination": {
+            "page": page,
+            "page_size": page_size,
+            "total_count": total_count,
+            "total_pages": (total_count + page_size - 1) // page_size,
+            "has_next": end_index < total_count,
+            "has_previous": page > 1
+        },
+        "filters": {
+            "search": search,
+            "role_filter": role_filter
+        },
+        "timestamp": now
+    }
+    
+    logger.info(f"Admin {current_user.email} listed users (page {page}, {len(paginated_users)} users)")
+    
+    return result
 
 
 @router.get("/users/{user_id}")
@@ -242,72 +354,67 @@ async def get_user_details(
         Detailed user information
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="view_user_details",
-            target_user=user_id
-        )
-        
-        # In a real implementation, this would query the user database
-        # For now, return current user if IDs match
-        if user_id == current_user.id:
-            user_details = {
-                "user_info": {
-                    "id": current_user.id,
-                    "email": current_user.email,
-                    "name": current_user.name,
-                    "roles": current_user.roles,
-                    "powerbi_roles": current_user.powerbi_roles,
-                    "groups": current_user.groups,
-                    "is_admin": current_user.is_admin,
-                    "is_active": current_user.is_active,
-                    "tenant_id": current_user.tenant_id,
-                    "created_at": current_user.created_at.isoformat(),
-                    "last_login": current_user.last_login.isoformat() if current_user.last_login else None
-                },
-                "access_history": [
-                    {
-                        "timestamp": datetime.now().isoformat(),
-                        "action": "login",
-                        "ip_address": "127.0.0.1",
-                        "user_agent": "Admin Interface",
-                        "result": "success"
-                    }
-                ],
-                "token_usage": {
-                    "total_tokens_generated": 1,
-                    "active_tokens": 0,
-                    "last_token_generated": datetime.now().isoformat(),
-                    "most_accessed_report": "N/A"
-                },
-                "security_events": [
-                    {
-                        "timestamp": datetime.now().isoformat(),
-                        "event_type": "admin_access",
-                        "description": "User details viewed by admin",
-                        "severity": "info"
-                    }
-                ],
-                "permissions": {
-                    "can_view_reports": len(current_user.roles) > 0,
-                    "can_generate_tokens": True,
-                    "data_access_level": "admin" if current_user.is_admin else "role_based",
-                    "effective_filters": [] if current_user.is_admin else current_user.powerbi_roles
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="view_user_details",
+        target_user=user_id
+    )
+    
+    # In a real implementation, this would query the user database
+    # For now, return current user if IDs match
+    if user_id == current_user.id:
+        user_details = {
+            "user_info": {
+                "id": current_user.id,
+                "email": current_user.email,
+                "name": current_user.name,
+                "roles": current_user.roles,
+                "powerbi_roles": current_user.powerbi_roles,
+                "groups": current_user.groups,
+                "is_admin": current_user.is_admin,
+                "is_active": current_user.is_active,
+                "tenant_id": current_user.tenant_id,
+                "created_at": current_user.created_at,
+                "last_login": current_user.last_login
+            },
+            "access_history": [
+                {
+                    "timestamp": now,
+                    "action": "login",
+                    "ip_address": "127.0.0.1",
+                    "user_agent": "Admin Interface",
+                    "result": "success"
+                }
+            ],
+            "token_usage": {
+                "total_tokens_generated": 1,
+                "active_tokens": 0,
+                "last_token_generated": now,
+                "most_accessed_report": "N/A"
+            },
+            "security_events": [
+                {
+                    "timestamp": now,
+                    "event_type": "admin_access",
+                    "description": "User details viewed by admin",
+                    "severity": "info"
                 }
+            ],
+            "permissions": {
+                "can_view_reports": len(current_user.roles) > 0,
+                "can_generate_tokens": True,
+                "data_access_level": "admin" if current_user.is_admin else "role_based",
+                "effective_filters": [] if current_user.is_admin else current_user.powerbi_roles
             }
-            
-            logger.info(f"Admin {current_user.email} viewed details for user {user_id}")
-            return user_details
-        else:
-            raise HTTPException(status_code=404, detail="User not found")
+        }
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting user details: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get user details")
+        logger.info(f"Admin {current_user.email} viewed details for user {user_id}")
+        return user_details
+    else:
+        raise HTTPException(status_code=404, detail="User not found")
 
 
 @router.put("/users/{user_id}/roles")
@@ -330,76 +437,100 @@ async def update_user_roles(
         Updated user information
     """
     
-    try:
-        # Validate request
-        if "roles" not in role_update:
-            raise HTTPException(status_code=400, detail="Missing 'roles' field in request")
-        
-        new_roles = role_update["roles"]
-        if not isinstance(new_roles, list):
-            raise HTTPException(status_code=400, detail="Roles must be a list")
-        
-        # Validate role values
-        valid_roles = ["Admin", "RolA", "RolB", "Public"]
-        invalid_roles = [role for role in new_roles if role not in valid_roles]
-        if invalid_roles:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid roles: {invalid_roles}. Valid roles: {valid_roles}"
-            )
-        
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="update_user_roles",
-            target_user=user_id,
-            details={
-                "new_roles": new_roles,
-                "previous_roles": current_user.roles if user_id == current_user.id else []
-            }
+    now = datetime.now()
+    
+    # Validate request
+    if "roles" not in role_update:
+        raise HTTPException(status_code=400, detail="Missing 'roles' field in request")
+    
+    new_roles = role_update["roles"]
+    if not isinstance(new_roles, list):
+        raise HTTPException(status_code=400, detail="Roles must be a list")
+    
+    # Validate role values
+    invalid_roles = [role for role in new_roles if role not in VALID_ROLES]
+    if invalid_roles:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid roles: {invalid_roles}. Valid roles: {sorted(VALID_ROLES)}"
         )
-        
-        # In a real implementation, this would:
-        # 1. Update user roles in database
-        # 2. Update Entra ID group memberships
-        # 3. Invalidate user cache
-        # 4. Send notification to user
-        
-        # For now, simulate the update
-        updated_user = {
-            "id": user_id,
-            "email": current_user.email if user_id == current_user.id else f"user-{user_id}@domain.com",
-            "roles": new_roles,
-            "is_admin": "Admin" in new_roles,
-            "updated_by": current_user.email,
-            "updated_at": datetime.now().isoformat(),
-            "changes": {
-                "roles_added": [role for role in new_roles if role not in (current_user.roles if user_id == current_user.id else [])],
-                "roles_removed": [role for role in (current_user.roles if user_id == current_user.id else []) if role not in new_roles]
-            }
+    
+    is_self = user_id == current_user.id
+    
+    # Diff against the target's current roles so memberships are revoked as
+    # well as granted; refuse the update if they cannot be read. Development
+    # mode has no Graph credentials, so only known users can be updated there.
+    if is_development():
+        target = current_user if is_self else user_repository.get(user_id)
+        if target is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        previous_roles = list(target.roles)
+    else:
+        try:
+            previous_roles = await entra_auth_service.get_user_roles(user_id)
+        except UserNotFoundError:
+            raise HTTPException(status_code=404, detail="User not found")
+        except EntraAuthError as e:
+            logger.error(f"Error reading current roles for {user_id}: {e}")
+            raise HTTPException(status_code=502, detail="Failed to read current user roles")
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="update_user_roles",
+        target_user=user_id,
+        details={
+            "new_roles": new_roles,
+            "previous_roles": previous_roles
         }
-        
-        # Log permission change
-        security_logger.log_permission_change(
-            admin_user_id=current_user.email,
-            target_user_id=user_id,
-            old_permissions=current_user.roles if user_id == current_user.id else [],
-            new_permissions=new_roles
-        )
-        
-        logger.info(f"Admin {current_user.email} updated roles for user {user_id}: {new_roles}")
-        
-        return {
-            "message": "User roles updated successfully",
-            "user": updated_user,
-            "timestamp": datetime.now().isoformat()
+    )
+    
+    new_role_set = set(new_roles)
+    old_role_set = set(previous_roles)
+    roles_added = sorted(new_role_set - old_role_set)
+    roles_removed = sorted(old_role_set - new_role_set)
+    
+    # Apply all group membership changes in one batched Graph call, then drop
+    # the cached user so the next request picks up the new roles. In
+    # development mode the update is only simulated.
+    if not is_development():
+        try:
+            await entra_auth_service.update_group_memberships(user_id, roles_added, roles_removed)
+        except EntraAuthError as e:
+            logger.error(f"Error updating group memberships for {user_id}: {e}")
+            raise HTTPException(status_code=502, detail="Failed to update group memberships")
+        await entra_auth_service.refresh_user_cache(user_id)
+    
+    user_repository.update_roles(user_id, roles_added, roles_removed)
+    
+    updated_user = {
+        "id": user_id,
+        "email": current_user.email if is_self else f"user-{user_id}@domain.com",
+        "roles": new_roles,
+        "is_admin": "Admin" in new_roles,
+        "updated_by": current_user.email,
+        "updated_at": now,
+        "changes": {
+            "roles_added": roles_added,
+            "roles_removed": roles_removed
         }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating user roles: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update user roles")
+    }
+    
+    # Log permission change
+    security_logger.log_permission_change(
+        admin_user_id=current_user.email,
+        target_user_id=user_id,
+        old_permissions=previous_roles,
+        new_permissions=new_roles
+    )
+    
+    logger.info(f"Admin {current_user.email} updated roles for user {user_id}: {new_roles}")
+    
+    return {
+        "message": "User roles updated successfully",
+        "user": updated_user,
+        "timestamp": now
+    }
 
 
 @router.post("/users/{user_id}/deactivate")
@@ -422,53 +553,48 @@ async def deactivate_user(
         Deactivation confirmation
     """
     
-    try:
-        # Prevent self-deactivation
-        if user_id == current_user.id:
-            raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
-        
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="deactivate_user",
-            target_user=user_id,
-            details={"reason": reason}
-        )
-        
-        # In a real implementation, this would:
-        # 1. Mark user as inactive in database
-        # 2. Revoke all active tokens for the user
-        # 3. Remove from Entra ID groups
-        # 4. Send notification
-        # 5. Log security event
-        
-        deactivation_result = {
-            "user_id": user_id,
-            "status": "deactivated",
-            "deactivated_by": current_user.email,
-            "deactivated_at": datetime.now().isoformat(),
-            "reason": reason,
-            "actions_taken": [
-                "User marked as inactive",
-                "Active tokens revoked",
-                "Group memberships removed",
-                "Access blocked"
-            ]
-        }
-        
-        logger.warning(f"Admin {current_user.email} deactivated user {user_id} (reason: {reason})")
-        
-        return {
-            "message": "User deactivated successfully",
-            "result": deactivation_result,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deactivating user: {e}")
-        raise HTTPException(status_code=500, detail="Failed to deactivate user")
+    now = datetime.now()
+    
+    # Prevent self-deactivation
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="deactivate_user",
+        target_user=user_id,
+        details={"reason": reason}
+    )
+    
+    # In a real implementation, this would:
+    # 1. Mark user as inactive in database
+    # 2. Revoke all active tokens for the user
+    # 3. Remove from Entra ID groups
+    # 4. Send notification
+    # 5. Log security event
+    
+    deactivation_result = {
+        "user_id": user_id,
+        "status": "deactivated",
+        "deactivated_by": current_user.email,
+        "deactivated_at": now,
+        "reason": reason,
+        "actions_taken": [
+            "User marked as inactive",
+            "Active tokens revoked",
+            "Group memberships removed",
+            "Access blocked"
+        ]
+    }
+    
+    logger.warning(f"Admin {current_user.email} deactivated user {user_id} (reason: {reason})")
+    
+    return {
+        "message": "User deactivated successfully",
+        "result": deactivation_result,
+        "timestamp": now
+    }
 
 
 @router.post("/users/{user_id}/reactivate")
@@ -488,245 +614,264 @@ async def reactivate_user(
         Reactivation confirmation
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="reactivate_user",
-            target_user=user_id
-        )
-        
-        # In a real implementation, this would:
-        # 1. Mark user as active in database
-        # 2. Restore Entra ID group memberships
-        # 3. Send notification
-        # 4. Log security event
-        
-        reactivation_result = {
-            "user_id": user_id,
-            "status": "active",
-            "reactivated_by": current_user.email,
-            "reactivated_at": datetime.now().isoformat(),
-            "actions_taken": [
-                "User marked as active",
-                "Group memberships restored",
-                "Access enabled"
-            ]
-        }
-        
-        logger.info(f"Admin {current_user.email} reactivated user {user_id}")
-        
-        return {
-            "message": "User reactivated successfully",
-            "result": reactivation_result,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Error reactivating user: {e}")
-        raise HTTPException(status_code=500, detail="Failed to reactivate user")
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="reactivate_user",
+        target_user=user_id
+    )
+    
+    # In a real implementation, this would:
+    # 1. Mark user as active in database
+    # 2. Restore Entra ID group memberships
+    # 3. Send notification
+    # 4. Log security event
+    
+    reactivation_result = {
+        "user_id": user_id,
+        "status": "active",
+        "reactivated_by": current_user.email,
+        "reactivated_at": now,
+        "actions_taken": [
+            "User marked as active",
+            "Group memberships restored",
+            "Access enabled"
+        ]
+    }
+    
+    logger.info(f"Admin {current_user.email} reactivated user {user_id}")
+    
+    return {
+        "message": "User reactivated successfully",
+        "result": reactivation_result,
+        "timestamp": now
+    }
 
 
 @router.get("/audit/security-events")
 async def get_security_audit_log(
+    request: Request,
     current_user: User = Depends(get_current_user_from_request),
     start_date: Optional[datetime] = Query(None, description="Start date for audit log"),
     end_date: Optional[datetime] = Query(None, description="End date for audit log"),
-    event_type: Optional[str] = Query(None, description="Filter by event type"),
-    user_filter: Optional[str] = Query(None, description="Filter by user"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of events")
+    event_type: Optional[str] = Query(
+        None,
+        pattern=r"^[A-Z_,]+$",
+        description="Filter by event type (comma-separated for several)"
+    ),
+    user_id: Optional[str] = Query(None, description="Filter by exact user ID"),
+    user_id_prefix: Optional[str] = Query(None, description="Filter by user ID prefix"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of events"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page")
 ):
     """
     Get security audit log (Admin only)
     
     Returns security events and audit trail for monitoring and compliance.
-    Supports filtering by date range, event type, and user.
+    Supports filtering by date range, event type, and user. Results are
+    ordered newest first and paginated by keyset on (timestamp, id).
+    
+    With "Accept: application/x-ndjson" the events are streamed one JSON
+    object per line; if more events remain, the last line is
+    {"next_cursor": "..."} instead of an event.
     
     Args:
         start_date: Start date for filtering events
         end_date: End date for filtering events
-        event_type: Filter by specific event type
-        user_filter: Filter by specific user
+        event_type: Filter by event type, or a comma-separated list of types
+        user_id: Only include events for this user ID
+        user_id_prefix: Only include events whose user ID starts with this
+            prefix (substring search is deliberately not offered; it cannot
+            use an index)
         limit: Maximum number of events to return
+        cursor: next_cursor value from the previous page
         
     Returns:
         Filtered security audit log
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="view_security_audit_log",
-            details={
-                "start_date": start_date.isoformat() if start_date else None,
-                "end_date": end_date.isoformat() if end_date else None,
-                "event_type": event_type,
-                "user_filter": user_filter,
-                "limit": limit
+    after = _decode_audit_cursor(cursor) if cursor else None
+    requested_types = _parse_event_types(event_type) if event_type else None
+    
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="view_security_audit_log",
+        details={
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+            "event_type": event_type,
+            "user_id": user_id,
+            "user_id_prefix": user_id_prefix,
+            "limit": limit
+        }
+    )
+    
+    # In a real implementation, this would query the audit log database with
+    #   WHERE (timestamp, id) < (:ts, :id) AND event_type = ANY(:types)
+    #     AND (:uid IS NULL OR user_id = :uid) AND (:up IS NULL OR user_id LIKE :up || '%')
+    #     AND <date filters>
+    #   ORDER BY timestamp DESC, id DESC LIMIT :limit + 1
+    # backed by indexes on (event_type, timestamp DESC, id DESC),
+    # (user_id, timestamp DESC) and (user_id text_pattern_ops), read through a
+    # server-side cursor so rows can be streamed. For now, filter sample events
+    # the same way.
+    sample_events = [
+        {
+            "id": "audit-001",
+            "timestamp": now,
+            "event_type": "ADMIN_ACTION",
+            "user_id": current_user.email,
+            "action": "view_security_audit_log",
+            "resource": "/api/admin/audit/security-events",
+            "result": "SUCCESS",
+            "ip_address": "127.0.0.1",
+            "user_agent": "Admin Interface",
+            "details": {
+                "admin_user": current_user.email
             }
-        )
-        
-        # In a real implementation, this would query the audit log database
-        # For now, return sample events
-        sample_events = [
-            {
-                "id": "audit-001",
-                "timestamp": datetime.now().isoformat(),
-                "event_type": "ADMIN_ACTION",
-                "user_id": current_user.email,
-                "action": "view_security_audit_log",
-                "resource": "/api/admin/audit/security-events",
-                "result": "SUCCESS",
-                "ip_address": "127.0.0.1",
-                "user_agent": "Admin Interface",
-                "details": {
-                    "admin_user": current_user.email
-                }
-            },
-            {
-                "id": "audit-002",
-                "timestamp": (datetime.now() - timedelta(hours=1)).isoformat(),
-                "event_type": "USER_LOGIN",
-                "user_id": current_user.email,
-                "action": "login",
-                "resource": "/api/auth/validate",
-                "result": "SUCCESS",
-                "ip_address": "127.0.0.1",
-                "user_agent": "Mozilla/5.0 Browser",
-                "details": {
-                    "authentication_method": "entra_id",
-                    "user_groups": current_user.groups
-                }
+        },
+        {
+            "id": "audit-002",
+            "timestamp": now - timedelta(hours=1),
+            "event_type": "USER_LOGIN",
+            "user_id": current_user.email,
+            "action": "login",
+            "resource": "/api/auth/validate",
+            "result": "SUCCESS",
+            "ip_address": "127.0.0.1",
+            "user_agent": "Mozilla/5.0 Browser",
+            "details": {
+                "authentication_method": "entra_id",
+                "user_groups": current_user.groups
             }
-        ]
-        
-        # Apply filters (in real implementation, this would be done at query level)
-        filtered_events = sample_events
-        
-        if start_date:
-            filtered_events = [
-                event for event in filtered_events
-                if datetime.fromisoformat(event["timestamp"].replace('Z', '+00:00')) >= start_date
-            ]
-        
-        if end_date:
-            filtered_events = [
-                event for event in filtered_events
-                if datetime.fromisoformat(event["timestamp"].replace('Z', '+00:00')) <= end_date
-            ]
-        
-        if event_type:
-            filtered_events = [
-                event for event in filtered_events
-                if event["event_type"] == event_type
-            ]
-        
-        if user_filter:
-            filtered_events = [
-                event for event in filtered_events
-                if user_filter.lower() in event["user_id"].lower()
-            ]
-        
-        # Apply limit
-        filtered_events = filtered_events[:limit]
-        
-        result = {
-            "events": filtered_events,
-            "total_count": len(filtered_events),
-            "filters": {
-                "start_date": start_date.isoformat() if start_date else None,
-                "end_date": end_date.isoformat() if end_date else None,
-                "event_type": event_type,
-                "user_filter": user_filter,
-                "limit": limit
-            },
-            "event_types": [
-                "USER_LOGIN",
-                "USER_LOGIN_FAILED",
-                "TOKEN_GENERATED",
-                "UNAUTHORIZED_ACCESS",
-                "ADMIN_ACTION",
-                "DATA_ACCESS",
-                "PERMISSION_CHANGE",
-                "SECURITY_VIOLATION"
-            ],
-            "timestamp": datetime.now().isoformat()
         }
-        
-        logger.info(f"Admin {current_user.email} accessed security audit log ({len(filtered_events)} events)")
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error getting security audit log: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get audit log")
+    ]
+    
+    matches = _iter_audit_events(
+        sample_events, after, start_date, end_date, requested_types, user_id, user_id_prefix
+    )
+    
+    # Clients that accept NDJSON get rows written out as they are produced
+    if _NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        logger.info(f"Admin {current_user.email} streaming security audit log")
+        return StreamingResponse(_stream_audit_events(matches, limit), media_type=_NDJSON_MEDIA_TYPE)
+    
+    page = list(islice(matches, limit + 1))
+    
+    # One extra row tells us whether another page exists
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_audit_cursor(page[-1]["timestamp"], page[-1]["id"])
+    
+    filtered_events = page
+    
+    result = {
+        "events": filtered_events,
+        "total_count": len(filtered_events),
+        "filters": {
+            "start_date": start_date,
+            "end_date": end_date,
+            "event_type": event_type,
+            "user_id": user_id,
+            "user_id_prefix": user_id_prefix,
+            "limit": limit,
+            "cursor": cursor
+        },
+        "next_cursor": next_cursor,
+        "event_types": _SORTED_EVENT_TYPES,
+        "timestamp": now
+    }
+    
+    logger.info(f"Admin {current_user.email} accessed security audit log ({len(filtered_events)} events)")
+    
+    return result
 
 
 @router.get("/system/health")
 async def get_system_health(
+    request: Request,
     current_user: User = Depends(get_current_user_from_request)
 ):
     """
     Get comprehensive system health status (Admin only)
     
     Returns detailed health information for all system components
-    including dependencies, performance metrics, and alerts.
+    including dependencies, performance metrics, and alerts. Responds with
+    304 Not Modified when the component statuses and alerts are unchanged.
     
     Returns:
         Comprehensive system health status
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="view_system_health"
-        )
-        
-        health_status = {
-            "overall_status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "components": {
-                "api_server": {
-                    "status": "healthy",
-                    "response_time_ms": 50,
-                    "uptime_hours": 24,
-                    "requests_per_minute": 10
-                },
-                "entra_id": {
-                    "status": "healthy",
-                    "last_test": datetime.now().isoformat(),
-                    "response_time_ms": 200
-                },
-                "powerbi_api": {
-                    "status": "unknown",
-                    "last_test": None,
-                    "response_time_ms": None
-                },
-                "key_vault": {
-                    "status": "healthy",
-                    "secrets_accessible": True,
-                    "last_test": datetime.now().isoformat()
-                }
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="view_system_health"
+    )
+    
+    health_status = {
+        "overall_status": "healthy",
+        "timestamp": now,
+        "components": {
+            "api_server": {
+                "status": "healthy",
+                "response_time_ms": 50,
+                "uptime_hours": _uptime_hours(),
+                "requests_per_minute": 10
             },
-            "performance_metrics": {
-                "memory_usage_percent": 45,
-                "cpu_usage_percent": 30,
-                "disk_usage_percent": 20,
-                "active_connections": 5,
-                "cache_hit_rate": 85
+            "entra_id": {
+                "status": "healthy",
+                "last_test": now,
+                "response_time_ms": 200
             },
-            "alerts": [],
-            "recommendations": []
-        }
-        
-        # Test PowerBI API connectivity
+            "powerbi_api": {
+                "status": "unknown",
+                "last_test": None,
+                "response_time_ms": None,
+                "circuit_state": powerbi_service.circuit_state
+            },
+            "key_vault": {
+                "status": "healthy",
+                "secrets_accessible": True,
+                "last_test": now
+            }
+        },
+        "performance_metrics": {
+            "memory_usage_percent": 45,
+            "cpu_usage_percent": 30,
+            "disk_usage_percent": 20,
+            "active_connections": 5,
+            "cache_hit_rate": 85
+        },
+        "alerts": [],
+        "recommendations": []
+    }
+    
+    # Test PowerBI API connectivity; a cached service token already proves it
+    if powerbi_service.has_valid_service_token():
+        health_status["components"]["powerbi_api"]["status"] = "healthy"
+        health_status["components"]["powerbi_api"]["last_test"] = now
+        health_status["components"]["powerbi_api"]["response_time_ms"] = 0
+    else:
         try:
-            powerbi_token = await powerbi_service._get_powerbi_access_token()
-            if powerbi_token:
+            cache_key = ("health", settings.fabric_workspace_id)
+            probe = _powerbi_stats_cache.get(cache_key)
+            if probe is None:
+                powerbi_token = await powerbi_service._get_powerbi_access_token()
+                if powerbi_token:
+                    probe = {"last_test": now}
+                    _powerbi_stats_cache[cache_key] = probe
+            if probe is not None:
                 health_status["components"]["powerbi_api"]["status"] = "healthy"
-                health_status["components"]["powerbi_api"]["last_test"] = datetime.now().isoformat()
+                health_status["components"]["powerbi_api"]["last_test"] = probe["last_test"]
                 health_status["components"]["powerbi_api"]["response_time_ms"] = 300
         except Exception as e:
             health_status["components"]["powerbi_api"]["status"] = "unhealthy"
@@ -735,29 +880,71 @@ async def get_system_health(
             health_status["alerts"].append({
                 "severity": "warning",
                 "message": "PowerBI API connectivity issues",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now
             })
+    
+    # Add recommendations based on status
+    if health_status["performance_metrics"]["memory_usage_percent"] > 80:
+        health_status["recommendations"].append("Consider increasing memory allocation")
+    
+    if health_status["performance_metrics"]["cache_hit_rate"] < 70:
+        health_status["recommendations"].append("Review cache configuration for better performance")
+    
+    logger.info(f"Admin {current_user.email} checked system health")
+    
+    etag = weak_etag({
+        "overall_status": health_status["overall_status"],
+        "components": {
+            name: component["status"]
+            for name, component in health_status["components"].items()
+        },
+        "alerts": [alert["message"] for alert in health_status["alerts"]],
+        "recommendations": health_status["recommendations"]
+    })
+    return conditional_response(request, health_status, etag, _POLLING_CACHE_CONTROL)
+
+
+async def _run_maintenance_task(task: str, now: datetime) -> Dict[str, Any]:
+    """Run a single maintenance task, recording any failure in its result"""
+    task_result = {
+        "task": task,
+        "status": "completed",
+        "timestamp": now,
+        "details": {}
+    }
+    
+    try:
+        if task == "clear_cache":
+            # Clear PowerBI token cache
+            token_count = powerbi_service.revoke_all_embed_tokens()
+            task_result["details"]["tokens_cleared"] = token_count
+            
+            # Force the dashboard and health pages to re-query PowerBI
+            _powerbi_stats_cache.clear()
         
-        # Add recommendations based on status
-        if health_status["performance_metrics"]["memory_usage_percent"] > 80:
-            health_status["recommendations"].append("Consider increasing memory allocation")
-        
-        if health_status["performance_metrics"]["cache_hit_rate"] < 70:
-            health_status["recommendations"].append("Review cache configuration for better performance")
+        elif task == "refresh_tokens":
+            # In real implementation, would refresh service tokens
+            task_result["details"]["message"] = "Service tokens refreshed"
         
-        logger.info(f"Admin {current_user.email} checked system health")
+        elif task == "cleanup_logs":
+            # In real implementation, would clean old log files
+            task_result["details"]["logs_cleaned"] = "30 days old"
         
-        return health_status
+        else:
+            task_result["status"] = "skipped"
+            task_result["details"]["reason"] = f"Unknown task: {task}"
         
     except Exception as e:
-        logger.error(f"Error getting system health: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get system health")
+        task_result["status"] = "failed"
+        task_result["details"]["error"] = str(e)
+    
+    return task_result
 
 
 @router.post("/system/maintenance")
 async def trigger_maintenance_tasks(
     current_user: User = Depends(get_current_user_from_request),
-    tasks: List[str] = ["clear_cache", "refresh_tokens", "cleanup_logs"]
+    tasks: List[str] = Body(_DEFAULT_MAINTENANCE_TASKS)
 ):
     """
     Trigger system maintenance tasks (Admin only)
@@ -772,61 +959,32 @@ async def trigger_maintenance_tasks(
         Maintenance task results
     """
     
-    try:
-        # Log admin action
-        security_logger.log_admin_action(
-            admin_user_id=current_user.email,
-            action="trigger_maintenance",
-            details={"tasks": tasks}
-        )
-        
-        maintenance_results = []
-        
-        for task in tasks:
-            task_result = {
-                "task": task,
-                "status": "completed",
-                "timestamp": datetime.now().isoformat(),
-                "details": {}
-            }
-            
-            try:
-                if task == "clear_cache":
-                    # Clear PowerBI token cache
-                    token_count = len(powerbi_service._token_cache)
-                    powerbi_service._token_cache.clear()
-                    task_result["details"]["tokens_cleared"] = token_count
-                
-                elif task == "refresh_tokens":
-                    # In real implementation, would refresh service tokens
-                    task_result["details"]["message"] = "Service tokens refreshed"
-                
-                elif task == "cleanup_logs":
-                    # In real implementation, would clean old log files
-                    task_result["details"]["logs_cleaned"] = "30 days old"
-                
-                else:
-                    task_result["status"] = "skipped"
-                    task_result["details"]["reason"] = f"Unknown task: {task}"
-                
-            except Exception as e:
-                task_result["status"] = "failed"
-                task_result["details"]["error"] = str(e)
-            
-            maintenance_results.append(task_result)
-        
-        result = {
-            "message": "Maintenance tasks completed",
-            "tasks_executed": len(tasks),
-            "results": maintenance_results,
-            "executed_by": current_user.email,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        logger.info(f"Admin {current_user.email} executed maintenance tasks: {tasks}")
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error executing maintenance tasks: {e}")
-        raise HTTPException(status_code=500, detail="Failed to execute maintenance tasks")
\ No newline at end of file
+    now = datetime.now()
+    
+    # Log admin action
+    security_logger.log_admin_action(
+        admin_user_id=current_user.email,
+        action="trigger_maintenance",
+        details={"tasks": tasks}
+    )
+    
+    # Tasks are independent, so run them concurrently with a small cap
+    semaphore = asyncio.Semaphore(_MAINTENANCE_CONCURRENCY)
+    
+    async def run_limited(task: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await _run_maintenance_task(task, now)
+    
+    maintenance_results = await asyncio.gather(*(run_limited(task) for task in tasks))
+    
+    result = {
+        "message": "Maintenance tasks completed",
+        "tasks_executed": len(tasks),
+        "results": maintenance_results,
+        "executed_by": current_user.email,
+        "timestamp": now
+    }
+    
+    logger.info(f"Admin {current_user.email} executed maintenance tasks: {tasks}")
+    
+    return result
\ No newline at end of file
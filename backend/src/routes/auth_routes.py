@@ -4,20 +4,24 @@ Handles user authentication, token validation, and session management
 """
 
 import logging
-from typing import Dict, Any
+import time
+from typing import AsyncIterator, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
+from itertools import islice
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer
+import orjson
 
 from ..auth.entra_auth import entra_auth_service, TokenValidationError, UserInfoError
-from ..auth.middleware import get_current_user_from_request, require_roles, require_admin
+from ..auth.middleware import get_current_user_from_request, get_request_context, require_roles, require_admin
 from ..auth.models import (
     AuthenticationRequest, 
     AuthenticationResponse, 
     UserResponse,
-    User,
-    APIError
+    User
 )
+from ..utils.helpers import TTLCache
 from ..utils.logger import security_logger
 from ..config import get_settings
 
@@ -25,11 +29,85 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 security = HTTPBearer()
 
+# Role bitmasks for the permissions access matrix
+_ROLE_A_MASK = User.mask_for(("RolA",))
+_ROLE_B_MASK = User.mask_for(("RolB",))
+_FINANCIAL_REPORT_MASK = User.mask_for(("Admin", "RolA"))
+_OPERATIONAL_REPORT_MASK = User.mask_for(("Admin", "RolB"))
+
+# /auth/roles payload depends only on configuration, so it is serialized once
+_ROLES_RESPONSE = {
+    "system_roles": [
+        {
+            "name": "Admin",
+            "description": "Full administrative access to all features and data",
+            "powerbi_role": "Admin",
+            "entra_group": "PBI-Admin"
+        },
+        {
+            "name": "RolA", 
+            "description": "Access to Role A specific data and reports",
+            "powerbi_role": "RolA",
+            "entra_group": "PBI-RolA"
+        },
+        {
+            "name": "RolB",
+            "description": "Access to Role B specific data and reports", 
+            "powerbi_role": "RolB",
+            "entra_group": "PBI-RolB"
+        },
+        {
+            "name": "Public",
+            "description": "Default role with limited access",
+            "powerbi_role": "Public",
+            "entra_group": None
+        }
+    ],
+    "role_mappings": settings.entra_group_mappings,
+    "description": "Role-based access control system for Microsoft Fabric Embedded App"
+}
+_ROLES_RESPONSE_BYTES = orjson.dumps(_ROLES_RESPONSE)
+
+# Serialized UserResponse bodies keyed by user ID, tagged with the login they were built from
+_user_response_cache: TTLCache[str, Tuple[Optional[datetime], bytes]] = TTLCache(maxsize=10000, ttl=900)
+entra_auth_service.add_user_change_listener(_user_response_cache.pop)
+
+
+def _user_response_bytes(user: User) -> bytes:
+    """Get the JSON-encoded UserResponse for a user, reusing the cached body when unchanged"""
+    cached = _user_response_cache.get(user.id)
+    if cached is not None and cached[0] == user.last_login:
+        return cached[1]
+    
+    body = orjson.dumps({
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "roles": user.roles,
+        "is_admin": user.is_admin,
+        "last_login": user.last_login
+    })
+    _user_response_cache.set(user.id, (user.last_login, body))
+    return body
+
+
+async def _stream_audit_log(events: Iterable[Dict[str, Any]], limit: int, now: datetime) -> AsyncIterator[bytes]:
+    """Write the audit log response one event at a time, with the totals after the event list"""
+    count = 0
+    yield b'{"events":['
+    for event in islice(events, limit):
+        if count:
+            yield b","
+        yield orjson.dumps(event)
+        count += 1
+    yield b'],' + orjson.dumps({"total_count": count, "limit": limit, "timestamp": now})[1:]
+
+
 # Create router
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], default_response_class=ORJSONResponse)
 
 
-@router.post("/validate", response_model=AuthenticationResponse)
+@router.post("/validate", responses={200: {"model": AuthenticationResponse}})
 async def validate_token(
     request: Request,
     auth_request: AuthenticationRequest
@@ -48,20 +126,20 @@ async def validate_token(
         # Get user information
         user = await entra_auth_service.get_user_info(token_info)
         
-        # Create response
-        response = AuthenticationResponse(
-            user=UserResponse.from_user(user),
-            token_info={
+        # Create response, splicing in the cached user body instead of re-validating it
+        content = orjson.dumps({
+            "user": orjson.Fragment(_user_response_bytes(user)),
+            "token_info": {
                 "tenant_id": token_info.tenant_id,
                 "scopes": token_info.scopes,
-                "issued_at": token_info.issued_at.isoformat(),
-                "expires_at": token_info.expires_at.isoformat()
+                "issued_at": token_info.issued_at,
+                "expires_at": token_info.expires_at
             },
-            expires_at=token_info.expires_at
-        )
+            "expires_at": token_info.expires_at
+        })
         
         logger.info(f"Token validated successfully for user: {user.email}")
-        return response
+        return Response(content=content, media_type="application/json")
         
     except TokenValidationError as e:
         logger.warning(f"Token validation failed: {e}")
@@ -76,7 +154,7 @@ async def validate_token(
         raise HTTPException(status_code=500, detail="Authentication service error")
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", responses={200: {"model": UserResponse}})
 async def get_current_user_info(
     current_user: User = Depends(get_current_user_from_request)
 ):
@@ -88,7 +166,7 @@ async def get_current_user_info(
     """
     
     logger.debug(f"Returning user info for: {current_user.email}")
-    return UserResponse.from_user(current_user)
+    return Response(content=_user_response_bytes(current_user), media_type="application/json")
 
 
 @router.post("/refresh")
@@ -116,7 +194,7 @@ async def refresh_user_info(
         return {
             "message": "User information will be refreshed on next request",
             "user_id": current_user.id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
         
     except Exception as e:
@@ -135,6 +213,9 @@ async def get_user_permissions(
     including PowerBI roles and system permissions.
     """
     
+    role_mask = current_user.role_mask
+    is_admin = current_user.is_admin
+    
     permissions = {
         "user_id": current_user.id,
         "email": current_user.email,
@@ -145,15 +226,15 @@ async def get_user_permissions(
         "permissions": {
             "can_view_reports": len(current_user.roles) > 0,
             "can_access_admin": current_user.is_admin,
-            "can_view_role_a_data": current_user.has_role("RolA") or current_user.is_admin,
-            "can_view_role_b_data": current_user.has_role("RolB") or current_user.is_admin,
+            "can_view_role_a_data": is_admin or bool(role_mask & _ROLE_A_MASK),
+            "can_view_role_b_data": is_admin or bool(role_mask & _ROLE_B_MASK),
             "can_manage_users": current_user.is_admin,
             "can_generate_tokens": True  # All authenticated users can generate embed tokens
         },
         "access_matrix": {
             "reports": {
-                "financial_report": current_user.has_any_role(["Admin", "RolA"]),
-                "operational_report": current_user.has_any_role(["Admin", "RolB"]),
+                "financial_report": bool(role_mask & _FINANCIAL_REPORT_MASK),
+                "operational_report": bool(role_mask & _OPERATIONAL_REPORT_MASK),
                 "executive_dashboard": current_user.is_admin
             }
         }
@@ -177,14 +258,17 @@ async def logout(
     serves as a logging mechanism.
     """
     
+    now = datetime.now()
+    ctx = get_request_context(request)
+    
     try:
         # Log logout event
         security_logger.log_user_login(
             user_id=current_user.email,
             success=True,  # Successful logout
             user_groups=current_user.groups,
-            source_ip=request.client.host if request.client else "unknown",
-            user_agent=request.headers.get("user-agent")
+            source_ip=ctx.client_ip,
+            user_agent=ctx.user_agent
         )
         
         # Clear any server-side session data if applicable
@@ -195,7 +279,7 @@ async def logout(
         return {
             "message": "Logout successful",
             "user_id": current_user.id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
     except Exception as e:
@@ -203,7 +287,7 @@ async def logout(
         # Don't fail logout for errors
         return {
             "message": "Logout completed with warnings",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
 
 
@@ -216,38 +300,7 @@ async def get_available_roles():
     Public endpoint for role discovery.
     """
     
-    roles = {
-        "system_roles": [
-            {
-                "name": "Admin",
-                "description": "Full administrative access to all features and data",
-                "powerbi_role": "Admin",
-                "entra_group": "PBI-Admin"
-            },
-            {
-                "name": "RolA", 
-                "description": "Access to Role A specific data and reports",
-                "powerbi_role": "RolA",
-                "entra_group": "PBI-RolA"
-            },
-            {
-                "name": "RolB",
-                "description": "Access to Role B specific data and reports", 
-                "powerbi_role": "RolB",
-                "entra_group": "PBI-RolB"
-            },
-            {
-                "name": "Public",
-                "description": "Default role with limited access",
-                "powerbi_role": "Public",
-                "entra_group": None
-            }
-        ],
-        "role_mappings": settings.entra_group_mappings,
-        "description": "Role-based access control system for Microsoft Fabric Embedded App"
-    }
-    
-    return roles
+    return Response(content=_ROLES_RESPONSE_BYTES, media_type="application/json")
 
 
 @router.get("/status")
@@ -263,7 +316,10 @@ async def get_auth_status(
     """
     
     # Calculate session info (simplified)
-    session_duration = (datetime.now() - current_user.last_login).total_seconds() if current_user.last_login else 0
+    now = datetime.now()
+    ctx = get_request_context(request)
+    login_clock = current_user.last_login_monotonic
+    session_duration = time.monotonic() - login_clock if login_clock is not None else 0
     
     status = {
         "authenticated": True,
@@ -275,15 +331,15 @@ async def get_auth_status(
         },
         "session": {
             "duration_seconds": int(session_duration),
-            "last_login": current_user.last_login.isoformat() if current_user.last_login else None,
-            "request_id": getattr(request.state, 'request_id', None)
+            "last_login": current_user.last_login,
+            "request_id": ctx.request_id
         },
         "security": {
-            "source_ip": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent"),
-            "secure_connection": request.url.scheme == "https"
+            "source_ip": ctx.client_ip,
+            "user_agent": ctx.user_agent,
+            "secure_connection": ctx.is_https
         },
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now
     }
     
     return status
@@ -319,7 +375,7 @@ async def list_users(
             "groups": current_user.groups,
             "is_admin": current_user.is_admin,
             "is_active": current_user.is_active,
-            "last_login": current_user.last_login.isoformat() if current_user.last_login else None
+            "last_login": current_user.last_login
         }
     ]
     
@@ -328,7 +384,7 @@ async def list_users(
     return {
         "users": users,
         "total_count": len(users),
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now()
     }
 
 
@@ -371,7 +427,7 @@ async def update_user_roles(
         "user_id": user_id,
         "new_roles": new_roles,
         "updated_by": current_user.email,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now()
     }
 
 
@@ -394,10 +450,11 @@ async def get_audit_log(
     
     # In a real implementation, this would query audit logs from database/logging system
     # For now, return a placeholder response
+    now = datetime.now()
     
     audit_events = [
         {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
             "event_type": "USER_LOGIN",
             "user_id": current_user.email,
             "result": "SUCCESS",
@@ -407,12 +464,8 @@ async def get_audit_log(
     
     logger.info(f"Admin {current_user.email} accessed audit log")
     
-    return {
-        "events": audit_events,
-        "total_count": len(audit_events),
-        "limit": limit,
-        "timestamp": datetime.now().isoformat()
-    }
+    # Events are written as they are read, so memory stays flat regardless of limit
+    return StreamingResponse(_stream_audit_log(audit_events, limit, now), media_type="application/json")
 
 
 # Health check for auth service
@@ -426,7 +479,7 @@ async def auth_health_check():
     
     health_status = {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(),
         "components": {
             "entra_id": "healthy",  # In real impl, would test Entra ID connectivity
             "token_validation": "healthy",
@@ -442,9 +495,8 @@ async def auth_health_check():
     
     # Test basic functionality
     try:
-        # Test MSAL app initialization
-        app = entra_auth_service.msal_app
-        if app:
+        # MSAL app is created at startup (or on first use)
+        if entra_auth_service.msal_app is not None:
             health_status["components"]["msal_client"] = "healthy"
         else:
             health_status["components"]["msal_client"] = "degraded"
@@ -457,16 +509,3 @@ async def auth_health_check():
     
     return health_status
 
-
-# Error handlers
-@router.exception_handler(HTTPException)
-async def auth_http_exception_handler(request: Request, exc: HTTPException):
-    """Handle HTTP exceptions in auth routes"""
-    
-    error = APIError(
-        error="AuthenticationError",
-        message=exc.detail,
-        request_id=getattr(request.state, 'request_id', None)
-    )
-    
-    return error.dict()
\ No newline at end of file
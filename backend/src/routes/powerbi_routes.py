@@ -3,25 +3,58 @@ PowerBI routes for Microsoft Fabric Embedded Backend
 Handles embed token generation, report access, and PowerBI integration
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import ORJSONResponse, Response
 
 from ..auth.middleware import get_current_user_from_request, require_roles
 from ..auth.models import User, PowerBITokenRequest, PowerBITokenResponse, PowerBIEmbedConfig
 from ..powerbi.service import powerbi_service, PowerBIServiceError, TokenGenerationError, ReportAccessError
+from ..utils.helpers import TTLCache, conditional_response, iso_now_cached, weak_etag
 from ..utils.logger import security_logger
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Response blocks derived only from settings, built once and shared (only ever serialized)
+_WORKSPACE_CONFIGURATION: Dict[str, Any] = {
+    "rls_enabled": True,
+    "token_expiration_minutes": settings.embed_token_expiration_minutes,
+    "max_concurrent_tokens": 10  # Example limit
+}
+_HEALTH_CONFIGURATION: Dict[str, Any] = {
+    "workspace_id": settings.fabric_workspace_id,
+    "dataset_id": settings.fabric_dataset_id,
+    "report_id": settings.fabric_report_id,
+    "token_expiration_minutes": settings.embed_token_expiration_minutes
+}
+
+# Last /powerbi/health result, reused so frequent probes do not each call PowerBI
+_HEALTH_CACHE_KEY = "health"
+_health_cache: TTLCache[str, Dict[str, Any]] = TTLCache(maxsize=1, ttl=10)
+
+# Cache-Control for per-user GET endpoints whose data is stable for a while; the
+# responses depend on the caller, so shared caches must key them by Authorization
+_CLIENT_CACHE_CONTROL = "private, max-age=30"
+
 # Create router
-router = APIRouter(prefix="/powerbi", tags=["PowerBI"])
+router = APIRouter(prefix="/powerbi", tags=["PowerBI"], default_response_class=ORJSONResponse)
+
+
+def _conditional_response(request: Request, payload: Dict[str, Any]) -> Response:
+    """
+    Return 304 Not Modified if the client already holds the payload, else the full JSON response
+    
+    The payload's timestamp is left out of the ETag so it only changes with the data.
+    """
+    etag = weak_etag({key: value for key, value in payload.items() if key != "timestamp"})
+    return conditional_response(request, payload, etag, _CLIENT_CACHE_CONTROL)
 
 
-@router.post("/token", response_model=Dict[str, Any])
+@router.post("/token")
 async def generate_embed_token(
     request: Request,
     token_request: PowerBITokenRequest,
@@ -62,32 +95,36 @@ async def generate_embed_token(
             access_level=token_request.access_level
         )
         
-        logger.info(
-            f"Embed token generated for user {current_user.email}",
-            extra={
-                'report_id': token_request.report_id,
-                'access_level': token_request.access_level,
-                'user_roles': current_user.roles
-            }
-        )
+        # The extra fields are only built when INFO records are kept
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Embed token generated for user %s", current_user.email,
+                extra={
+                    'report_id': token_request.report_id,
+                    'access_level': token_request.access_level,
+                    'user_roles': current_user.roles
+                }
+            )
         
-        return embed_config
+        # The service builds this dict itself, so it is serialized as-is without validation
+        return ORJSONResponse(content=embed_config)
         
     except ReportAccessError as e:
-        logger.warning(f"Report access denied for user {current_user.email}: {e}")
+        logger.warning("Report access denied for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=403, detail=str(e))
     
     except TokenGenerationError as e:
-        logger.error(f"Token generation failed for user {current_user.email}: {e}")
+        logger.error("Token generation failed for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail=f"Failed to generate embed token: {str(e)}")
     
     except Exception as e:
-        logger.error(f"Unexpected error generating embed token: {e}")
+        logger.error("Unexpected error generating embed token: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/reports")
 async def get_user_reports(
+    request: Request,
     current_user: User = Depends(get_current_user_from_request)
 ):
     """
@@ -103,21 +140,21 @@ async def get_user_reports(
     try:
         reports = await powerbi_service.get_reports_for_user(current_user)
         
-        logger.debug(f"Retrieved {len(reports)} reports for user {current_user.email}")
+        logger.debug("Retrieved %s reports for user %s", len(reports), current_user.email)
         
-        return {
+        return _conditional_response(request, {
             "reports": reports,
             "total_count": len(reports),
             "user_roles": current_user.roles,
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": iso_now_cached()
+        })
         
     except PowerBIServiceError as e:
-        logger.error(f"Error getting reports for user {current_user.email}: {e}")
+        logger.error("Error getting reports for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail=f"Failed to get reports: {str(e)}")
     
     except Exception as e:
-        logger.error(f"Unexpected error getting reports: {e}")
+        logger.error("Unexpected error getting reports: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -139,21 +176,15 @@ async def get_report_details(
     """
     
     try:
-        # Get all user reports and find the specific one
-        user_reports = await powerbi_service.get_reports_for_user(current_user)
-        
-        # Find the requested report
-        report = next((r for r in user_reports if r['id'] == report_id), None)
+        # Resolve the report (and the user's access to it) before asking
+        # PowerBI for a token, so unknown or forbidden IDs never generate one
+        report = await powerbi_service.get_report_by_id(current_user, report_id)
         
         if not report:
-            logger.warning(f"Report {report_id} not accessible to user {current_user.email}")
+            logger.warning("Report %s not accessible to user %s", report_id, current_user.email)
             raise HTTPException(status_code=404, detail="Report not found or access denied")
         
-        # Get embed token for this specific report
-        embed_config = await powerbi_service.generate_embed_token(
-            user=current_user,
-            report_id=report_id
-        )
+        embed_config = await powerbi_service.generate_embed_token(user=current_user, report_id=report_id)
         
         # Combine report metadata with embed config
         detailed_report = {
@@ -165,25 +196,26 @@ async def get_report_details(
                 "can_edit": current_user.is_admin,
                 "can_share": current_user.is_admin
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now_cached()
         }
         
-        logger.info(f"Report details retrieved for user {current_user.email}, report {report_id}")
+        logger.info("Report details retrieved for user %s, report %s", current_user.email, report_id)
         
         return detailed_report
         
     except HTTPException:
         raise
     except PowerBIServiceError as e:
-        logger.error(f"PowerBI service error: {e}")
+        logger.error("PowerBI service error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error getting report details: {e}")
+        logger.error("Unexpected error getting report details: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/datasets")
 async def get_user_datasets(
+    request: Request,
     current_user: User = Depends(get_current_user_from_request)
 ):
     """
@@ -199,21 +231,21 @@ async def get_user_datasets(
     try:
         datasets = await powerbi_service.get_datasets_for_user(current_user)
         
-        logger.debug(f"Retrieved {len(datasets)} datasets for user {current_user.email}")
+        logger.debug("Retrieved %s datasets for user %s", len(datasets), current_user.email)
         
-        return {
+        return _conditional_response(request, {
             "datasets": datasets,
             "total_count": len(datasets),
             "user_roles": current_user.roles,
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": iso_now_cached()
+        })
         
     except PowerBIServiceError as e:
-        logger.error(f"Error getting datasets for user {current_user.email}: {e}")
+        logger.error("Error getting datasets for user %s: %s", current_user.email, e)
         raise HTTPException(status_code=500, detail=f"Failed to get datasets: {str(e)}")
     
     except Exception as e:
-        logger.error(f"Unexpected error getting datasets: {e}")
+        logger.error("Unexpected error getting datasets: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -242,18 +274,19 @@ async def validate_embed_token(
             "token_id": token_id,
             "is_valid": is_valid,
             "user_id": current_user.id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now_cached()
         }
         
         if not is_valid:
             result["message"] = "Token is expired or invalid"
         
-        logger.debug(f"Token validation result for {token_id}: {is_valid}")
+        logger.debug("Token validation result for %s: %s", token_id, is_valid)
         
-        return result
+        # Frontends poll this route; hand the dict straight to orjson instead of jsonable_encoder
+        return ORJSONResponse(content=result)
         
     except Exception as e:
-        logger.error(f"Error validating token {token_id}: {e}")
+        logger.error("Error validating token %s: %s", token_id, e)
         raise HTTPException(status_code=500, detail="Token validation failed")
 
 
@@ -282,7 +315,7 @@ async def revoke_embed_token(
             "token_id": token_id,
             "revoked": was_revoked,
             "user_id": current_user.id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now_cached()
         }
         
         if was_revoked:
@@ -290,17 +323,18 @@ async def revoke_embed_token(
         else:
             result["message"] = "Token was already invalid or not found"
         
-        logger.info(f"Token revocation for {token_id}: {was_revoked}")
+        logger.info("Token revocation for %s: %s", token_id, was_revoked)
         
         return result
         
     except Exception as e:
-        logger.error(f"Error revoking token {token_id}: {e}")
+        logger.error("Error revoking token %s: %s", token_id, e)
         raise HTTPException(status_code=500, detail="Token revocation failed")
 
 
 @router.get("/workspace/info")
 async def get_workspace_info(
+    request: Request,
     current_user: User = Depends(get_current_user_from_request)
 ):
     """
@@ -314,21 +348,23 @@ async def get_workspace_info(
     """
     
     try:
-        # Get user's accessible reports and datasets
-        reports = await powerbi_service.get_reports_for_user(current_user)
-        datasets = await powerbi_service.get_datasets_for_user(current_user)
+        # Get user's accessible reports and datasets concurrently
+        reports, datasets = await asyncio.gather(
+            powerbi_service.get_reports_for_user(current_user),
+            powerbi_service.get_datasets_for_user(current_user)
+        )
         
         workspace_info = {
             "workspace_id": settings.fabric_workspace_id,
             "workspace_name": "Microsoft Fabric Workspace",  # Could be fetched from API
             "reports": {
                 "total_count": len(reports),
-                "accessible_count": len([r for r in reports if r.get('has_access', False)]),
+                "accessible_count": sum(1 for r in reports if r['has_access']),
                 "items": reports
             },
             "datasets": {
                 "total_count": len(datasets),
-                "accessible_count": len([d for d in datasets if d.get('has_access', False)]),
+                "accessible_count": sum(1 for d in datasets if d['has_access']),
                 "items": datasets
             },
             "user_access": {
@@ -338,34 +374,31 @@ async def get_workspace_info(
                 "powerbi_roles": current_user.powerbi_roles,
                 "is_admin": current_user.is_admin,
                 "permissions": {
-                    "can_view_reports": len(reports) > 0,
+                    "can_view_reports": bool(reports),
                     "can_generate_tokens": True,
-                    "can_access_datasets": len(datasets) > 0
+                    "can_access_datasets": bool(datasets)
                 }
             },
-            "configuration": {
-                "rls_enabled": True,
-                "token_expiration_minutes": settings.embed_token_expiration_minutes,
-                "max_concurrent_tokens": 10  # Example limit
-            },
-            "timestamp": datetime.now().isoformat()
+            "configuration": _WORKSPACE_CONFIGURATION,
+            "timestamp": iso_now_cached()
         }
         
-        logger.debug(f"Workspace info retrieved for user {current_user.email}")
+        logger.debug("Workspace info retrieved for user %s", current_user.email)
         
-        return workspace_info
+        return _conditional_response(request, workspace_info)
         
     except PowerBIServiceError as e:
-        logger.error(f"Error getting workspace info: {e}")
+        logger.error("Error getting workspace info: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get workspace info: {str(e)}")
     
     except Exception as e:
-        logger.error(f"Unexpected error getting workspace info: {e}")
+        logger.error("Unexpected error getting workspace info: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/user/access")
 async def check_user_access(
+    request: Request,
     report_id: Optional[str] = Query(None, description="Report ID to check access for"),
     current_user: User = Depends(get_current_user_from_request)
 ):
@@ -412,8 +445,7 @@ async def check_user_access(
         # If specific report requested, check access to that report
         if report_id:
             try:
-                user_reports = await powerbi_service.get_reports_for_user(current_user)
-                report_access = any(r['id'] == report_id for r in user_reports)
+                report_access = await powerbi_service.user_can_access_report(current_user, report_id)
                 
                 access_info["report_access"] = {
                     "report_id": report_id,
@@ -422,21 +454,21 @@ async def check_user_access(
                     "can_edit": current_user.is_admin and report_access
                 }
             except Exception as e:
-                logger.warning(f"Could not check report access for {report_id}: {e}")
+                logger.warning("Could not check report access for %s: %s", report_id, e)
                 access_info["report_access"] = {
                     "report_id": report_id,
                     "has_access": False,
                     "error": "Could not verify access"
                 }
         
-        access_info["timestamp"] = datetime.now().isoformat()
+        access_info["timestamp"] = iso_now_cached()
         
-        logger.debug(f"Access check completed for user {current_user.email}")
+        logger.debug("Access check completed for user %s", current_user.email)
         
-        return access_info
+        return _conditional_response(request, access_info)
         
     except Exception as e:
-        logger.error(f"Error checking user access: {e}")
+        logger.error("Error checking user access: %s", e)
         raise HTTPException(status_code=500, detail="Access check failed")
 
 
@@ -469,36 +501,31 @@ async def get_all_reports(
         # Get all reports (admin bypass)
         all_reports = await powerbi_service._get_workspace_reports(powerbi_token)
         
-        # Add admin metadata
-        reports_with_metadata = []
+        # Add admin metadata in place; the list was freshly decoded for this request
         for report in all_reports:
-            report_meta = {
-                **report,
-                "admin_metadata": {
-                    "created_date": report.get('createdDateTime'),
-                    "modified_date": report.get('modifiedDateTime'),
-                    "created_by": report.get('createdBy'),
-                    "modified_by": report.get('modifiedBy'),
-                    "dataset_id": report.get('datasetId'),
-                    "size_in_bytes": report.get('reportSizeInBytes')
-                }
+            report["admin_metadata"] = {
+                "created_date": report.get('createdDateTime'),
+                "modified_date": report.get('modifiedDateTime'),
+                "created_by": report.get('createdBy'),
+                "modified_by": report.get('modifiedBy'),
+                "dataset_id": report.get('datasetId'),
+                "size_in_bytes": report.get('reportSizeInBytes')
             }
-            reports_with_metadata.append(report_meta)
         
         result = {
-            "reports": reports_with_metadata,
-            "total_count": len(reports_with_metadata),
+            "reports": all_reports,
+            "total_count": len(all_reports),
             "workspace_id": settings.fabric_workspace_id,
             "admin_user": current_user.email,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now_cached()
         }
         
-        logger.info(f"Admin {current_user.email} retrieved all reports")
+        logger.info("Admin %s retrieved all reports", current_user.email)
         
         return result
         
     except Exception as e:
-        logger.error(f"Error getting all reports for admin: {e}")
+        logger.error("Error getting all reports for admin: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get reports")
 
 
@@ -528,36 +555,31 @@ async def get_all_datasets(
         # Get all datasets (admin bypass)
         all_datasets = await powerbi_service._get_workspace_datasets(powerbi_token)
         
-        # Add admin metadata
-        datasets_with_metadata = []
+        # Add admin metadata in place; the list was freshly decoded for this request
         for dataset in all_datasets:
-            dataset_meta = {
-                **dataset,
-                "admin_metadata": {
-                    "created_date": dataset.get('createdDate'),
-                    "configured_by": dataset.get('configuredBy'),
-                    "is_refreshable": dataset.get('isRefreshable'),
-                    "is_effective_identity_required": dataset.get('isEffectiveIdentityRequired'),
-                    "is_effective_identity_roles_required": dataset.get('isEffectiveIdentityRolesRequired'),
-                    "is_on_premises_data_gateway_required": dataset.get('isOnPremisesDataGatewayRequired')
-                }
+            dataset["admin_metadata"] = {
+                "created_date": dataset.get('createdDate'),
+                "configured_by": dataset.get('configuredBy'),
+                "is_refreshable": dataset.get('isRefreshable'),
+                "is_effective_identity_required": dataset.get('isEffectiveIdentityRequired'),
+                "is_effective_identity_roles_required": dataset.get('isEffectiveIdentityRolesRequired'),
+                "is_on_premises_data_gateway_required": dataset.get('isOnPremisesDataGatewayRequired')
             }
-            datasets_with_metadata.append(dataset_meta)
         
         result = {
-            "datasets": datasets_with_metadata,
-            "total_count": len(datasets_with_metadata),
+            "datasets": all_datasets,
+            "total_count": len(all_datasets),
             "workspace_id": settings.fabric_workspace_id,
             "admin_user": current_user.email,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now_cached()
         }
         
-        logger.info(f"Admin {current_user.email} retrieved all datasets")
+        logger.info("Admin %s retrieved all datasets", current_user.email)
         
         return result
         
     except Exception as e:
-        logger.error(f"Error getting all datasets for admin: {e}")
+        logger.error("Error getting all datasets for admin: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get datasets")
 
 
@@ -583,25 +605,23 @@ async def revoke_all_tokens(
             details={"reason": "Admin request"}
         )
         
-        # Get current token count
-        token_count = len(powerbi_service._token_cache)
-        
-        # Clear all cached tokens
-        powerbi_service._token_cache.clear()
+        # Clear all cached tokens, and the listings they were issued against
+        token_count = powerbi_service.revoke_all_embed_tokens()
+        powerbi_service.invalidate_user_listings()
         
         result = {
             "message": "All embed tokens revoked",
             "tokens_revoked": token_count,
             "admin_user": current_user.email,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now_cached()
         }
         
-        logger.warning(f"Admin {current_user.email} revoked all embed tokens ({token_count} tokens)")
+        logger.warning("Admin %s revoked all embed tokens (%s tokens)", current_user.email, token_count)
         
         return result
         
     except Exception as e:
-        logger.error(f"Error revoking all tokens: {e}")
+        logger.error("Error revoking all tokens: %s", e)
         raise HTTPException(status_code=500, detail="Failed to revoke tokens")
 
 
@@ -617,20 +637,20 @@ async def powerbi_health_check():
         PowerBI service health status
     """
     
+    # The cached result keeps its original timestamp, so monitors can see its age
+    cached_status = _health_cache.get(_HEALTH_CACHE_KEY)
+    if cached_status is not None:
+        return cached_status
+    
     health_status = {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": iso_now_cached(),
         "components": {
             "powerbi_api": "unknown",
             "workspace_access": "unknown",
             "token_generation": "unknown"
         },
-        "configuration": {
-            "workspace_id": settings.fabric_workspace_id,
-            "dataset_id": settings.fabric_dataset_id,
-            "report_id": settings.fabric_report_id,
-            "token_expiration_minutes": settings.embed_token_expiration_minutes
-        }
+        "configuration": _HEALTH_CONFIGURATION
     }
     
     try:
@@ -651,11 +671,12 @@ async def powerbi_health_check():
         health_status["components"]["token_generation"] = "healthy"
         
     except Exception as e:
-        logger.error(f"PowerBI health check failed: {e}")
+        logger.error("PowerBI health check failed: %s", e)
         health_status["status"] = "unhealthy"
         health_status["error"] = str(e)
         health_status["components"]["powerbi_api"] = "unhealthy"
         health_status["components"]["workspace_access"] = "unhealthy"
         health_status["components"]["token_generation"] = "unhealthy"
     
+    _health_cache[_HEALTH_CACHE_KEY] = health_status
     return health_status
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+Utilities module
+Contains logging, helpers, and utility functions
+"""
+
+from .logger import (
+    setup_logging,
+    get_logger,
+    get_security_logger,
+    security_logger,
+    SecurityLogger
+)
+
+__all__ = [
+    'setup_logging',
+    'get_logger',
+    'get_security_logger', 
+    'security_logger',
+    'SecurityLogger'
+]
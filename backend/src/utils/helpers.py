@@ -0,0 +1,211 @@
+"""
+Shared helper utilities for Microsoft Fabric Embedded Backend
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import orjson
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded in-memory cache with expiry on the monotonic clock
+
+    Entries expire ttl seconds after they are stored and are dropped lazily
+    when read. Once maxsize is reached the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Return a live value for key, or default if missing or expired"""
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def __getitem__(self, key: K) -> V:
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            self._data.pop(key, None)
+            raise KeyError(key)
+        self._data.move_to_end(key)
+        return item[1]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Store value for key, expiring after ttl seconds (defaults to the cache ttl)"""
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: object) -> bool:
+        item = self._data.get(key)  # type: ignore[arg-type]
+        return item is not None and item[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        self.expire()
+        return len(self._data)
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Remove key and return its value, or default if missing or expired"""
+        item = self._data.pop(key, None)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        return item[1]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._data.clear()
+
+    def expire(self) -> None:
+        """Drop every expired entry"""
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+
+    def values(self) -> List[V]:
+        """Snapshot of all live values"""
+        self.expire()
+        return [value for _, value in self._data.values()]
+
+    def items(self) -> List[Tuple[K, V]]:
+        """Snapshot of all live (key, value) pairs"""
+        self.expire()
+        return [(key, value) for key, (_, value) in self._data.items()]
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker for calls to an external dependency
+
+    Opens after fail_max consecutive failures and rejects calls for
+    reset_timeout seconds. After that the circuit is half-open and a single
+    trial call is let through while others keep being rejected: a success
+    closes the circuit, a failure re-opens it. A trial whose outcome is never
+    recorded (e.g. a cancelled call) stops blocking others after reset_timeout.
+    """
+
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # When the current half-open trial call was let through, if one is in flight
+        self._trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half-open" """
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Whether a call may be attempted now; in half-open state only one trial at a time"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+
+        now = time.monotonic()
+        if self._trial_started_at is not None and now - self._trial_started_at < self.reset_timeout:
+            return False
+        self._trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit"""
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit once fail_max is reached"""
+        self._trial_started_at = None
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
+
+
+# Last (monotonic time, ISO timestamp) computed by iso_now_cached
+_iso_now: Tuple[float, str] = (float("-inf"), "")
+
+
+def iso_now_cached(granularity: float = 1.0) -> str:
+    """
+    Current local time as an ISO 8601 string, recomputed at most once per granularity seconds
+
+    Meant for informational response timestamps, where being up to granularity
+    seconds behind does not matter.
+    """
+    global _iso_now
+
+    now = time.monotonic()
+    if now - _iso_now[0] >= granularity:
+        _iso_now = (now, datetime.now().isoformat())
+    return _iso_now[1]
+
+
+def weak_etag(data: Any) -> str:
+    """Compute a weak ETag over the JSON form of data"""
+    digest = hashlib.blake2b(orjson.dumps(data, option=orjson.OPT_SORT_KEYS), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header value matches etag
+
+    Handles "*" and comma-separated lists, comparing weakly (a W/ prefix on
+    either side is ignored), as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_response(request: Request, content: Any, etag: str, cache_control: str) -> Response:
+    """
+    Return 304 Not Modified if the client already holds etag, else the full JSON response
+
+    The responses depend on the caller, so they vary by Authorization.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content=content, headers=headers)
@@ -3,49 +3,86 @@ Logging configuration for Microsoft Fabric Embedded Backend
 Provides structured logging with Azure Application Insights integration
 """
 
+import contextvars
+import functools
 import logging
 import logging.config
+import logging.handlers
+import atexit
+import os
+import queue
 import sys
-import json
-from typing import Dict, Any, Optional
-from datetime import datetime
-import structlog
-from pythonjsonlogger import jsonlogger
+import threading
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+from datetime import datetime, timezone
+from os import urandom
+import orjson
 
 from ..config import get_settings
 
+if TYPE_CHECKING:
+    import structlog
+
 # Get settings
 settings = get_settings()
 
 
-class CustomJSONFormatter(jsonlogger.JsonFormatter):
-    """Custom JSON formatter for structured logging"""
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RESERVED_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Application context stamped on every JSON record; fixed for the process lifetime
+_STATIC_RECORD_FIELDS: Dict[str, Any] = {
+    'app_name': settings.app_name,
+    'app_version': settings.version,
+    'environment': settings.environment
+}
+
+
+class CustomJSONFormatter(logging.Formatter):
+    """Custom JSON formatter for structured logging, serialized with orjson"""
     
-    def add_fields(self, log_record: Dict[str, Any], record: logging.LogRecord, message_dict: Dict[str, Any]) -> None:
-        super().add_fields(log_record, record, message_dict)
+    def format(self, record: logging.LogRecord) -> str:
+        log_record: Dict[str, Any] = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc),
+            'level': record.levelname,
+            'logger_name': record.name,
+            'message': record.getMessage()
+        }
+        
+        # Fields passed through `extra`
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS:
+                log_record[key] = value
+        
+        if record.exc_info:
+            log_record['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            log_record['stack_info'] = self.formatStack(record.stack_info)
         
         # Add custom fields
-        log_record['timestamp'] = datetime.utcnow().isoformat() + 'Z'
-        log_record['level'] = record.levelname
-        log_record['logger_name'] = record.name
         log_record['module'] = record.module
         log_record['function'] = record.funcName
         log_record['line'] = record.lineno
         
         # Add application context
-        log_record['app_name'] = settings.app_name
-        log_record['app_version'] = settings.version
-        log_record['environment'] = settings.environment
+        log_record.update(_STATIC_RECORD_FIELDS)
         
         # Add process information
         log_record['process_id'] = record.process
         log_record['thread_id'] = record.thread
+        
+        # Values orjson cannot encode natively are logged as their str()
+        return orjson.dumps(
+            log_record,
+            default=str,
+            option=orjson.OPT_UTC_Z
+        ).decode()
 
 
 class SecurityEventFilter(logging.Filter):
     """Filter for security-related events"""
     
-    SECURITY_EVENTS = {
+    SECURITY_EVENTS = frozenset({
         'USER_LOGIN',
         'USER_LOGIN_FAILED', 
         'TOKEN_GENERATED',
@@ -54,29 +91,118 @@ class SecurityEventFilter(logging.Filter):
         'DATA_ACCESS',
         'PERMISSION_CHANGE',
         'SECURITY_VIOLATION'
-    }
+    })
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Filter security events for special handling"""
-        return hasattr(record, 'event_type') and record.event_type in self.SECURITY_EVENTS
+        # `extra` fields live in the record's __dict__; None is never a member
+        return record.__dict__.get('event_type') in self.SECURITY_EVENTS
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that batches writes
+
+    The file size is tracked in memory instead of with a seek/tell per
+    record, and the stream is flushed once 64 KiB are pending or every
+    100 ms from a background thread rather than after every record.
+    Sizes are counted in characters, so rotation is approximate for
+    non-ASCII output.
+    """
+    
+    flush_interval = 0.1
+    flush_bytes = 64 * 1024
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        self._size = 0
+        self._pending = 0
+        super().__init__(*args, **kwargs)
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="log-file-flusher", daemon=True)
+        self._flusher.start()
+    
+    def _open(self):
+        stream = super()._open()
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record) + self.terminator
+            if self.maxBytes > 0 and self._size and self._size + len(msg) > self.maxBytes:
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            
+            self.stream.write(msg)
+            self._size += len(msg)
+            self._pending += len(msg)
+            if self._pending >= self.flush_bytes:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self) -> None:
+        with self.lock:
+            self._pending = 0
+            super().flush()
+    
+    def _flush_periodically(self) -> None:
+        while not self._stop_flushing.wait(self.flush_interval):
+            if self._pending:
+                self.flush()
+    
+    def close(self) -> None:
+        self._stop_flushing.set()
+        super().close()
+
+
+# ID of the HTTP request being handled, set by LoggingMiddleware
+_REQUEST_ID: contextvars.ContextVar[str] = contextvars.ContextVar('request_id', default='')
+
+
+def _add_request_id(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """structlog processor adding the current request ID, if any"""
+    request_id = _REQUEST_ID.get()
+    if request_id:
+        event_dict.setdefault('request_id', request_id)
+    return event_dict
+
+
+def _orjson_dumps_str(value: Any, **kwargs: Any) -> str:
+    """structlog JSONRenderer serializer backed by orjson"""
+    return orjson.dumps(value, default=kwargs.get("default")).decode()
 
 
 def setup_structlog() -> None:
     """Configure structlog for structured logging"""
+    # Imported here so importing this module does not pay for structlog
+    import structlog
     
+    # Level filtering happens in the bound logger itself, so the stdlib
+    # filter/name/positional-args processors are not needed here
     processors = [
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
+        _add_request_id,
+        structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.CallsiteParameterAdder(
+            parameters=[
+                structlog.processors.CallsiteParameter.MODULE,
+                structlog.processors.CallsiteParameter.FUNC_NAME,
+                structlog.processors.CallsiteParameter.LINENO,
+                structlog.processors.CallsiteParameter.PROCESS,
+                structlog.processors.CallsiteParameter.THREAD,
+            ]
+        ),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
     ]
     
     if settings.log_format == "json":
-        processors.append(structlog.processors.JSONRenderer())
+        processors.append(structlog.processors.JSONRenderer(serializer=_orjson_dumps_str))
     else:
         processors.append(structlog.dev.ConsoleRenderer())
     
@@ -84,11 +210,37 @@ def setup_structlog() -> None:
         processors=processors,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.getLevelName(settings.log_level.upper())
+        ),
         cache_logger_on_first_use=True,
     )
 
 
+def _azure_monitor_handler(connection_string: str) -> logging.Handler:
+    """
+    Build a logging handler exporting to Application Insights
+
+    Records are batched by an OpenTelemetry BatchLogRecordProcessor, so
+    events are sent in groups rather than with one HTTPS call each.
+    """
+    from azure.monitor.opentelemetry.exporter import AzureMonitorLogExporter
+    from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+    from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+    
+    provider = LoggerProvider()
+    provider.add_log_record_processor(
+        BatchLogRecordProcessor(
+            AzureMonitorLogExporter(connection_string=connection_string),
+            max_export_batch_size=512,
+            schedule_delay_millis=5000
+        )
+    )
+    # Flushed on interpreter exit by _shutdown_logging, after the queue listeners
+    _log_providers.append(provider)
+    return LoggingHandler(logger_provider=provider)
+
+
 def get_logging_config() -> Dict[str, Any]:
     """Get logging configuration dictionary"""
     
@@ -97,8 +249,7 @@ def get_logging_config() -> Dict[str, Any]:
         'disable_existing_loggers': False,
         'formatters': {
             'json': {
-                '()': CustomJSONFormatter,
-                'format': '%(timestamp)s %(level)s %(logger_name)s %(message)s'
+                '()': CustomJSONFormatter
             },
             'standard': {
                 'format': '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
@@ -127,7 +278,7 @@ def get_logging_config() -> Dict[str, Any]:
                 'filters': ['security_filter']
             },
             'file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                '()': BatchedRotatingFileHandler,
                 'level': 'INFO',
                 'formatter': 'json',
                 'filename': '/app/logs/app.log',
@@ -172,12 +323,11 @@ def get_logging_config() -> Dict[str, Any]:
     # Add Application Insights handler if configured
     if settings.applicationinsights_connection_string:
         try:
-            from opencensus.ext.azure.log_exporter import AzureLogHandler
+            from azure.monitor.opentelemetry.exporter import AzureMonitorLogExporter  # noqa: F401
             
             config['handlers']['azure_insights'] = {
-                'class': 'opencensus.ext.azure.log_exporter.AzureLogHandler',
+                '()': _azure_monitor_handler,
                 'level': 'INFO',
-                'formatter': 'json',
                 'connection_string': settings.applicationinsights_connection_string
             }
             
@@ -186,21 +336,112 @@ def get_logging_config() -> Dict[str, Any]:
             config['loggers']['security']['handlers'].append('azure_insights')
             
         except ImportError:
-            logging.warning("Azure Application Insights logging not available - install opencensus-ext-azure")
+            logging.warning("Azure Application Insights logging not available - install azure-monitor-opentelemetry-exporter")
     
     return config
 
 
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a listener in the same process
+
+    The stock prepare() runs the formatter in the calling thread and strips
+    exc_info so the record can be pickled. Records here never leave the
+    process, so only the message is merged and formatting (including
+    tracebacks) is left to the listener thread.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Loggers whose handlers are moved behind a background QueueListener
+_QUEUED_LOGGERS = ('', 'security')
+
+_queue_listeners: List[logging.handlers.QueueListener] = []
+
+# OpenTelemetry LoggerProviders behind the Application Insights handlers
+_log_providers: List[Any] = []
+
+
+def _stop_queue_listeners() -> None:
+    """Flush and stop the background logging listeners"""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+
+def _install_queue_handlers() -> None:
+    """
+    Move the configured handlers of the root and security loggers onto
+    background QueueListeners so callers only pay for a queue put; formatting
+    and I/O happen on the listener threads. Each logger gets its own queue
+    because their handler sets differ.
+    """
+    _stop_queue_listeners()
+
+    for name in _QUEUED_LOGGERS:
+        target = logging.getLogger(name)
+        handlers = list(target.handlers)
+        if not handlers:
+            continue
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        for handler in handlers:
+            target.removeHandler(handler)
+        target.addHandler(_InProcessQueueHandler(log_queue))
+
+        listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        _queue_listeners.append(listener)
+
+
+def _shutdown_logging() -> None:
+    """
+    Drain the queue listeners, then flush and shut down the exporters
+
+    The listeners must stop first: they hand their last records to the
+    Application Insights handlers, which need a live provider to export them.
+    """
+    _stop_queue_listeners()
+    while _log_providers:
+        _log_providers.pop().shutdown()
+
+
+atexit.register(_shutdown_logging)
+
+
+# Set once setup_logging has applied the configuration
+_logging_configured = False
+
+
 def setup_logging() -> None:
-    """Initialize logging configuration"""
+    """
+    Initialize logging configuration
+
+    The configuration depends only on settings, so it is built and applied
+    once per process; later calls (main.py and app.py both call this) are
+    no-ops. The dict is not cached for reuse because dictConfig consumes
+    parts of it.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
     
-    # Ensure log directory exists
-    import os
-    os.makedirs('/app/logs', exist_ok=True)
+    config = get_logging_config()
+    
+    # Ensure directories exist for file handlers
+    for handler in config['handlers'].values():
+        if 'filename' in handler:
+            os.makedirs(os.path.dirname(handler['filename']), exist_ok=True)
     
     # Apply logging configuration
-    config = get_logging_config()
     logging.config.dictConfig(config)
+    _install_queue_handlers()
+    _logging_configured = True
     
     # Setup structlog
     setup_structlog()
@@ -214,18 +455,29 @@ def setup_logging() -> None:
     })
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name"""
     return logging.getLogger(name)
 
 
+@functools.lru_cache(maxsize=None)
 def get_security_logger() -> logging.Logger:
     """Get the security events logger"""
     return logging.getLogger('security')
 
 
 class SecurityLogger:
-    """Helper class for logging security events"""
+    """
+    Helper class for logging security events
+
+    The security logger's handlers sit behind a QueueListener (see
+    _install_queue_handlers), so these methods only pay for a queue put and
+    never wait on file or Application Insights I/O; route handlers can call
+    them inline.
+    """
+    
+    __slots__ = ('logger',)
     
     def __init__(self):
         self.logger = get_security_logger()
@@ -233,6 +485,9 @@ class SecurityLogger:
     def log_user_login(self, user_id: str, success: bool, user_groups: Optional[list] = None, 
                       source_ip: Optional[str] = None, user_agent: Optional[str] = None) -> None:
         """Log user login attempt"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         event_type = "USER_LOGIN" if success else "USER_LOGIN_FAILED"
         
         self.logger.info(
@@ -250,6 +505,9 @@ class SecurityLogger:
     def log_token_generated(self, user_id: str, report_id: str, roles_applied: list,
                            token_expiration: Optional[datetime] = None) -> None:
         """Log PowerBI embed token generation"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         self.logger.info(
             "PowerBI embed token generated",
             extra={
@@ -264,6 +522,9 @@ class SecurityLogger:
     def log_unauthorized_access(self, user_id: str, resource: str, required_roles: list,
                                user_roles: list, source_ip: Optional[str] = None) -> None:
         """Log unauthorized access attempt"""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
+        
         self.logger.warning(
             "Unauthorized access attempt",
             extra={
@@ -279,6 +540,9 @@ class SecurityLogger:
     def log_admin_action(self, admin_user_id: str, action: str, target_user: Optional[str] = None,
                         details: Optional[Dict[str, Any]] = None) -> None:
         """Log administrative action"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         self.logger.info(
             f"Administrative action: {action}",
             extra={
@@ -293,6 +557,9 @@ class SecurityLogger:
     def log_data_access(self, user_id: str, dataset_id: str, data_filters: Dict[str, Any],
                        access_level: str) -> None:
         """Log sensitive data access"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         self.logger.info(
             "Sensitive data accessed",
             extra={
@@ -307,6 +574,9 @@ class SecurityLogger:
     def log_permission_change(self, admin_user_id: str, target_user_id: str, 
                              old_permissions: list, new_permissions: list) -> None:
         """Log permission changes"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        
         self.logger.info(
             "User permissions modified",
             extra={
@@ -321,9 +591,12 @@ class SecurityLogger:
     def log_security_violation(self, user_id: str, violation_type: str, details: Dict[str, Any],
                               severity: str = "HIGH") -> None:
         """Log security violation"""
-        log_method = self.logger.critical if severity == "CRITICAL" else self.logger.error
+        level = logging.CRITICAL if severity == "CRITICAL" else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
         
-        log_method(
+        self.logger.log(
+            level,
             f"Security violation: {violation_type}",
             extra={
                 'event_type': 'SECURITY_VIOLATION',
@@ -339,8 +612,10 @@ class SecurityLogger:
 security_logger = SecurityLogger()
 
 
-def get_request_logger(request_id: str) -> structlog.BoundLogger:
+def get_request_logger(request_id: str) -> "structlog.BoundLogger":
     """Get a logger bound to a specific request ID"""
+    import structlog
+    
     logger = structlog.get_logger()
     return logger.bind(request_id=request_id)
 
@@ -351,27 +626,35 @@ class LoggingMiddleware:
     def __init__(self, app):
         self.app = app
         self.logger = get_logger(__name__)
+        self._log_info = self.logger.info
     
     async def __call__(self, scope, receive, send):
         if scope["type"] == "http":
-            # Generate request ID
-            import uuid
-            request_id = str(uuid.uuid4())
+            # Generate request ID (96 random bits, hex encoded)
+            request_id = urandom(12).hex()
             
-            # Add request ID to scope
-            scope["request_id"] = request_id
+            # Expose the request ID to structlog events for this request
+            token = _REQUEST_ID.set(request_id)
             
             # Log request
-            self.logger.info(
-                "HTTP request started",
-                extra={
-                    'request_id': request_id,
-                    'method': scope['method'],
-                    'path': scope['path'],
-                    'query_string': scope.get('query_string', b'').decode(),
-                    'client_ip': scope.get('client', ['unknown', None])[0] if scope.get('client') else 'unknown'
-                }
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                client = scope.get('client')
+                self._log_info(
+                    "HTTP request started",
+                    extra={
+                        'request_id': request_id,
+                        'method': scope['method'],
+                        'path': scope['path'],
+                        'query_string': scope.get('query_string', b'').decode(),
+                        'client_ip': client[0] if client else 'unknown'
+                    }
+                )
+            
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _REQUEST_ID.reset(token)
+            return
         
         await self.app(scope, receive, send)
 
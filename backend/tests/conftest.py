@@ -0,0 +1,23 @@
+"""Shared pytest configuration."""
+import os
+
+import pytest
+from starlette.requests import Request
+
+# Settings are loaded when application modules are imported, so the required
+# values must be present before any test module imports them.
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("ENTRA_TENANT_ID", "00000000-0000-0000-0000-000000000000")
+os.environ.setdefault("ENTRA_CLIENT_ID", "00000000-0000-0000-0000-000000000001")
+os.environ.setdefault("FABRIC_WORKSPACE_ID", "00000000-0000-0000-0000-000000000002")
+
+
+@pytest.fixture
+def make_request():
+    """Factory for bare GET requests, optionally carrying If-None-Match"""
+    def factory(if_none_match=None):
+        headers = []
+        if if_none_match is not None:
+            headers.append((b"if-none-match", if_none_match.encode()))
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+    return factory
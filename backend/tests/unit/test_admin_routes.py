@@ -0,0 +1,124 @@
+"""Unit tests for admin route helpers."""
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from src.routes.admin_routes import (
+    _decode_audit_cursor,
+    _encode_audit_cursor,
+    _iter_audit_events,
+    _parse_event_types,
+    _stream_audit_events,
+)
+
+BASE_TIME = datetime(2025, 1, 10, 12, 0, 0)
+
+
+def make_events(count):
+    return [
+        {
+            "id": f"evt-{i}",
+            "timestamp": BASE_TIME + timedelta(minutes=i),
+            "event_type": "ADMIN_ACTION" if i % 2 else "USER_LOGIN",
+            "user_id": f"user{i}@example.com",
+        }
+        for i in range(count)
+    ]
+
+
+def iter_events(events, after=None, **filters):
+    options = {
+        "start_date": None,
+        "end_date": None,
+        "event_types": None,
+        "user_id": None,
+        "user_id_prefix": None,
+    }
+    options.update(filters)
+    return list(_iter_audit_events(events, after, **options))
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestAuditCursor:
+    def test_round_trip(self):
+        cursor = _encode_audit_cursor(BASE_TIME, "evt|with|pipes")
+        assert _decode_audit_cursor(cursor) == (BASE_TIME, "evt|with|pipes")
+
+    def test_cursor_is_url_safe(self):
+        cursor = _encode_audit_cursor(BASE_TIME, "evt-1")
+        assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", "bm9waXBl", "%%%"])
+    def test_invalid_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            _decode_audit_cursor(cursor)
+        assert exc_info.value.status_code == 400
+
+
+class TestParseEventTypes:
+    def test_splits_known_types(self):
+        assert _parse_event_types("ADMIN_ACTION,USER_LOGIN") == {"ADMIN_ACTION", "USER_LOGIN"}
+
+    @pytest.mark.parametrize("event_type", ["NOT_A_TYPE", "ADMIN_ACTION,NOT_A_TYPE", "ADMIN_ACTION,"])
+    def test_unknown_types_are_rejected(self, event_type):
+        with pytest.raises(HTTPException) as exc_info:
+            _parse_event_types(event_type)
+        assert exc_info.value.status_code == 400
+
+
+class TestIterAuditEvents:
+    def test_newest_first(self):
+        ids = [event["id"] for event in iter_events(make_events(3))]
+        assert ids == ["evt-2", "evt-1", "evt-0"]
+
+    def test_resumes_after_cursor_position(self):
+        events = make_events(5)
+        first_page = iter_events(events)[:2]
+        last = first_page[-1]
+        after = _decode_audit_cursor(_encode_audit_cursor(last["timestamp"], last["id"]))
+
+        ids = [event["id"] for event in iter_events(events, after)]
+        assert ids == ["evt-2", "evt-1", "evt-0"]
+
+    def test_filters(self):
+        events = make_events(6)
+        ids = [event["id"] for event in iter_events(events, event_types={"ADMIN_ACTION"})]
+        assert ids == ["evt-5", "evt-3", "evt-1"]
+
+        ids = [event["id"] for event in iter_events(events, start_date=BASE_TIME + timedelta(minutes=4))]
+        assert ids == ["evt-5", "evt-4"]
+
+        ids = [event["id"] for event in iter_events(events, user_id_prefix="user1")]
+        assert ids == ["evt-1"]
+
+
+class TestStreamAuditEvents:
+    @pytest.mark.asyncio
+    async def test_writes_one_json_object_per_line(self):
+        events = iter_events(make_events(2))
+        chunks = await collect(_stream_audit_events(iter(events), limit=10))
+
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+        ids = [orjson.loads(chunk)["id"] for chunk in chunks]
+        assert ids == ["evt-1", "evt-0"]
+
+    @pytest.mark.asyncio
+    async def test_ends_with_cursor_when_more_events_remain(self):
+        events = iter_events(make_events(5))
+        chunks = await collect(_stream_audit_events(iter(events), limit=2))
+
+        lines = [orjson.loads(chunk) for chunk in chunks]
+        assert [line["id"] for line in lines[:2]] == ["evt-4", "evt-3"]
+        next_cursor = lines[2]["next_cursor"]
+        assert _decode_audit_cursor(next_cursor) == (BASE_TIME + timedelta(minutes=3), "evt-3")
+
+    @pytest.mark.asyncio
+    async def test_no_cursor_when_everything_fits(self):
+        events = iter_events(make_events(2))
+        chunks = await collect(_stream_audit_events(iter(events), limit=2))
+        assert all("next_cursor" not in orjson.loads(chunk) for chunk in chunks)
@@ -0,0 +1,38 @@
+"""Unit tests for the application's exception handlers."""
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.app import _configure_exception_handlers
+
+
+def make_client():
+    app = FastAPI()
+    _configure_exception_handlers(app)
+
+    @app.get("/api/auth/me")
+    async def auth_route():
+        raise HTTPException(status_code=401, detail="Token expired", headers={"WWW-Authenticate": "Bearer"})
+
+    @app.get("/api/powerbi/reports")
+    async def other_route():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return TestClient(app)
+
+
+def test_auth_errors_use_api_error_shape():
+    response = make_client().get("/api/auth/me")
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    body = response.json()
+    assert body["error"] == "AuthenticationError"
+    assert body["message"] == "Token expired"
+    assert "request_id" in body
+
+
+def test_other_routes_keep_default_error_body():
+    response = make_client().get("/api/powerbi/reports")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Not found"}
@@ -0,0 +1,200 @@
+"""Unit tests for Microsoft Graph throttling in the Entra ID service."""
+import time
+from types import SimpleNamespace
+
+import httpx
+import orjson
+import pytest
+
+from src.auth import entra_auth
+from src.auth.entra_auth import EntraAuthService, _GraphThrottleTransport, _is_idempotent, _retry_delay
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0/users/u1"
+BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+
+
+def make_batch(*methods):
+    return {"requests": [{"id": str(i), "method": m, "url": "/me"} for i, m in enumerate(methods)]}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(entra_auth.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def make_transport(responses):
+    """Throttle transport over a mock that replays responses and records requests"""
+    sent = []
+    replies = iter(responses)
+
+    def handler(request):
+        sent.append(request)
+        status, headers = next(replies)
+        return httpx.Response(status, headers=headers)
+
+    service = SimpleNamespace(_graph_cooldown_until=0.0)
+    transport = _GraphThrottleTransport(service)
+    transport._transport = httpx.MockTransport(handler)
+    return transport, service, sent
+
+
+class TestIsIdempotent:
+    @pytest.mark.parametrize("method", ["GET", "HEAD", "OPTIONS"])
+    def test_safe_methods(self, method):
+        assert _is_idempotent(httpx.Request(method, GRAPH_URL))
+
+    @pytest.mark.parametrize("method", ["PATCH", "PUT", "DELETE"])
+    def test_writes_need_if_match(self, method):
+        assert not _is_idempotent(httpx.Request(method, GRAPH_URL))
+        assert _is_idempotent(httpx.Request(method, GRAPH_URL, headers={"If-Match": "*"}))
+
+    def test_post_is_not_idempotent(self):
+        assert not _is_idempotent(httpx.Request("POST", GRAPH_URL, json={}))
+
+    def test_batch_of_reads_is_idempotent(self):
+        assert _is_idempotent(httpx.Request("POST", BATCH_URL, json=make_batch("GET", "GET")))
+
+    def test_batch_with_a_write_is_not_idempotent(self):
+        assert not _is_idempotent(httpx.Request("POST", BATCH_URL, json=make_batch("GET", "POST")))
+
+    def test_malformed_batch_is_not_idempotent(self):
+        assert not _is_idempotent(httpx.Request("POST", BATCH_URL, content=b"not json"))
+
+
+class TestRetryDelay:
+    def test_honors_retry_after(self):
+        assert _retry_delay("7", 0) == 7.0
+        assert _retry_delay("-3", 0) == 0.0
+
+    @pytest.mark.parametrize("attempt", [0, 1, 2])
+    def test_exponential_backoff_without_retry_after(self, attempt):
+        base = 2 ** attempt * 0.5
+        delay = _retry_delay(None, attempt)
+        assert base <= delay <= base + 0.5
+
+    def test_unparseable_retry_after_falls_back_to_backoff(self):
+        delay = _retry_delay("soon", 0)
+        assert 0.5 <= delay <= 1.0
+
+
+class TestGraphThrottleTransport:
+    @pytest.mark.asyncio
+    async def test_retries_throttled_get(self, sleeps):
+        transport, _, sent = make_transport([(429, {"Retry-After": "2"}), (200, {})])
+        response = await transport.handle_async_request(httpx.Request("GET", GRAPH_URL))
+
+        assert response.status_code == 200
+        assert len(sent) == 2
+        assert sleeps == [2.0]
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_post(self, sleeps):
+        transport, service, sent = make_transport([(429, {"Retry-After": "2"})])
+        response = await transport.handle_async_request(httpx.Request("POST", GRAPH_URL, json={}))
+
+        assert response.status_code == 429
+        assert len(sent) == 1
+        assert sleeps == []
+        assert service._graph_cooldown_until > time.monotonic()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_when_retry_after_is_too_long(self, sleeps):
+        transport, _, sent = make_transport([(429, {"Retry-After": "30"})])
+        response = await transport.handle_async_request(httpx.Request("GET", GRAPH_URL))
+
+        assert response.status_code == 429
+        assert len(sent) == 1
+        assert sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, sleeps):
+        transport, _, sent = make_transport([(429, {"Retry-After": "0"})] * 4)
+        response = await transport.handle_async_request(httpx.Request("GET", GRAPH_URL))
+
+        assert response.status_code == 429
+        assert len(sent) == 4
+        assert len(sleeps) == 3
+
+    @pytest.mark.asyncio
+    async def test_cooldown_short_circuits_new_requests(self, sleeps):
+        transport, service, sent = make_transport([])
+        service._graph_cooldown_until = time.monotonic() + 5
+        response = await transport.handle_async_request(httpx.Request("GET", GRAPH_URL))
+
+        assert response.status_code == 429
+        assert 1 <= int(response.headers["Retry-After"]) <= 6
+        assert sent == []
+
+
+def make_batch_client(rounds):
+    """Client answering successive $batch posts with the given sub-response statuses"""
+    sent = []
+    replies = iter(rounds)
+
+    def handler(request):
+        batch = orjson.loads(request.content)["requests"]
+        sent.append([item["id"] for item in batch])
+        statuses = next(replies)
+        responses = []
+        for item in batch:
+            status, retry_after = statuses[item["id"]]
+            response = {"id": item["id"], "status": status, "body": {"id": item["id"]}}
+            if retry_after is not None:
+                response["headers"] = {"Retry-After": retry_after}
+            responses.append(response)
+        return httpx.Response(200, json={"responses": responses})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), sent
+
+
+def read_requests(*ids):
+    return [{"id": item_id, "method": "GET", "url": f"/users/{item_id}"} for item_id in ids]
+
+
+class TestPostBatch:
+    @pytest.mark.asyncio
+    async def test_resends_only_throttled_sub_requests(self, sleeps):
+        service = EntraAuthService()
+        client, sent = make_batch_client([
+            {"1": (200, None), "2": (429, "2"), "3": (429, "5")},
+            {"2": (200, None), "3": (200, None)},
+        ])
+        async with client:
+            responses = await service._post_batch(client, {}, read_requests("1", "2", "3"))
+
+        assert sent == [["1", "2", "3"], ["2", "3"]]
+        assert sleeps == [5.0]
+        assert {item_id: item["status"] for item_id, item in responses.items()} == {"1": 200, "2": 200, "3": 200}
+
+    @pytest.mark.asyncio
+    async def test_gives_up_when_retry_after_is_too_long(self, sleeps):
+        service = EntraAuthService()
+        client, sent = make_batch_client([{"1": (200, None), "2": (429, "30")}])
+        async with client:
+            responses = await service._post_batch(client, {}, read_requests("1", "2"))
+
+        assert len(sent) == 1
+        assert sleeps == []
+        assert responses["2"]["status"] == 429
+        assert service._graph_cooldown_until > time.monotonic() + 25
+
+    @pytest.mark.asyncio
+    async def test_user_details_survive_a_throttled_sub_request(self, sleeps, monkeypatch):
+        service = EntraAuthService()
+        client, sent = make_batch_client([
+            {"1": (429, "1"), "2": (200, None)},
+            {"1": (200, None)},
+        ])
+        monkeypatch.setattr(service, "_graph_client", lambda **kwargs: client)
+
+        details, groups = await service._get_user_details_and_groups("u1", "token")
+
+        assert details == {"id": "1"}
+        assert groups == []
+        assert sent == [["1", "2"], ["1"]]
@@ -0,0 +1,211 @@
+"""Unit tests for the TTLCache and CircuitBreaker helpers."""
+import orjson
+import pytest
+
+from src.utils import helpers
+from src.utils.helpers import CircuitBreaker, TTLCache, conditional_response, etag_matches, weak_etag
+
+
+class FakeClock:
+    """Controllable stand-in for time.monotonic."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(helpers.time, "monotonic", fake)
+    return fake
+
+
+class TestTTLCache:
+    def test_get_returns_stored_value(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache["a"] = 1
+        assert cache.get("a") == 1
+        assert cache["a"] == 1
+        assert "a" in cache
+
+    def test_entries_expire_after_ttl(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache["a"] = 1
+        clock.advance(10)
+        assert cache.get("a") is None
+        assert cache.get("a", "default") == "default"
+        assert "a" not in cache
+        with pytest.raises(KeyError):
+            cache["a"]
+
+    def test_per_key_ttl_overrides_default(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache.set("short", 1, ttl=1)
+        cache.set("long", 2, ttl=100)
+        clock.advance(5)
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+        clock.advance(96)
+        assert cache.get("long") is None
+
+    def test_least_recently_used_entry_is_evicted(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache["a"] = 1
+        cache["b"] = 2
+        # Reading "a" makes "b" the least recently used entry
+        cache.get("a")
+        cache["c"] = 3
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_overwriting_refreshes_expiry(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache["a"] = 1
+        clock.advance(8)
+        cache["a"] = 2
+        clock.advance(8)
+        assert cache.get("a") == 2
+
+    def test_pop_returns_live_value_and_removes_it(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache["a"] = 1
+        assert cache.pop("a") == 1
+        assert "a" not in cache
+        assert cache.pop("a") is None
+
+    def test_pop_of_expired_entry_returns_default(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache["a"] = 1
+        clock.advance(10)
+        assert cache.pop("a", "default") == "default"
+        assert len(cache) == 0
+
+    def test_len_items_and_values_skip_expired_entries(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1, ttl=1)
+        cache["b"] = 2
+        clock.advance(2)
+        assert len(cache) == 1
+        assert cache.items() == [("b", 2)]
+        assert cache.values() == [2]
+
+    def test_clear_removes_everything(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache["a"] = 1
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestCircuitBreaker:
+    def test_starts_closed(self, clock):
+        breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+        assert breaker.state == "closed"
+        assert breaker.allow_request()
+
+    def test_opens_after_fail_max_consecutive_failures(self, clock):
+        breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow_request()
+
+    def test_success_resets_failure_count(self, clock):
+        breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_a_single_trial(self, clock):
+        breaker = CircuitBreaker(fail_max=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.advance(30)
+        assert breaker.state == "half-open"
+        assert breaker.allow_request()
+        # Concurrent callers are rejected while the trial is in flight
+        assert not breaker.allow_request()
+        assert not breaker.allow_request()
+
+    def test_successful_trial_closes_circuit(self, clock):
+        breaker = CircuitBreaker(fail_max=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.advance(30)
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow_request()
+        assert breaker.allow_request()
+
+    def test_failed_trial_reopens_circuit(self, clock):
+        breaker = CircuitBreaker(fail_max=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.advance(30)
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow_request()
+        clock.advance(30)
+        assert breaker.allow_request()
+
+    def test_unrecorded_trial_stops_blocking_after_reset_timeout(self, clock):
+        breaker = CircuitBreaker(fail_max=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.advance(30)
+        assert breaker.allow_request()
+        clock.advance(29)
+        assert not breaker.allow_request()
+        clock.advance(1)
+        assert breaker.allow_request()
+
+
+class TestConditionalResponse:
+    def test_etag_is_stable_and_key_order_independent(self):
+        assert weak_etag({"a": 1, "b": 2}) == weak_etag({"b": 2, "a": 1})
+        assert weak_etag({"a": 1}) != weak_etag({"a": 2})
+        assert weak_etag({"a": 1}).startswith('W/"')
+
+    @pytest.mark.parametrize("if_none_match, expected", [
+        (None, False),
+        ("", False),
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('W/"other"', False),
+        ('W/"other", W/"abc"', True),
+        ('W/"other",W/"abc"', True),
+        ("*", True),
+    ])
+    def test_etag_matches(self, if_none_match, expected):
+        assert etag_matches(if_none_match, 'W/"abc"') is expected
+
+    def test_full_response_carries_cache_headers(self, make_request):
+        etag = weak_etag({"status": "ok"})
+        response = conditional_response(make_request(), {"status": "ok"}, etag, "private, max-age=10")
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"] == "private, max-age=10"
+        assert response.headers["vary"] == "Authorization"
+        assert orjson.loads(response.body) == {"status": "ok"}
+
+    def test_matching_etag_returns_not_modified(self, make_request):
+        etag = weak_etag({"status": "ok"})
+        request = make_request(f'W/"stale", {etag}')
+        response = conditional_response(request, {"status": "ok"}, etag, "private, max-age=10")
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.body == b""
+
+    def test_stale_etag_returns_full_response(self, make_request):
+        etag = weak_etag({"status": "ok"})
+        request = make_request(weak_etag({"status": "degraded"}))
+        response = conditional_response(request, {"status": "ok"}, etag, "private, max-age=10")
+        assert response.status_code == 200
@@ -0,0 +1,98 @@
+"""Unit tests for the batched rotating log file handler."""
+import logging
+import time
+
+import pytest
+
+from src.utils import logger as logger_module
+from src.utils.logger import BatchedRotatingFileHandler
+
+
+def make_record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def no_periodic_flush(monkeypatch):
+    # Keep the background flusher idle so only size- and close-driven flushes happen
+    monkeypatch.setattr(BatchedRotatingFileHandler, "flush_interval", 60)
+
+
+def test_writes_are_buffered_until_close(tmp_path, no_periodic_flush):
+    path = tmp_path / "app.log"
+    handler = BatchedRotatingFileHandler(path)
+    handler.emit(make_record("first"))
+    handler.emit(make_record("second"))
+    assert path.read_text() == ""
+
+    handler.close()
+    assert path.read_text() == "first\nsecond\n"
+
+
+def test_flushes_once_pending_bytes_reach_threshold(tmp_path, no_periodic_flush, monkeypatch):
+    monkeypatch.setattr(BatchedRotatingFileHandler, "flush_bytes", 10)
+    path = tmp_path / "app.log"
+    handler = BatchedRotatingFileHandler(path)
+    try:
+        handler.emit(make_record("short"))
+        assert path.read_text() == ""
+        handler.emit(make_record("longer"))
+        assert path.read_text() == "short\nlonger\n"
+    finally:
+        handler.close()
+
+
+def test_background_thread_flushes_pending_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(BatchedRotatingFileHandler, "flush_interval", 0.01)
+    path = tmp_path / "app.log"
+    handler = BatchedRotatingFileHandler(path)
+    try:
+        handler.emit(make_record("hello"))
+        deadline = time.monotonic() + 2
+        while path.read_text() == "" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert path.read_text() == "hello\n"
+    finally:
+        handler.close()
+
+
+def test_rolls_over_at_max_bytes(tmp_path, no_periodic_flush):
+    path = tmp_path / "app.log"
+    handler = BatchedRotatingFileHandler(path, maxBytes=20, backupCount=1)
+    for i in range(3):
+        handler.emit(make_record(f"message-{i}"))
+    handler.close()
+
+    assert (tmp_path / "app.log.1").read_text() == "message-0\nmessage-1\n"
+    assert path.read_text() == "message-2\n"
+
+
+def test_size_of_existing_file_counts_toward_rollover(tmp_path, no_periodic_flush):
+    path = tmp_path / "app.log"
+    path.write_text("x" * 15 + "\n")
+    handler = BatchedRotatingFileHandler(path, maxBytes=20, backupCount=1)
+    handler.emit(make_record("message"))
+    handler.close()
+
+    assert (tmp_path / "app.log.1").read_text() == "x" * 15 + "\n"
+    assert path.read_text() == "message\n"
+
+
+def test_shutdown_stops_listeners_before_exporters(monkeypatch):
+    calls = []
+
+    class Recorder:
+        def __init__(self, name):
+            self.name = name
+
+        def stop(self):
+            calls.append(f"{self.name}.stop")
+
+        def shutdown(self):
+            calls.append(f"{self.name}.shutdown")
+
+    monkeypatch.setattr(logger_module, "_queue_listeners", [Recorder("listener")])
+    monkeypatch.setattr(logger_module, "_log_providers", [Recorder("provider")])
+    logger_module._shutdown_logging()
+
+    assert calls == ["listener.stop", "provider.shutdown"]
@@ -0,0 +1,77 @@
+"""Unit tests for the User model's role bitmask."""
+import pytest
+
+from src.auth.models import User
+
+
+def make_user(roles, is_admin=False):
+    return User(
+        id="user-1",
+        email="user@example.com",
+        tenant_id="tenant-1",
+        roles=roles,
+        is_admin=is_admin
+    )
+
+
+def test_role_mask_combines_role_bits():
+    user = make_user(["RolA", "RolB"])
+    assert user.role_mask == User.mask_for(["RolA"]) | User.mask_for(["RolB"])
+    assert make_user([]).role_mask == 0
+
+
+def test_mask_for_ignores_unknown_roles():
+    assert User.mask_for(["Unknown"]) == 0
+    assert User.mask_for(["RolA", "Unknown"]) == User.mask_for(["RolA"])
+
+
+@pytest.mark.parametrize("role, expected", [
+    ("RolA", True),
+    ("RolB", False),
+    ("Admin", False),
+    ("Public", False),
+    ("Unknown", False),
+])
+def test_has_role(role, expected):
+    assert make_user(["RolA"]).has_role(role) is expected
+
+
+def test_has_any_role():
+    user = make_user(["RolB"])
+    assert user.has_any_role(["RolA", "RolB"])
+    assert not user.has_any_role(["RolA", "Admin"])
+    assert not user.has_any_role([])
+    assert not user.has_any_role(["Unknown"])
+
+
+def test_has_nonpublic_role():
+    assert not make_user(["Public"]).has_nonpublic_role
+    assert not make_user([]).has_nonpublic_role
+    assert make_user(["Public", "RolA"]).has_nonpublic_role
+    assert make_user([], is_admin=True).has_nonpublic_role
+
+
+def test_invalid_role_is_rejected():
+    with pytest.raises(ValueError):
+        make_user(["Superuser"])
+
+
+def test_reassigning_roles_updates_mask():
+    user = make_user(["RolB"])
+    user.roles = ["RolA"]
+    assert user.has_role("RolA")
+    assert not user.has_role("RolB")
+
+
+def test_reassigning_invalid_role_is_rejected():
+    user = make_user(["RolA"])
+    with pytest.raises(ValueError):
+        user.roles = ["Superuser"]
+
+
+def test_copy_with_new_roles_updates_mask():
+    user = make_user(["RolB"])
+    copied = user.copy(update={"roles": ["RolA"]})
+    assert copied.has_role("RolA")
+    assert not copied.has_role("RolB")
+    assert user.has_role("RolB")
@@ -0,0 +1,42 @@
+"""Unit tests for PowerBI route helpers."""
+import orjson
+
+from src.routes.powerbi_routes import _conditional_response
+
+
+def test_full_response_sets_cache_headers(make_request):
+    payload = {"reports": [{"id": "r1"}], "timestamp": "2025-01-10T12:00:00"}
+    response = _conditional_response(make_request(), payload)
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == "private, max-age=30"
+    assert response.headers["vary"] == "Authorization"
+    assert orjson.loads(response.body) == payload
+
+
+def test_matching_etag_returns_not_modified(make_request):
+    payload = {"reports": [{"id": "r1"}], "timestamp": "2025-01-10T12:00:00"}
+    etag = _conditional_response(make_request(), payload).headers["etag"]
+    response = _conditional_response(make_request(etag), payload)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["vary"] == "Authorization"
+    assert response.body == b""
+
+
+def test_timestamp_does_not_change_etag(make_request):
+    first = {"reports": [{"id": "r1"}], "timestamp": "2025-01-10T12:00:00"}
+    second = {"reports": [{"id": "r1"}], "timestamp": "2025-01-10T12:05:00"}
+    etag = _conditional_response(make_request(), first).headers["etag"]
+
+    assert _conditional_response(make_request(etag), second).status_code == 304
+
+
+def test_changed_data_invalidates_etag(make_request):
+    etag = _conditional_response(make_request(), {"reports": [{"id": "r1"}]}).headers["etag"]
+    response = _conditional_response(make_request(etag), {"reports": [{"id": "r2"}]})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
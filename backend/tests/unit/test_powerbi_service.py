@@ -0,0 +1,45 @@
+"""Unit tests for the PowerBI service's circuit breaker accounting."""
+import httpx
+import pytest
+
+from src.powerbi.service import PowerBIService
+
+REPORTS_URL = "https://api.powerbi.com/v1.0/myorg/reports"
+
+
+def make_service(handler):
+    service = PowerBIService()
+    service._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def raise_error(error):
+    def handler(request):
+        raise error("simulated", request=request)
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_is_not_a_powerbi_failure():
+    service = make_service(raise_error(httpx.PoolTimeout))
+    for _ in range(10):
+        with pytest.raises(httpx.PoolTimeout):
+            await service._send("GET", REPORTS_URL)
+    assert service._circuit.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_open_the_circuit():
+    service = make_service(raise_error(httpx.ConnectError))
+    for _ in range(5):
+        with pytest.raises(httpx.ConnectError):
+            await service._send("GET", REPORTS_URL)
+    assert service._circuit.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_server_errors_count_as_failures():
+    service = make_service(lambda request: httpx.Response(503))
+    for _ in range(5):
+        assert (await service._send("GET", REPORTS_URL)).status_code == 503
+    assert service._circuit.state == "open"